@@ -7,7 +7,8 @@ def map_failure_reason(reason: str, status: str) -> str:
         "FOIR_EXCEEDED": "Your existing EMIs exceed the allowed repayment capacity.",
         "INVALID_INCOME": "Income details are invalid or missing.",
         "NO_EMI_CAPACITY": "You currently do not have EMI repayment capacity.",
-        "CREDIT_PROFILE_NOT_FOUND": "Credit data not available. Please retry later."
+        "CREDIT_PROFILE_NOT_FOUND": "Credit data not available. Please retry later.",
+        "PAN_MISSING": "A PAN is required to pull your credit report. Please add it to your profile."
     }
 
     return mapping.get(reason, "You are not eligible at this time.")
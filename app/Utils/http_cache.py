@@ -0,0 +1,38 @@
+import hashlib
+
+from fastapi import Response
+
+from core.config import get_settings
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag from the values that determine a representation."""
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored, * matches any."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def cache_headers(etag: str) -> dict[str, str]:
+    """
+    Per-user data: private to the browser, reusable for
+    RESULT_CACHE_MAX_AGE_SECONDS, then revalidated with If-None-Match.
+    """
+    max_age = get_settings().RESULT_CACHE_MAX_AGE_SECONDS
+    return {
+        "ETag":          etag,
+        "Cache-Control": f"private, max-age={max_age}, must-revalidate",
+    }
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
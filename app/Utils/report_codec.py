@@ -0,0 +1,22 @@
+import gzip
+import json
+
+# Codec of newly written reports; stored per row so others can be added
+# (e.g. zstd) without rewriting old blobs.
+REPORT_ENCODING = "gzip"
+GZIP_LEVEL      = 6
+
+
+def encode_report(data: dict) -> tuple[bytes, int]:
+    """
+    (gzip-compressed compact JSON, uncompressed size in bytes). mtime is
+    fixed so equal reports give equal bytes.
+    """
+    raw = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+    return gzip.compress(raw, compresslevel=GZIP_LEVEL, mtime=0), len(raw)
+
+
+def decode_report(payload: bytes, encoding: str) -> dict:
+    if encoding != "gzip":
+        raise ValueError(f"Unsupported report encoding: {encoding}")
+    return json.loads(gzip.decompress(payload))
@@ -0,0 +1,36 @@
+import struct
+
+import numpy as np
+
+# Packed amortization schedule: an 8-byte header (format, columns, months)
+# followed by a months x columns array of little-endian int64 paise, one
+# row per month: principal, interest, closing balance. The EMI is the
+# row's monthly_emi and the month number is the row index + 1. The header
+# keeps the array 8-byte aligned, so decoding is a view over the buffer.
+SCHEDULE_FORMAT  = 1
+SCHEDULE_COLUMNS = ("principal", "interest", "balance")
+SCHEDULE_DTYPE   = np.dtype("<i8")
+_HEADER          = struct.Struct("<BBxxI")
+
+
+def encode_schedule(months) -> bytes:
+    """One loan's (principal, interest, balance) paise per month, shape (months, 3), packed."""
+    months = np.asarray(months, dtype=SCHEDULE_DTYPE).reshape(-1, len(SCHEDULE_COLUMNS))
+    header = _HEADER.pack(SCHEDULE_FORMAT, len(SCHEDULE_COLUMNS), len(months))
+    return header + months.tobytes()
+
+
+def decode_schedule(payload: bytes | memoryview) -> np.ndarray:
+    """
+    (months, 3) int64 paise array viewing ``payload`` without a copy;
+    read-only, and valid as long as ``payload`` is.
+    """
+    fmt, columns, months = _HEADER.unpack_from(payload)
+    if fmt != SCHEDULE_FORMAT or columns != len(SCHEDULE_COLUMNS):
+        raise ValueError(f"Unsupported schedule format {fmt} with {columns} columns")
+    return np.frombuffer(
+        payload,
+        dtype  = SCHEDULE_DTYPE,
+        count  = months * columns,
+        offset = _HEADER.size,
+    ).reshape(months, columns)
@@ -0,0 +1,26 @@
+import csv
+import io
+import json
+from typing import Iterable
+
+EXPORT_FIELDS = ["user_id", "month", "emi", "principal", "interest", "balance"]
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv":    "text/csv",
+}
+
+
+def csv_header() -> str:
+    return ",".join(EXPORT_FIELDS) + "\r\n"
+
+
+def encode_rows(rows: Iterable[dict], fmt: str) -> str:
+    """Encodes one page of schedule rows as a CSV or NDJSON chunk."""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+        writer.writerows(rows)
+        return buffer.getvalue()
+
+    return "".join(json.dumps(row, separators=(",", ":")) + "\n" for row in rows)
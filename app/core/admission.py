@@ -0,0 +1,178 @@
+"""
+Admission control and load shedding.
+
+Expensive mutating routes are grouped (ROUTE_GROUPS) and each group gets
+token buckets per user_id and/or per client IP from ADMISSION_LIMITS. A
+request with no token left gets 429 with Retry-After set to when the next
+token arrives.
+
+Independently, while the worker already has ADMISSION_MAX_IN_FLIGHT
+requests running, or connection checkouts have recently been waiting longer
+than ADMISSION_SHED_POOL_WAIT_SECONDS, new requests get 503 with
+Retry-After straight away. Turning work away at the door keeps the ones
+already admitted fast, instead of queueing every request on threads and
+pool waiters until all of them time out.
+
+Health, metrics, docs and /internal are never limited or shed, and neither
+are replays of a stored Idempotency-Key response: IdempotencyMiddleware
+sits outside this one and answers them first. State is per worker
+process, so effective limits scale with the number of workers.
+"""
+import math
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable
+
+from starlette.responses import JSONResponse
+
+from core.config import get_settings
+from core.metrics import ADMISSION_REJECTED
+from core.pool import recent_checkout_wait
+
+EXEMPT_PREFIXES = ("/metrics", "/internal", "/docs", "/redoc", "/openapi.json")
+UNGROUPED = "other"
+
+
+@dataclass(frozen=True)
+class RouteGroup:
+    name   : str
+    method : str
+    pattern: re.Pattern
+
+
+# user_id is taken from the path. /loan/calculate and the batch routes carry
+# it in the body, which is not read here, so those groups only get per-IP
+# buckets; a user_per_minute limit on them has no effect.
+ROUTE_GROUPS = (
+    RouteGroup("eligibility", "POST", re.compile(r"^/api/v1/eligibility/check/(?P<user_id>\d+)$")),
+    RouteGroup("credit",      "POST", re.compile(r"^/api/v1/credit/generate/(?P<user_id>\d+)$")),
+    RouteGroup("loan",        "POST", re.compile(r"^/api/v1/loan/calculate$")),
+    RouteGroup(
+        "batch",
+        "POST",
+        re.compile(r"^/api/v1/(eligibility/check-batch|loan/calculate-batch|loan/schedule/export)$"),
+    ),
+)
+
+
+class TokenBuckets:
+    """
+    Token buckets keyed by (group, kind, key), LRU-bounded to ``max_keys``.
+    An evicted bucket comes back full, as it would after idling. Used from
+    the event loop only, so there is no lock.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[Hashable, tuple[float, float]] = OrderedDict()
+
+    def wait(self, key: Hashable, per_second: float, burst: float, now: float) -> float:
+        """Seconds until ``key`` has a token (0 if it has one now); refills the bucket."""
+        tokens, updated = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * per_second)
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return 0.0 if tokens >= 1 else (1 - tokens) / per_second
+
+    def take(self, key: Hashable) -> None:
+        tokens, updated = self._buckets[key]
+        self._buckets[key] = (tokens - 1, updated)
+
+
+def _reject(status_code: int, detail: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        {"detail": detail},
+        status_code = status_code,
+        headers     = {"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class AdmissionMiddleware:
+    """
+    Pure ASGI, like MetricsMiddleware; sits inside it so rejections are
+    counted per route, and inside IdempotencyMiddleware so replays are free.
+    """
+
+    def __init__(self, app):
+        self.app       = app
+        self.settings  = get_settings()
+        self.buckets   = TokenBuckets(self.settings.ADMISSION_MAX_BUCKETS)
+        self.in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not self.settings.ADMISSION_ENABLED
+            or scope["path"] == "/"
+            or scope["path"].startswith(EXEMPT_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        group, user_id = self._group_of(scope)
+        rejection = self._shed(group) or self._rate_limit(group, user_id, scope)
+        if rejection is not None:
+            await rejection(scope, receive, send)
+            return
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+    @staticmethod
+    def _group_of(scope) -> tuple[str, str | None]:
+        for group in ROUTE_GROUPS:
+            if scope["method"] == group.method:
+                match = group.pattern.match(scope["path"])
+                if match:
+                    return group.name, match.groupdict().get("user_id")
+        return UNGROUPED, None
+
+    def _shed(self, group: str) -> JSONResponse | None:
+        settings    = self.settings
+        retry_after = settings.ADMISSION_SHED_RETRY_AFTER_SECONDS
+
+        if settings.ADMISSION_MAX_IN_FLIGHT and self.in_flight >= settings.ADMISSION_MAX_IN_FLIGHT:
+            ADMISSION_REJECTED.labels(group, "in_flight").inc()
+            return _reject(503, "Server is busy. Please retry shortly.", retry_after)
+
+        max_wait = settings.ADMISSION_SHED_POOL_WAIT_SECONDS
+        if max_wait and recent_checkout_wait() > max_wait:
+            ADMISSION_REJECTED.labels(group, "pool_wait").inc()
+            return _reject(503, "Server is busy. Please retry shortly.", retry_after)
+        return None
+
+    def _rate_limit(self, group: str, user_id: str | None, scope) -> JSONResponse | None:
+        limits = self.settings.ADMISSION_LIMITS.get(group)
+        if not limits:
+            return None
+
+        client = scope.get("client")
+        keys   = []
+        if user_id is not None and limits.get("user_per_minute"):
+            keys.append(("user", user_id, limits["user_per_minute"], limits.get("user_burst", 1)))
+        if client and limits.get("ip_per_minute"):
+            keys.append(("ip", client[0], limits["ip_per_minute"], limits.get("ip_burst", 1)))
+
+        now   = time.monotonic()
+        waits = {
+            (group, kind, key): self.buckets.wait((group, kind, key), per_minute / 60, burst, now)
+            for kind, key, per_minute, burst in keys
+        }
+        # Tokens are only taken once every bucket has one, so a request
+        # rejected on one key does not use up another.
+        blocked = {bucket: wait for bucket, wait in waits.items() if wait > 0}
+        if blocked:
+            bucket, wait = max(blocked.items(), key=lambda item: item[1])
+            ADMISSION_REJECTED.labels(group, f"{bucket[1]}_rate").inc()
+            return _reject(429, "Too many requests. Please retry later.", wait)
+
+        for bucket in waits:
+            self.buckets.take(bucket)
+        return None
@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class TTLCache:
+    """
+    Thread-safe in-process LRU cache with per-entry expiry and counters.
+    Entries live for ``ttl_seconds`` or a shorter per-entry TTL given to
+    set(); a ``maxsize`` or ``ttl_seconds`` of 0 disables caching.
+
+    Read-through callers take generation() before loading a value and pass
+    it to set(), which then drops the value if the key was invalidated in
+    the meantime, so a load that raced a write cannot re-cache stale data.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize     = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Generation at which each key was last invalidated, LRU-bounded
+        # like the entries; _floor is the newest one forgotten, so a load
+        # older than it is dropped for any key.
+        self._generation = 0
+        self._floor      = 0
+        self._invalidated: OrderedDict[Hashable, int] = OrderedDict()
+
+        self.hits          = 0
+        self.misses        = 0
+        self.evictions     = 0
+        self.expirations   = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            deadline, value = entry
+            if deadline <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses      += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def set(
+        self,
+        key        : Hashable,
+        value      : Any,
+        ttl_seconds: float | None = None,
+        generation : int | None = None,
+    ) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+
+        with self._lock:
+            if generation is not None and (
+                generation < self._floor or self._invalidated.get(key, 0) > generation
+            ):
+                return
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self.invalidations += 1
+            self._generation += 1
+            self._invalidated[key] = self._generation
+            self._invalidated.move_to_end(key)
+            while len(self._invalidated) > max(self.maxsize, 1):
+                _, self._floor = self._invalidated.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._generation += 1
+            self._floor = self._generation
+            self._invalidated.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size":          len(self._data),
+                "maxsize":       self.maxsize,
+                "ttl_seconds":   self.ttl_seconds,
+                "hits":          self.hits,
+                "misses":        self.misses,
+                "hit_ratio":     round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions":     self.evictions,
+                "expirations":   self.expirations,
+                "invalidations": self.invalidations,
+            }
@@ -5,6 +5,110 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     DATABASE_URL: str
 
+    # Serve requests on an AsyncEngine instead of the blocking engine.
+    # ASYNC_DATABASE_URL defaults to DATABASE_URL with an async driver.
+    ASYNC_DB: bool = False
+    ASYNC_DATABASE_URL: str | None = None
+
+    # Connection pool, per worker process (and per engine when ASYNC_DB is
+    # on). Connections are pinged on checkout, so one dropped while idle
+    # is replaced instead of failing a request; idle ones are also recycled.
+    # DB_STATEMENT_TIMEOUT_MS applies to PostgreSQL only; 0 disables it.
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+
+    # Eligibility rule set used when no version is active in the DB, and how
+    # often workers re-check the DB for a newly activated version.
+    ELIGIBILITY_POLICY_PATH: str | None = None
+    ELIGIBILITY_POLICY_REFRESH_SECONDS: int = 60
+
+    # In-process read-through cache of each user's latest credit profile.
+    # Entries also expire at the profile's own expires_at; 0 disables.
+    CREDIT_PROFILE_CACHE_SIZE: int = 10_000
+    CREDIT_PROFILE_CACHE_TTL_SECONDS: int = 300
+
+    # In-process cache of serialized amortization schedules per (amount,
+    # tenure, rate) for the eligibility result's tenure comparison.
+    SCHEDULE_CACHE_SIZE: int = 10_000
+
+    # Credit bureau. While TRANSUNION_API_URL is unset no pulls are made and
+    # dummy profiles are generated instead; once it is set, users without a
+    # PAN are rejected (PAN_MISSING) rather than given one. Connections are
+    # pooled and kept alive per worker; batches pull at most
+    # BUREAU_MAX_CONNECTIONS at a time. BUREAU_TIMEOUT_SECONDS bounds each
+    # pull, including the wait for a free connection.
+    TRANSUNION_API_URL: str | None = None
+    TRANSUNION_API_KEY: str | None = None
+    BUREAU_TIMEOUT_SECONDS: float = 10
+    BUREAU_MAX_CONNECTIONS: int = 20
+    BUREAU_MAX_KEEPALIVE: int = 10
+
+    # A pulled credit profile is valid for this long; checks on an expired
+    # one pull again. The re-scoring scheduler refreshes profiles of users
+    # with an eligibility record RESCORE_LEAD_SECONDS before they expire:
+    # at most RESCORE_BATCH_SIZE users per tick, RESCORE_MAX_CONCURRENCY
+    # pulls at a time, a tick every RESCORE_INTERVAL_SECONDS (0 leaves it
+    # to `manage.py rescore-due`). A user whose pull fails is retried after
+    # RESCORE_RETRY_SECONDS; one without a PAN is not retried while the
+    # profile is in the re-scoring window. Enable it in one process only;
+    # every process that runs it repeats the same pulls.
+    CREDIT_PROFILE_VALIDITY_DAYS: int = 30
+    RESCORE_LEAD_SECONDS: int = 3 * 24 * 3600
+    RESCORE_BATCH_SIZE: int = 200
+    RESCORE_MAX_CONCURRENCY: int = 4
+    RESCORE_INTERVAL_SECONDS: int = 0
+    RESCORE_RETRY_SECONDS: int = 3600
+
+    # Credit profile retention: keep each user's latest N profiles (plus any
+    # an eligibility record uses) and archive the rest, sweeping this many
+    # users per transaction. Workers sweep every INTERVAL seconds; 0 leaves
+    # it to `manage.py prune-credit-profiles`.
+    CREDIT_RETENTION_KEEP: int = 5
+    CREDIT_RETENTION_BATCH_SIZE: int = 500
+    CREDIT_RETENTION_INTERVAL_SECONDS: int = 0
+
+    # Cache-Control max-age on the polled result endpoints. Clients then
+    # revalidate with If-None-Match and get a 304 while nothing changed.
+    RESULT_CACHE_MAX_AGE_SECONDS: int = 0
+
+    # /internal/* operational views require this token in X-Internal-Token;
+    # while it is unset they are not served at all (404).
+    INTERNAL_API_TOKEN: str | None = None
+
+    # Idempotency-Key on mutating requests: responses are kept for
+    # IDEMPOTENCY_TTL_SECONDS (0 disables) in a per-worker cache and the
+    # idempotency_keys table. A worker renews its claim on a key while it
+    # runs the request; the claim lapses IDEMPOTENCY_LOCK_SECONDS after the
+    # last renewal (a crashed worker). Larger responses are not kept.
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 3600
+    IDEMPOTENCY_CACHE_SIZE: int = 10_000
+    IDEMPOTENCY_LOCK_SECONDS: int = 60
+    IDEMPOTENCY_MAX_RESPONSE_BYTES: int = 1_000_000
+
+    # Admission control, per worker. ADMISSION_LIMITS holds token buckets
+    # per route group (see core.admission.ROUTE_GROUPS), keyed by user_id
+    # and/or client IP; a missing entry means no bucket. Per-IP buckets
+    # need the real client address (uvicorn --proxy-headers behind a
+    # proxy). Load is shed with 503 while ADMISSION_MAX_IN_FLIGHT requests
+    # are running or the recent pool checkout wait passes
+    # ADMISSION_SHED_POOL_WAIT_SECONDS; 0 disables either check. Only the
+    # eligibility and credit groups have a user_id in the path; loan and
+    # batch requests carry it in the body, so they can only have per-IP
+    # buckets. Idempotent replays are never limited or shed.
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_LIMITS: dict[str, dict[str, float]] = {
+        "eligibility": {"user_per_minute": 10, "user_burst": 5},
+        "credit":      {"user_per_minute": 5, "user_burst": 3},
+    }
+    ADMISSION_MAX_BUCKETS: int = 100_000
+    ADMISSION_MAX_IN_FLIGHT: int = 256
+    ADMISSION_SHED_POOL_WAIT_SECONDS: float = 1.0
+    ADMISSION_SHED_RETRY_AFTER_SECONDS: int = 2
+
     model_config = SettingsConfigDict(
         env_file=str(Path(__file__).parent.parent.parent / ".env"),
         extra="ignore"
@@ -12,4 +116,4 @@ class Settings(BaseSettings):
 
 @lru_cache
 def get_settings():
-    return Settings()
\ No newline at end of file
+    return Settings()
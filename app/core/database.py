@@ -1,14 +1,21 @@
+from contextlib import asynccontextmanager
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker, DeclarativeBase, Session
+from starlette.concurrency import run_in_threadpool
 from .config import get_settings
+from .metrics import instrument_engine
+from .pool import engine_options
 
 settings = get_settings()
 
 engine = create_engine(
     settings.DATABASE_URL,
     echo=False,
-    pool_pre_ping=True
+    **engine_options(settings.DATABASE_URL, settings),
 )
+instrument_engine(engine, "sync")
 
 SessionLocal = sessionmaker(
     bind=engine,
@@ -24,4 +31,94 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+ASYNC_DRIVERS = {
+    "postgresql+psycopg2://": "postgresql+asyncpg://",
+    "postgresql://":          "postgresql+asyncpg://",
+    "sqlite://":              "sqlite+aiosqlite://",
+}
+
+def async_database_url(url: str) -> str:
+    for sync_prefix, async_prefix in ASYNC_DRIVERS.items():
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix):]
+    return url
+
+async_engine      = None
+AsyncSessionLocal = None
+
+if settings.ASYNC_DB:
+    async_url    = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(
+        async_url,
+        echo=False,
+        **engine_options(async_url, settings, is_async=True),
+    )
+    instrument_engine(async_engine.sync_engine, "async")
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+@asynccontextmanager
+async def open_session():
+    """Session outside a request dependency, e.g. for streaming response bodies."""
+    if settings.ASYNC_DB:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        await run_in_threadpool(db.close)
+
+# Session dependency used by the routers; ASYNC_DB picks the flavour.
+AnySession  = Session | AsyncSession
+get_session = get_async_db if settings.ASYNC_DB else get_db
+
+async def run_db(db: AnySession, fn, *args, **kwargs):
+    """
+    Runs sync repository/service code ``fn(session, *args)`` from an async
+    route. On an AsyncSession it runs via run_sync on the event loop (IO is
+    awaited through greenlets, no thread is held); on a sync Session it
+    runs in the threadpool, as a plain ``def`` route would.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+def commit_keeping_loaded(db: Session) -> None:
+    """
+    Commits without expiring the session's instances. For repositories that
+    return rows they have just written with INSERT ... RETURNING, whose
+    state is already current; a plain commit would reload them on the next
+    attribute access.
+    """
+    expire_on_commit, db.expire_on_commit = db.expire_on_commit, False
+    try:
+        db.commit()
+    finally:
+        db.expire_on_commit = expire_on_commit
+
+UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite":     sqlite.insert,
+}
+
+def supports_upsert(db: Session) -> bool:
+    """
+    True when the session's dialect has INSERT ... ON CONFLICT. Repositories
+    fall back to select-then-insert/update on other dialects.
+    """
+    return db.get_bind().dialect.name in UPSERT_INSERTS
+
+def upsert_insert(db: Session, model):
+    """INSERT construct supporting ON CONFLICT; check supports_upsert() first."""
+    return UPSERT_INSERTS[db.get_bind().dialect.name](model)
@@ -0,0 +1,276 @@
+"""
+Idempotency-Key support for mutating requests.
+
+Clients retry POSTs such as an eligibility check or a loan calculation on
+timeouts. With an Idempotency-Key header the first request runs and its
+response is kept; retries with the same key get that response back
+(marked Idempotent-Replayed: true) without touching the route again.
+
+Lookups go to a per-worker TTLCache first and then the idempotency_keys
+table, which also lets a worker claim a key before running it. The claim
+carries a random token and is renewed while the request runs, so it only
+lapses (after IDEMPOTENCY_LOCK_SECONDS) when its worker is gone; a worker
+whose claim was taken over anyway cannot store over or release the new
+owner's. Duplicates arriving at the same worker while the first request is
+still running wait for it and share its response; a duplicate on another
+worker gets 409 with Retry-After. A key reused with a different body or
+query string gets 422.
+
+This middleware sits outside AdmissionMiddleware, so replays are served
+without being rate limited or shed. 5xx responses (including load
+shedding's 503), 429s from rate limiting and responses over
+IDEMPOTENCY_MAX_RESPONSE_BYTES are not kept, so the next retry runs the
+request again.
+"""
+import asyncio
+import hashlib
+import secrets
+from dataclasses import dataclass
+
+from starlette.responses import JSONResponse
+
+from core.cache import TTLCache
+from core.config import get_settings
+from core.database import open_session, run_db
+from core.metrics import IDEMPOTENT_REQUESTS
+from repositories.idempotency_repo import IdempotencyRepository
+
+HEADER = b"idempotency-key"
+REPLAYED_HEADER = (b"idempotent-replayed", b"true")
+MAX_KEY_LENGTH = 255
+MUTATING_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+RATE_LIMITED = 429
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    request_hash: str
+    status_code : int
+    headers     : tuple[tuple[bytes, bytes], ...]
+    body        : bytes
+
+    @classmethod
+    def from_record(cls, record) -> "StoredResponse":
+        return cls(
+            request_hash = record.request_hash,
+            status_code  = record.status_code,
+            headers      = tuple((name.encode("latin-1"), value.encode("latin-1")) for name, value in record.headers),
+            body         = record.body,
+        )
+
+    def header_list(self) -> list[list[str]]:
+        return [[name.decode("latin-1"), value.decode("latin-1")] for name, value in self.headers]
+
+
+def _digest(*parts: bytes) -> str:
+    hasher = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        hasher.update(len(part).to_bytes(8, "big"))
+        hasher.update(part)
+    return hasher.hexdigest()
+
+
+def _error(status_code: int, detail: str, headers: dict[str, str] | None = None) -> JSONResponse:
+    return JSONResponse({"detail": detail}, status_code=status_code, headers=headers)
+
+
+class IdempotencyMiddleware:
+    """Pure ASGI, like MetricsMiddleware; requests without the header pass straight through."""
+
+    def __init__(self, app):
+        self.app       = app
+        self.settings  = get_settings()
+        self.responses = TTLCache(
+            maxsize     = self.settings.IDEMPOTENCY_CACHE_SIZE,
+            ttl_seconds = self.settings.IDEMPOTENCY_TTL_SECONDS,
+        )
+        self._in_flight: dict[str, asyncio.Future] = {}
+
+    async def __call__(self, scope, receive, send):
+        key = None
+        if (
+            scope["type"] == "http"
+            and scope["method"] in MUTATING_METHODS
+            and self.settings.IDEMPOTENCY_TTL_SECONDS > 0
+        ):
+            key = dict(scope["headers"]).get(HEADER)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await _error(400, f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters.")(scope, receive, send)
+            return
+
+        body = await self._read_body(receive)
+        if body is None:                    # client went away
+            return
+
+        key_hash     = _digest(scope["method"].encode(), scope["path"].encode(), key)
+        request_hash = _digest(scope.get("query_string", b""), body)
+
+        stored = self.responses.get(key_hash)
+        if stored is not None:
+            await self._replay(stored, request_hash, "replayed", scope, receive, send)
+            return
+
+        running = self._in_flight.get(key_hash)
+        if running is not None:
+            stored = await asyncio.shield(running)
+            if stored is not None:
+                await self._replay(stored, request_hash, "attached", scope, receive, send)
+                return
+
+        await self._run(key_hash, request_hash, body, scope, receive, send)
+
+    async def _run(self, key_hash, request_hash, body, scope, receive, send):
+        """Claims the key, runs the request and keeps its response."""
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key_hash] = future
+        token   = secrets.token_hex(16)
+        claimed = False
+        shared  = None
+        try:
+            async with open_session() as db:
+                existing = await run_db(
+                    db,
+                    IdempotencyRepository.claim,
+                    key_hash,
+                    request_hash,
+                    token,
+                    self.settings.IDEMPOTENCY_LOCK_SECONDS,
+                    self.settings.IDEMPOTENCY_TTL_SECONDS,
+                )
+            if existing is not None and existing.status_code is not None:
+                shared = StoredResponse.from_record(existing)
+                self.responses.set(key_hash, shared)
+                await self._replay(shared, request_hash, "replayed", scope, receive, send)
+                return
+            if existing is not None:
+                IDEMPOTENT_REQUESTS.labels("in_progress").inc()
+                await _error(
+                    409,
+                    "A request with this Idempotency-Key is still being processed.",
+                    headers={"Retry-After": "1"},
+                )(scope, receive, send)
+                return
+
+            claimed   = True
+            heartbeat = asyncio.ensure_future(self._keep_claim(key_hash, token))
+            try:
+                captured = await self._capture(scope, self._replay_body(body, receive), send)
+            finally:
+                heartbeat.cancel()
+                await asyncio.gather(heartbeat, return_exceptions=True)
+            IDEMPOTENT_REQUESTS.labels("executed").inc()
+            if captured is not None:
+                shared = StoredResponse(request_hash, *captured)
+            if shared is None or shared.status_code >= 500 or shared.status_code == RATE_LIMITED:
+                claimed = False
+                await self._release(key_hash, token)
+                return
+
+            async with open_session() as db:
+                stored = await run_db(
+                    db,
+                    IdempotencyRepository.complete,
+                    key_hash,
+                    token,
+                    shared.status_code,
+                    shared.header_list(),
+                    shared.body,
+                )
+            claimed = False
+            if stored:
+                self.responses.set(key_hash, shared)
+            else:
+                IDEMPOTENT_REQUESTS.labels("claim_lost").inc()
+        except BaseException:
+            if claimed:
+                await asyncio.shield(self._release(key_hash, token))
+            raise
+        finally:
+            self._in_flight.pop(key_hash, None)
+            future.set_result(shared)
+
+    async def _capture(self, scope, receive, send):
+        """Runs the app, passing its response through; (status, headers, body) or None if too large."""
+        limit    = self.settings.IDEMPOTENCY_MAX_RESPONSE_BYTES
+        start    = None
+        chunks   = []
+        size     = 0
+        overflow = False
+
+        async def capture(message):
+            nonlocal start, size, overflow
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body" and not overflow:
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                if size > limit:
+                    overflow = True
+                    chunks.clear()
+                else:
+                    chunks.append(chunk)
+            await send(message)
+
+        await self.app(scope, receive, capture)
+        if start is None or overflow:
+            return None
+        return start["status"], tuple(start.get("headers", ())), b"".join(chunks)
+
+    async def _replay(self, stored: StoredResponse, request_hash: str, outcome: str, scope, receive, send):
+        if stored.request_hash != request_hash:
+            IDEMPOTENT_REQUESTS.labels("mismatch").inc()
+            await _error(
+                422,
+                "Idempotency-Key was already used with a different request.",
+            )(scope, receive, send)
+            return
+
+        IDEMPOTENT_REQUESTS.labels(outcome).inc()
+        await send({
+            "type":    "http.response.start",
+            "status":  stored.status_code,
+            "headers": [*stored.headers, REPLAYED_HEADER],
+        })
+        await send({"type": "http.response.body", "body": stored.body})
+
+    async def _keep_claim(self, key_hash: str, token: str) -> None:
+        """Renews the claim every third of IDEMPOTENCY_LOCK_SECONDS until cancelled or lost."""
+        lock_seconds = self.settings.IDEMPOTENCY_LOCK_SECONDS
+        while True:
+            await asyncio.sleep(lock_seconds / 3)
+            async with open_session() as db:
+                if not await run_db(db, IdempotencyRepository.renew, key_hash, token, lock_seconds):
+                    return
+
+    async def _release(self, key_hash: str, token: str) -> None:
+        async with open_session() as db:
+            await run_db(db, IdempotencyRepository.release, key_hash, token)
+
+    @staticmethod
+    async def _read_body(receive) -> bytes | None:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return None
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    @staticmethod
+    def _replay_body(body: bytes, receive):
+        """Hands the already-read body to the app once, then defers to the real channel."""
+        pending = True
+
+        async def replay():
+            nonlocal pending
+            if pending:
+                pending = False
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return replay
@@ -0,0 +1,227 @@
+"""
+Always-on Prometheus instrumentation: per-route latency, per-request SQL
+statement count and DB time, and engine-wide statement/commit counters.
+
+Per-request DB figures are accumulated in a context variable set by
+MetricsMiddleware. Sync route code runs in the threadpool with a copy of
+the request context and AsyncSession.run_sync stays on the request task,
+so cursor events fired on either path land on the right request.
+"""
+import os
+import time
+from contextvars import ContextVar
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.requests import Request
+from starlette.responses import Response
+
+from .pool import pool_status
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUEST_LATENCY = Histogram(
+    "lsp_http_request_duration_seconds",
+    "HTTP request latency, including streamed response bodies.",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+REQUEST_SQL_STATEMENTS = Histogram(
+    "lsp_http_request_sql_statements",
+    "SQL statements executed while serving one request.",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100, 500),
+)
+REQUEST_DB_TIME = Histogram(
+    "lsp_http_request_db_seconds",
+    "Cumulative cursor execution time while serving one request.",
+    ["method", "route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+SQL_STATEMENTS = Counter(
+    "lsp_db_statements_total",
+    "SQL statements executed, in and out of requests.",
+    ["engine"],
+)
+SQL_TIME = Counter(
+    "lsp_db_execute_seconds_total",
+    "Cursor execution time, in and out of requests.",
+    ["engine"],
+)
+COMMITS = Counter(
+    "lsp_db_commits_total",
+    "Transactions committed.",
+    ["engine"],
+)
+ROLLBACKS = Counter(
+    "lsp_db_rollbacks_total",
+    "Transactions rolled back, including pool resets of idle transactions.",
+    ["engine"],
+)
+
+BUREAU_REQUEST_SECONDS = Histogram(
+    "lsp_bureau_request_seconds",
+    "Credit bureau round trips, including response parsing.",
+    ["outcome"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+BUREAU_COALESCED = Counter(
+    "lsp_bureau_coalesced_total",
+    "Bureau pulls served by joining an in-flight pull for the same PAN.",
+)
+
+IDEMPOTENT_REQUESTS = Counter(
+    "lsp_idempotent_requests_total",
+    "Requests sent with an Idempotency-Key, by how they were answered.",
+    ["outcome"],
+)
+
+ADMISSION_REJECTED = Counter(
+    "lsp_admission_rejected_total",
+    "Requests turned away by admission control, by route group and reason.",
+    ["group", "reason"],
+)
+
+
+class RequestDbStats:
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds    = 0.0
+
+
+_request_db_stats: ContextVar[RequestDbStats | None] = ContextVar("request_db_stats", default=None)
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Counts statements, cursor time, commits and rollbacks on ``engine``."""
+    statements = SQL_STATEMENTS.labels(name)
+    seconds    = SQL_TIME.labels(name)
+    commits    = COMMITS.labels(name)
+    rollbacks  = ROLLBACKS.labels(name)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_started
+        statements.inc()
+        seconds.inc(elapsed)
+
+        stats = _request_db_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.seconds    += elapsed
+
+    @event.listens_for(engine, "commit")
+    def _commit(conn):
+        commits.inc()
+
+    @event.listens_for(engine, "rollback")
+    def _rollback(conn):
+        rollbacks.inc()
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware task hop), so the request
+    context, and the DB stats in it, is shared with the endpoint.
+    Routes are labelled by their template, e.g. /api/v1/credit/{user_id}.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats   = RequestDbStats()
+        token   = _request_db_stats.set(stats)
+        status  = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_db_stats.reset(token)
+
+            route  = scope.get("route")
+            label  = getattr(route, "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            REQUEST_LATENCY.labels(method, label, str(status)).observe(elapsed)
+            REQUEST_SQL_STATEMENTS.labels(method, label).observe(stats.statements)
+            REQUEST_DB_TIME.labels(method, label).observe(stats.seconds)
+
+
+class PoolCollector:
+    """Pool occupancy and checkout waits, read from the pools at scrape time."""
+
+    def __init__(self, engines: dict[str, Engine]):
+        self.engines = engines
+
+    def collect(self):
+        gauges = {
+            key: GaugeMetricFamily(f"lsp_db_pool_{key}", help_text, labels=["engine"])
+            for key, help_text in (
+                ("size",        "Configured pool size."),
+                ("checked_out", "Connections currently checked out."),
+                ("idle",        "Connections idle in the pool."),
+                ("overflow",    "Connections open beyond the pool size."),
+            )
+        }
+        checkouts = CounterMetricFamily("lsp_db_pool_checkouts", "Connection checkouts.", labels=["engine"])
+        timeouts  = CounterMetricFamily("lsp_db_pool_checkout_timeouts", "Checkouts that timed out.", labels=["engine"])
+        waited    = CounterMetricFamily("lsp_db_pool_checkout_wait_seconds", "Time spent waiting for checkouts.", labels=["engine"])
+
+        for name, engine in self.engines.items():
+            status = pool_status(engine)
+            for key, gauge in gauges.items():
+                if key in status:
+                    gauge.add_metric([name], status[key])
+            if "checkouts" in status:
+                checkouts.add_metric([name], status["checkouts"])
+                timeouts.add_metric([name], status["checkout_timeouts"])
+                waited.add_metric([name], status["wait_seconds_total"])
+
+        yield from gauges.values()
+        yield checkouts
+        yield timeouts
+        yield waited
+
+
+def register_pool_collector(engines: dict[str, Engine]) -> None:
+    REGISTRY.register(PoolCollector(engines))
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """
+    Prometheus text exposition. With PROMETHEUS_MULTIPROC_DIR set (gunicorn
+    and friends), the per-process metric files are aggregated instead.
+    """
+    registry = REGISTRY
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,137 @@
+import math
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Half-life of the recent checkout wait: how fast it falls back to zero once
+# checkouts stop waiting (or stop happening, e.g. while load is shed).
+RECENT_WAIT_HALF_LIFE_SECONDS = 5.0
+RECENT_WAIT_WEIGHT            = 0.2
+
+
+class PoolWaitStats:
+    """Thread-safe counters of how long callers waited to check out a connection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts          = 0
+        self.timeouts           = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max   = 0.0
+        self._recent            = 0.0
+        self._recent_at         = time.monotonic()
+
+    def record(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max    = max(self.wait_seconds_max, seconds)
+
+            now = time.monotonic()
+            self._recent    = self._decayed(now) * (1 - RECENT_WAIT_WEIGHT) + seconds * RECENT_WAIT_WEIGHT
+            self._recent_at = now
+
+    def _decayed(self, now: float) -> float:
+        return self._recent * math.pow(0.5, (now - self._recent_at) / RECENT_WAIT_HALF_LIFE_SECONDS)
+
+    def recent_wait_seconds(self) -> float:
+        """Moving average of checkout waits, decaying while nothing is checked out."""
+        with self._lock:
+            return self._decayed(time.monotonic())
+
+    def stats(self) -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts":           self.checkouts,
+                "checkout_timeouts":   self.timeouts,
+                "wait_seconds_total":  round(self.wait_seconds_total, 6),
+                "wait_seconds_avg":    round(self.wait_seconds_total / attempts, 6) if attempts else 0.0,
+                "wait_seconds_max":    round(self.wait_seconds_max, 6),
+                "wait_seconds_recent": round(self._decayed(time.monotonic()), 6),
+            }
+
+
+class _TimedCheckout:
+    # Class-level so the counters survive Pool.recreate(), which rebuilds
+    # the pool from self.__class__ with only the stock arguments.
+    wait_stats: PoolWaitStats
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.wait_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - started)
+        return connection
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    wait_stats = PoolWaitStats()
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    wait_stats = PoolWaitStats()
+
+
+def recent_checkout_wait() -> float:
+    """Largest recent checkout wait across this worker's sync and async pools."""
+    return max(TimedQueuePool.wait_stats.recent_wait_seconds(), TimedAsyncQueuePool.wait_stats.recent_wait_seconds())
+
+
+def engine_options(url: str, settings, is_async: bool = False) -> dict:
+    """
+    create_engine() keyword arguments for the pool and statement-timeout
+    settings. In-memory SQLite keeps its single-connection pool.
+    """
+    parsed  = make_url(url)
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return options
+
+    options.update(
+        poolclass     = TimedAsyncQueuePool if is_async else TimedQueuePool,
+        pool_size     = settings.DB_POOL_SIZE,
+        max_overflow  = settings.DB_MAX_OVERFLOW,
+        pool_timeout  = settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle  = settings.DB_POOL_RECYCLE_SECONDS,
+        pool_use_lifo = True,
+    )
+
+    timeout_ms = settings.DB_STATEMENT_TIMEOUT_MS
+    if timeout_ms and parsed.get_backend_name() == "postgresql":
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(timeout_ms)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout_ms}"}
+
+    return options
+
+
+def pool_status(engine: Engine) -> dict:
+    """Point-in-time occupancy of an engine's pool plus its checkout wait counters."""
+    pool   = engine.pool
+    status = {"pool_class": type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        status.update(
+            size         = pool.size(),
+            checked_out  = pool.checkedout(),
+            idle         = pool.checkedin(),
+            overflow     = max(pool.overflow(), 0),
+            max_overflow = pool._max_overflow,
+            timeout      = pool.timeout(),
+        )
+    if isinstance(pool, _TimedCheckout):
+        status.update(pool.wait_stats.stats())
+
+    return status
@@ -0,0 +1,48 @@
+"""
+orjson-backed JSON responses.
+
+FastJSONResponse is the app-wide default response class. Handlers on the
+hot read paths return it (or pre-rendered bytes) directly, which skips
+FastAPI's jsonable_encoder / response-model pass over data that was built
+from trusted ORM rows.
+
+Output matches what the default encoder produced: Decimals as floats,
+enums by value, datetimes in ISO 8601 with UTC written as "Z".
+"""
+from decimal import Decimal
+
+import orjson
+from starlette.responses import JSONResponse, Response
+
+_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, default=_default, option=_OPTIONS)
+
+
+def fragment(**members) -> bytes:
+    """Pre-serialized ``"key":value`` members, to be spliced into objects."""
+    return dumps(members)[1:-1]
+
+
+def splice(fields: dict, *fragments: bytes) -> bytes:
+    """One JSON object from ``fields`` followed by pre-serialized fragments."""
+    members = [dumps(fields)[1:-1], *fragments]
+    return b"{" + b",".join(member for member in members if member) + b"}"
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+class RawJSONResponse(Response):
+    """Body that is already JSON bytes, e.g. from splice()."""
+    media_type = "application/json"
@@ -1,13 +1,25 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from core.database import engine, Base
+from core import database
+from core.admission import AdmissionMiddleware
+from core.config import get_settings
+from core.idempotency import IdempotencyMiddleware
+from core.responses import FastJSONResponse
+from core.metrics import MetricsMiddleware, metrics_endpoint, register_pool_collector
 from models import (
     user_profile,
     dummy_pan,
     kyc_pan,
     credit_profile,
     credit_account,
+    credit_report,
+    credit_profile_archive,
     loan_eligibility,
     loan_calculation,
+    eligibility_policy,
+    idempotency_key,
 )  
 from routers import user_profile
 from routers.credit_route import router as credit_router
@@ -15,9 +27,47 @@ from routers.eligibility_route import router as eligibility_router
 from routers.eligibility_result import router as eligibility_result_router
 from routers.loan_calculator_route import router as loan_calculator_router
 from routers.loan_calculator_result import router as loan_router
+from routers.internal_route import router as internal_router
+from services.bureau_client import close_bureau_client
+from services.credit_retention import run_retention_loop
+from services.rescoring import run_rescoring_loop
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = get_settings()
+    background = []
+    if settings.CREDIT_RETENTION_INTERVAL_SECONDS > 0:
+        background.append(asyncio.create_task(run_retention_loop(settings.CREDIT_RETENTION_INTERVAL_SECONDS)))
+    if settings.RESCORE_INTERVAL_SECONDS > 0:
+        background.append(asyncio.create_task(run_rescoring_loop(settings.RESCORE_INTERVAL_SECONDS)))
+
+    yield
+
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    await close_bureau_client()
+
+
+app = FastAPI(
+    title                  = "Loan Service Provider API",
+    default_response_class = FastJSONResponse,
+    lifespan               = lifespan,
+)
+# Outermost last: Metrics → Idempotency → Admission → routes. Replays of a
+# stored Idempotency-Key response are answered before admission, so a
+# client retrying a request that already ran is never rate limited or shed.
+app.add_middleware(AdmissionMiddleware)
+app.add_middleware(IdempotencyMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
 
-app = FastAPI(title="Loan Service Provider API")
-Base.metadata.create_all(bind=engine)
+register_pool_collector(
+    {"sync": database.engine}
+    if database.async_engine is None
+    else {"sync": database.engine, "async": database.async_engine.sync_engine}
+)
 
 app.include_router(user_profile.router, prefix="/users", tags=["Users"])
 app.include_router(credit_router, prefix="/api/v1/credit", tags=["Credit Profile"])
@@ -25,8 +75,9 @@ app.include_router(eligibility_router, prefix="/api/v1/eligibility", tags=["Loan
 app.include_router(eligibility_result_router, prefix="/api/v1/eligibility-result", tags=["Loan Eligibility"])
 app.include_router(loan_calculator_router, prefix="/api/v1/loan", tags=["Loan Calculator"])
 app.include_router(loan_router, prefix="/api/v1/loan", tags=["Loan Calculator"])
+app.include_router(internal_router, prefix="/internal", tags=["Internal"])
 
 
 @app.get("/")
-def root():
+async def root():
     return {"status": "LSP backend running"}
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""
+Schema management commands. Run from the app/ directory:
+
+    python manage.py migrate [revision]     # default: head
+    python manage.py downgrade <revision>
+    python manage.py stamp <revision>       # mark an existing database
+    python manage.py current
+    python manage.py check                  # fail if the models and migrations differ
+    python manage.py prune-credit-profiles [--keep N] [--batch-size N] [--max-batches N]
+    python manage.py rescore-due [--limit N] [--loop]
+    python manage.py purge-idempotency-keys [--batch-size N]
+    python manage.py credit-report <credit_profile_id>   # raw bureau response, for audits
+"""
+import argparse
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+
+ALEMBIC_INI = Path(__file__).resolve().parent / "alembic.ini"
+
+
+def alembic_config() -> Config:
+    return Config(str(ALEMBIC_INI))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Loan Service Provider schema management")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate = commands.add_parser("migrate", help="Upgrade the database schema")
+    migrate.add_argument("revision", nargs="?", default="head")
+
+    downgrade = commands.add_parser("downgrade", help="Revert the database schema")
+    downgrade.add_argument("revision")
+
+    stamp = commands.add_parser("stamp", help="Record a revision without running it")
+    stamp.add_argument("revision")
+
+    commands.add_parser("current", help="Show the applied revision")
+    commands.add_parser("check", help="Fail if the models differ from the migrated schema")
+
+    prune = commands.add_parser("prune-credit-profiles", help="Archive credit profiles beyond the retention limit")
+    prune.add_argument("--keep", type=int, help="Profiles kept per user (default: CREDIT_RETENTION_KEEP)")
+    prune.add_argument("--batch-size", type=int, help="Users per transaction (default: CREDIT_RETENTION_BATCH_SIZE)")
+    prune.add_argument("--max-batches", type=int, help="Stop after this many batches")
+
+    rescore = commands.add_parser("rescore-due", help="Refresh credit profiles nearing expiry and re-score their users")
+    rescore.add_argument("--limit", type=int, help="Users per batch (default: RESCORE_BATCH_SIZE)")
+    rescore.add_argument("--loop", action="store_true", help="Keep going until no user is due")
+
+    purge = commands.add_parser("purge-idempotency-keys", help="Delete expired Idempotency-Key responses")
+    purge.add_argument("--batch-size", type=int, default=1000, help="Rows per transaction")
+
+    report = commands.add_parser("credit-report", help="Print the raw bureau response behind a credit profile")
+    report.add_argument("credit_profile_id", type=int)
+
+    args   = parser.parse_args(argv)
+    config = alembic_config()
+
+    if args.command == "migrate":
+        command.upgrade(config, args.revision)
+    elif args.command == "downgrade":
+        command.downgrade(config, args.revision)
+    elif args.command == "stamp":
+        command.stamp(config, args.revision)
+    elif args.command == "current":
+        command.current(config, verbose=True)
+    elif args.command == "check":
+        command.check(config)
+    elif args.command == "prune-credit-profiles":
+        from services.credit_retention import CreditRetentionService
+
+        try:
+            stats = CreditRetentionService.prune(args.keep, args.batch_size, args.max_batches)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"Archived {stats.archived} credit profiles of {stats.users} users in {stats.batches} batches.")
+    elif args.command == "rescore-due":
+        import asyncio
+
+        from services.bureau_client import close_bureau_client
+        from services.rescoring import rescore_due
+
+        async def run():
+            try:
+                while True:
+                    stats = await rescore_due(args.limit)
+                    print(f"Re-scored {stats.rescored} of {stats.due} due users ({stats.failed} bureau failures).")
+                    if not args.loop or not stats.rescored:
+                        return
+            finally:
+                await close_bureau_client()
+
+        asyncio.run(run())
+    elif args.command == "purge-idempotency-keys":
+        from core.database import SessionLocal
+        from repositories.idempotency_repo import IdempotencyRepository
+
+        purged = 0
+        while True:
+            with SessionLocal() as db:
+                deleted = IdempotencyRepository.purge_expired(db, args.batch_size)
+            purged += deleted
+            if deleted < args.batch_size:
+                break
+        print(f"Purged {purged} expired idempotency keys.")
+    elif args.command == "credit-report":
+        import json
+
+        from core.database import SessionLocal
+        from repositories.credit_repository import CreditRepository
+
+        with SessionLocal() as db:
+            raw = CreditRepository.get_raw_report(db, args.credit_profile_id)
+        if raw is None:
+            raise SystemExit(f"No raw bureau report stored for credit profile {args.credit_profile_id}.")
+        print(json.dumps(raw, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+from core.database import Base, engine
+from models import (  # noqa: F401  (registers every table on Base.metadata)
+    user_profile,
+    dummy_pan,
+    kyc_pan,
+    credit_profile,
+    credit_account,
+    credit_report,
+    credit_profile_archive,
+    loan_eligibility,
+    loan_calculation,
+    eligibility_policy,
+    idempotency_key,
+)
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=engine.url.render_as_string(hide_password=False),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
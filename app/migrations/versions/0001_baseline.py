@@ -0,0 +1,139 @@
+"""Baseline schema: every table as it stood before migrations were introduced.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18
+
+Databases that were bootstrapped by the old create_all() call already have
+this shape; mark them with ``python manage.py stamp 0001_baseline`` instead
+of running it.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The user / PAN tables predate migrations. They are written out here
+    # rather than taken from the models, so this revision keeps creating the
+    # same schema when those models change; `manage.py check` reports drift.
+    op.create_table(
+        "user_profiles",
+        sa.Column("user_id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("full_name", sa.String(100), nullable=True),
+        sa.Column("pan_number", sa.String(10), nullable=True),
+        sa.Column("pan_status", sa.String(20), nullable=True),
+        sa.Column("monthly_income", sa.DECIMAL(12, 2), nullable=True),
+    )
+
+    op.create_table(
+        "dummy_pans",
+        sa.Column("pan_number", sa.String(10), primary_key=True),
+        sa.Column("full_name", sa.String(100), nullable=True),
+    )
+
+    op.create_table(
+        "kyc_pan_verifications",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("user_id", sa.BigInteger(), sa.ForeignKey("user_profiles.user_id"), nullable=False),
+        sa.Column("pan_number", sa.String(10), nullable=False),
+        sa.Column("status", sa.String(20), nullable=True),
+        sa.Column("verified_at", sa.DateTime(), nullable=True),
+    )
+
+    op.create_table(
+        "credit_profiles",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("user_id", sa.BigInteger(), sa.ForeignKey("user_profiles.user_id"), nullable=False),
+        sa.Column("bureau_name", sa.String(50), nullable=False),
+        sa.Column("credit_score", sa.BigInteger(), nullable=False),
+        sa.Column("report_reference_id", sa.String(100), nullable=True),
+        sa.Column("total_active_loans", sa.BigInteger(), nullable=True),
+        sa.Column("total_existing_emi", sa.DECIMAL(12, 2), nullable=True),
+        sa.Column("bureau_raw_response", sa.JSON(), nullable=True),
+        sa.Column("pulled_at", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=True),
+    )
+
+    op.create_table(
+        "credit_accounts",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("credit_profile_id", sa.BigInteger(), sa.ForeignKey("credit_profiles.id"), nullable=False),
+        sa.Column("loan_type", sa.String(30), nullable=True),
+        sa.Column("emi_amount", sa.DECIMAL(12, 2), nullable=True),
+        sa.Column("status", sa.String(20), nullable=True),
+    )
+
+    op.create_table(
+        "loan_eligibility",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("user_id", sa.BigInteger(), sa.ForeignKey("user_profiles.user_id"), nullable=False, unique=True),
+        sa.Column("credit_profile_id", sa.BigInteger(), sa.ForeignKey("credit_profiles.id"), nullable=True),
+        sa.Column("income_used", sa.DECIMAL(12, 2), nullable=True),
+        sa.Column("existing_emi", sa.DECIMAL(12, 2), nullable=True),
+        sa.Column("proposed_emi", sa.DECIMAL(12, 2), nullable=True),
+        sa.Column("foir_ratio", sa.DECIMAL(5, 4), nullable=True),
+        sa.Column("max_allowed_foir", sa.DECIMAL(5, 2), nullable=True),
+        sa.Column("credit_score_used", sa.BigInteger(), nullable=True),
+        sa.Column("previous_credit_score_used", sa.BigInteger(), nullable=True),
+        sa.Column("bureau_name", sa.String(50), nullable=True),
+        sa.Column("eligibility_status", sa.String(20), nullable=False),
+        sa.Column("failure_reason", sa.Text(), nullable=True),
+        sa.Column("max_eligible_amount", sa.DECIMAL(12, 2), nullable=True),
+        sa.Column("max_eligible_emi", sa.DECIMAL(12, 2), nullable=True),
+        sa.Column("previously_checked_at", sa.DateTime(), nullable=True),
+        sa.Column("latest_checked_at", sa.DateTime(), nullable=False),
+        sa.CheckConstraint(
+            "eligibility_status IN ('ELIGIBLE', 'REJECTED')",
+            name="loan_eligibility_status",
+        ),
+    )
+    op.create_index("ix_loan_eligibility_id", "loan_eligibility", ["id"], unique=True)
+
+    op.create_table(
+        "loan_calculations",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True, nullable=False),
+        sa.Column(
+            "user_id",
+            sa.BigInteger(),
+            sa.ForeignKey("user_profiles.user_id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("requested_amount", sa.Float(), nullable=False),
+        sa.Column("tenure_months", sa.Integer(), nullable=False),
+        sa.Column("eligible_amount", sa.Float(), nullable=False),
+        sa.Column("interest_rate_pa", sa.Float(), nullable=False),
+        sa.Column("monthly_emi", sa.Float(), nullable=False),
+        sa.Column("total_repayment", sa.Float(), nullable=False),
+        sa.Column("total_interest", sa.Float(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("CHECKED", "APPLIED", name="loancalcstatus"),
+            nullable=False,
+        ),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("previously_calculated", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_loan_calculations_id", "loan_calculations", ["id"])
+    op.create_index("ix_loan_calculations_user_id", "loan_calculations", ["user_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_loan_calculations_user_id", table_name="loan_calculations")
+    op.drop_index("ix_loan_calculations_id", table_name="loan_calculations")
+    op.drop_table("loan_calculations")
+    sa.Enum(name="loancalcstatus").drop(op.get_bind(), checkfirst=True)
+
+    op.drop_index("ix_loan_eligibility_id", table_name="loan_eligibility")
+    op.drop_table("loan_eligibility")
+    op.drop_table("credit_accounts")
+    op.drop_table("credit_profiles")
+
+    op.drop_table("kyc_pan_verifications")
+    op.drop_table("dummy_pans")
+    op.drop_table("user_profiles")
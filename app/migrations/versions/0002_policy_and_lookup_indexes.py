@@ -0,0 +1,48 @@
+"""Versioned eligibility policies and credit profile lookup indexes.
+
+Revision ID: 0002_policy_and_lookup_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_policy_and_lookup_indexes"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "eligibility_policies",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("version", sa.String(50), nullable=False, unique=True),
+        sa.Column("rules", sa.JSON(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+
+    with op.batch_alter_table("loan_eligibility") as batch:
+        batch.add_column(sa.Column("policy_version", sa.String(50), nullable=True))
+
+    op.create_index(
+        "ix_credit_profiles_user_id_pulled_at",
+        "credit_profiles",
+        ["user_id", sa.text("pulled_at DESC")],
+    )
+    op.create_index(
+        "ix_credit_accounts_credit_profile_id",
+        "credit_accounts",
+        ["credit_profile_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_credit_accounts_credit_profile_id", table_name="credit_accounts")
+    op.drop_index("ix_credit_profiles_user_id_pulled_at", table_name="credit_profiles")
+
+    with op.batch_alter_table("loan_eligibility") as batch:
+        batch.drop_column("policy_version")
+
+    op.drop_table("eligibility_policies")
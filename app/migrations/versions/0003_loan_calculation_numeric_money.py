@@ -0,0 +1,45 @@
+"""Store loan_calculations amounts as NUMERIC(12, 2) like every other money column.
+
+Revision ID: 0003_loan_calculation_numeric_money
+Revises: 0002_policy_and_lookup_indexes
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_loan_calculation_numeric_money"
+down_revision = "0002_policy_and_lookup_indexes"
+branch_labels = None
+depends_on = None
+
+MONEY_COLUMNS = (
+    "requested_amount",
+    "eligible_amount",
+    "monthly_emi",
+    "total_repayment",
+    "total_interest",
+)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("loan_calculations") as batch:
+        for column in MONEY_COLUMNS:
+            batch.alter_column(
+                column,
+                existing_type=sa.Float(),
+                type_=sa.DECIMAL(12, 2),
+                existing_nullable=False,
+                postgresql_using=f"round({column}::numeric, 2)",
+            )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("loan_calculations") as batch:
+        for column in MONEY_COLUMNS:
+            batch.alter_column(
+                column,
+                existing_type=sa.DECIMAL(12, 2),
+                type_=sa.Float(),
+                existing_nullable=False,
+                postgresql_using=f"{column}::double precision",
+            )
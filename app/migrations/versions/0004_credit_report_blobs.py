@@ -0,0 +1,126 @@
+"""Move raw bureau responses off credit_profiles into compressed credit_report_blobs.
+
+Revision ID: 0004_credit_report_blobs
+Revises: 0003_loan_calculation_numeric_money
+Create Date: 2026-10-18
+"""
+import gzip
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_credit_report_blobs"
+down_revision = "0003_loan_calculation_numeric_money"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+# Frozen copies of the tables as this revision sees them; the data steps
+# must not depend on the current models.
+credit_profiles = sa.table(
+    "credit_profiles",
+    sa.column("id", sa.BigInteger()),
+    sa.column("bureau_raw_response", sa.JSON()),
+)
+credit_report_blobs = sa.table(
+    "credit_report_blobs",
+    sa.column("credit_profile_id", sa.BigInteger()),
+    sa.column("encoding", sa.String()),
+    sa.column("raw_size", sa.BigInteger()),
+    sa.column("payload", sa.LargeBinary()),
+)
+
+
+def _encode(data) -> tuple[bytes, int]:
+    # Same format as Utils.report_codec at this revision.
+    raw = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+    return gzip.compress(raw, compresslevel=6, mtime=0), len(raw)
+
+
+def _copy_in_batches(select_page, write_page) -> None:
+    """Keyset-paged copy, so memory stays flat however many reports there are."""
+    bind    = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(select_page(last_id)).all()
+        if not rows:
+            return
+        write_page(bind, rows)
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "credit_report_blobs",
+        sa.Column(
+            "credit_profile_id",
+            sa.BigInteger(),
+            sa.ForeignKey("credit_profiles.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("encoding", sa.String(16), nullable=False),
+        sa.Column("raw_size", sa.BigInteger(), nullable=False),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+    )
+
+    def write_page(bind, rows):
+        values = []
+        for profile_id, data in rows:
+            if data is None:            # a JSON null: nothing to keep
+                continue
+            payload, raw_size = _encode(data)
+            values.append({
+                "credit_profile_id": profile_id,
+                "encoding":          "gzip",
+                "raw_size":          raw_size,
+                "payload":           payload,
+            })
+        if values:
+            bind.execute(credit_report_blobs.insert(), values)
+
+    _copy_in_batches(
+        lambda last_id: (
+            sa.select(credit_profiles.c.id, credit_profiles.c.bureau_raw_response)
+            .where(credit_profiles.c.id > last_id)
+            .where(credit_profiles.c.bureau_raw_response.isnot(None))
+            .order_by(credit_profiles.c.id)
+            .limit(BATCH_SIZE)
+        ),
+        write_page,
+    )
+
+    with op.batch_alter_table("credit_profiles") as batch:
+        batch.drop_column("bureau_raw_response")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("credit_profiles") as batch:
+        batch.add_column(sa.Column("bureau_raw_response", sa.JSON(), nullable=True))
+
+    def write_page(bind, rows):
+        for profile_id, encoding, payload in rows:
+            if encoding != "gzip":
+                raise RuntimeError(f"Cannot downgrade report {profile_id} with encoding {encoding}")
+            bind.execute(
+                credit_profiles.update()
+                .where(credit_profiles.c.id == profile_id)
+                .values(bureau_raw_response=json.loads(gzip.decompress(payload)))
+            )
+
+    _copy_in_batches(
+        lambda last_id: (
+            sa.select(
+                credit_report_blobs.c.credit_profile_id,
+                credit_report_blobs.c.encoding,
+                credit_report_blobs.c.payload,
+            )
+            .where(credit_report_blobs.c.credit_profile_id > last_id)
+            .order_by(credit_report_blobs.c.credit_profile_id)
+            .limit(BATCH_SIZE)
+        ),
+        write_page,
+    )
+
+    op.drop_table("credit_report_blobs")
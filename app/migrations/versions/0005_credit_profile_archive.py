@@ -0,0 +1,38 @@
+"""Archive table for credit profiles pruned by the retention sweep.
+
+Revision ID: 0005_credit_profile_archive
+Revises: 0004_credit_report_blobs
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_credit_profile_archive"
+down_revision = "0004_credit_report_blobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "credit_profile_archive",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=False),
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("bureau_name", sa.String(50), nullable=False),
+        sa.Column("credit_score", sa.BigInteger(), nullable=False),
+        sa.Column("report_reference_id", sa.String(100), nullable=True),
+        sa.Column("total_active_loans", sa.BigInteger(), nullable=True),
+        sa.Column("total_existing_emi", sa.DECIMAL(12, 2), nullable=True),
+        sa.Column("pulled_at", sa.DateTime(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index(
+        "ix_credit_profile_archive_user_id_pulled_at",
+        "credit_profile_archive",
+        ["user_id", "pulled_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_credit_profile_archive_user_id_pulled_at", table_name="credit_profile_archive")
+    op.drop_table("credit_profile_archive")
@@ -0,0 +1,57 @@
+"""Index credit_profiles.expires_at and backfill it for existing profiles.
+
+Revision ID: 0006_credit_profile_expiry_index
+Revises: 0005_credit_profile_archive
+Create Date: 2026-10-18
+"""
+from datetime import timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_credit_profile_expiry_index"
+down_revision = "0005_credit_profile_archive"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1_000
+
+# CREDIT_PROFILE_VALIDITY_DAYS default at this revision.
+VALIDITY = timedelta(days=30)
+
+credit_profiles = sa.table(
+    "credit_profiles",
+    sa.column("id", sa.BigInteger()),
+    sa.column("pulled_at", sa.DateTime()),
+    sa.column("expires_at", sa.DateTime()),
+)
+
+
+def upgrade() -> None:
+    # Profiles written before expiry was tracked get pulled_at + VALIDITY,
+    # computed in Python so the same revision runs on SQLite and PostgreSQL.
+    bind    = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(credit_profiles.c.id, credit_profiles.c.pulled_at)
+            .where(credit_profiles.c.id > last_id)
+            .where(credit_profiles.c.expires_at.is_(None))
+            .order_by(credit_profiles.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            credit_profiles.update()
+            .where(credit_profiles.c.id == sa.bindparam("profile_id"))
+            .values(expires_at=sa.bindparam("expires")),
+            [{"profile_id": profile_id, "expires": pulled_at + VALIDITY} for profile_id, pulled_at in rows],
+        )
+        last_id = rows[-1][0]
+
+    op.create_index("ix_credit_profiles_expires_at", "credit_profiles", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_credit_profiles_expires_at", table_name="credit_profiles")
@@ -0,0 +1,24 @@
+"""Packed amortization schedule on loan_calculations.
+
+Revision ID: 0008_loan_calculation_schedule
+Revises: 0007_idempotency_keys
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008_loan_calculation_schedule"
+down_revision = "0007_idempotency_keys"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing rows stay NULL and are rebuilt at their own stored rate when
+    # read; the next calculation for the user stores its schedule.
+    op.add_column("loan_calculations", sa.Column("amortization_schedule", sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("loan_calculations") as batch:
+        batch.drop_column("amortization_schedule")
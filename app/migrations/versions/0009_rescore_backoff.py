@@ -0,0 +1,22 @@
+"""Back off re-scoring users whose bureau pull failed or cannot be made.
+
+Revision ID: 0009_rescore_backoff
+Revises: 0008_loan_calculation_schedule
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009_rescore_backoff"
+down_revision = "0008_loan_calculation_schedule"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("loan_eligibility", sa.Column("next_rescore_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("loan_eligibility") as batch:
+        batch.drop_column("next_rescore_at")
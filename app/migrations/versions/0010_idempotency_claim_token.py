@@ -0,0 +1,24 @@
+"""Owner token on idempotency key claims.
+
+Revision ID: 0010_idempotency_claim_token
+Revises: 0009_rescore_backoff
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0010_idempotency_claim_token"
+down_revision = "0009_rescore_backoff"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Claims left by the previous release have no token; they lapse at
+    # locked_until and are taken over as before.
+    op.add_column("idempotency_keys", sa.Column("claim_token", sa.String(32), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("idempotency_keys") as batch:
+        batch.drop_column("claim_token")
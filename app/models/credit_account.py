@@ -10,7 +10,8 @@ class CreditAccount(Base):
     credit_profile_id = Column(
         BigInteger,
         ForeignKey("credit_profiles.id"),
-        nullable=False
+        nullable=False,
+        index=True
     )
     loan_type  = Column(String(30), nullable=True)
     emi_amount = Column(DECIMAL(12, 2), default=0.00)
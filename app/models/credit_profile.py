@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BigInteger, ForeignKey, String, DateTime, DECIMAL, JSON
+from sqlalchemy import Column, BigInteger, ForeignKey, String, DateTime, DECIMAL, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from core.database import Base
@@ -17,9 +17,16 @@ class CreditProfile(Base):
     report_reference_id = Column(String(100), nullable=True)
     total_active_loans = Column(BigInteger, default=0)
     total_existing_emi = Column(DECIMAL(12, 2), default=0.00)
-    bureau_raw_response = Column(JSON, nullable=True)
     pulled_at  = Column(DateTime, default=datetime.utcnow, nullable=False)
     expires_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Serves "latest profile per user" without sorting the user's history.
+        Index("ix_credit_profiles_user_id_pulled_at", user_id, pulled_at.desc()),
+        # Range scans for profiles nearing expiry (re-scoring scheduler).
+        Index("ix_credit_profiles_expires_at", expires_at),
+    )
+
     accounts = relationship(
         "CreditAccount",
         back_populates="credit_profile",
@@ -27,6 +34,17 @@ class CreditProfile(Base):
         lazy="select"
     )
 
+    # Written with the profile, never loaded with it: lazy="raise" turns an
+    # accidental read into an error instead of a blob fetch per profile.
+    raw_report = relationship(
+        "CreditReportBlob",
+        back_populates="credit_profile",
+        uselist=False,
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise"
+    )
+
     user = relationship(
         "UserProfile",
         back_populates="credit_profiles"
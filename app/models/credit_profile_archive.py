@@ -0,0 +1,25 @@
+from sqlalchemy import Column, BigInteger, String, DateTime, DECIMAL, Index, func
+from core.database import Base
+
+
+class CreditProfileArchive(Base):
+    """
+    Compacted history: the summary columns of credit profiles that aged out
+    of credit_profiles under the retention policy. Accounts and the raw
+    bureau response are not kept. ``id`` is the original profile id.
+    """
+    __tablename__ = "credit_profile_archive"
+
+    id                  = Column(BigInteger, primary_key=True, autoincrement=False)
+    user_id             = Column(BigInteger, nullable=False)
+    bureau_name         = Column(String(50), nullable=False)
+    credit_score        = Column(BigInteger, nullable=False)
+    report_reference_id = Column(String(100), nullable=True)
+    total_active_loans  = Column(BigInteger, nullable=True)
+    total_existing_emi  = Column(DECIMAL(12, 2), nullable=True)
+    pulled_at           = Column(DateTime, nullable=False)
+    archived_at         = Column(DateTime, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_credit_profile_archive_user_id_pulled_at", user_id, pulled_at),
+    )
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, BigInteger, ForeignKey, String, LargeBinary
+from sqlalchemy.orm import relationship
+from core.database import Base
+
+
+class CreditReportBlob(Base):
+    """
+    Raw bureau response of one CreditProfile, compressed, in its own table.
+    Reports run to hundreds of KB; keeping them off credit_profiles keeps
+    profile rows small and profile reads independent of report size. Read
+    only for audits, via CreditRepository.get_raw_report (`manage.py
+    credit-report`).
+    """
+    __tablename__ = "credit_report_blobs"
+
+    credit_profile_id = Column(
+        BigInteger,
+        ForeignKey("credit_profiles.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    encoding = Column(String(16), nullable=False)
+    raw_size = Column(BigInteger, nullable=False)
+    payload  = Column(LargeBinary, nullable=False)
+
+    credit_profile = relationship(
+        "CreditProfile",
+        back_populates="raw_report"
+    )
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, BigInteger, String, Boolean, DateTime, JSON
+from datetime import datetime
+from core.database import Base
+
+
+class EligibilityPolicyRecord(Base):
+    """
+    A versioned eligibility rule set. The most recently created active row
+    is the live policy; rules hold {"tiers": [[min_score, max_amount], ...],
+    "max_foir": 0.5, "platform_max_amount": 20000}.
+    """
+    __tablename__ = "eligibility_policies"
+
+    id         = Column(BigInteger, primary_key=True, autoincrement=True)
+    version    = Column(String(50), nullable=False, unique=True)
+    rules      = Column(JSON, nullable=False)
+    is_active  = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
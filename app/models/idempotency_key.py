@@ -0,0 +1,31 @@
+from sqlalchemy import Column, String, Integer, DateTime, JSON, LargeBinary, Index, func
+from core.database import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Outcome of a mutating request sent with an Idempotency-Key, so a retry
+    gets the stored response instead of running again. ``key_hash`` covers
+    method, path and key; ``request_hash`` the query string and body, so a
+    key reused for a different request is rejected. A NULL status_code is
+    a claim by a worker still running the request, valid until
+    ``locked_until``, which that worker keeps extending; ``claim_token``
+    identifies the claim, so a worker whose claim lapsed and was taken over
+    cannot store or release the new owner's. Rows are purged after
+    ``expires_at``.
+    """
+    __tablename__ = "idempotency_keys"
+
+    key_hash     = Column(String(32), primary_key=True)
+    request_hash = Column(String(32), nullable=False)
+    status_code  = Column(Integer, nullable=True)
+    headers      = Column(JSON, nullable=True)
+    body         = Column(LargeBinary, nullable=True)
+    locked_until = Column(DateTime, nullable=False)
+    claim_token  = Column(String(32), nullable=True)
+    expires_at   = Column(DateTime, nullable=False)
+    created_at   = Column(DateTime, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_idempotency_keys_expires_at", expires_at),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, BigInteger, DateTime, ForeignKey, Enum, Integer
+from sqlalchemy import Column, String, Float, BigInteger, DateTime, ForeignKey, Enum, Integer, DECIMAL, LargeBinary
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from core.database import Base
@@ -31,13 +31,16 @@ class LoanCalculation(Base):
         foreign_keys=[user_id],
         lazy="select",
     )
-    requested_amount = Column(Float,   nullable=False)
-    tenure_months    = Column(Integer, nullable=False)
-    eligible_amount  = Column(Float,   nullable=False)
-    interest_rate_pa = Column(Float,   nullable=False, default=12.0)
-    monthly_emi      = Column(Float,   nullable=False)
-    total_repayment  = Column(Float,   nullable=False)
-    total_interest   = Column(Float,   nullable=False)
+    requested_amount = Column(DECIMAL(12, 2), nullable=False)
+    tenure_months    = Column(Integer,        nullable=False)
+    eligible_amount  = Column(DECIMAL(12, 2), nullable=False)
+    interest_rate_pa = Column(Float,          nullable=False, default=12.0)
+    monthly_emi      = Column(DECIMAL(12, 2), nullable=False)
+    total_repayment  = Column(DECIMAL(12, 2), nullable=False)
+    total_interest   = Column(DECIMAL(12, 2), nullable=False)
+    # Schedule shown when the calculation was made, packed by
+    # Utils.schedule_codec; NULL for rows saved before it was stored.
+    amortization_schedule = Column(LargeBinary, nullable=True)
     status = Column(
         Enum(
             LoanCalcStatus,
@@ -46,10 +46,13 @@ class LoanEligibility(Base):
     bureau_name                = Column(String(50), nullable=True)
     eligibility_status = Column(String(20), nullable=False)
     failure_reason     = Column(Text, nullable=True)
+    policy_version     = Column(String(50), nullable=True)
     max_eligible_amount = Column(DECIMAL(12, 2), default=0.00)
     max_eligible_emi    = Column(DECIMAL(12, 2), default=0.00)
     previously_checked_at = Column(DateTime, nullable=True)
     latest_checked_at     = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Re-scoring skips the user until then (a failed or impossible pull).
+    next_rescore_at       = Column(DateTime, nullable=True)
     user = relationship("UserProfile", back_populates="eligibility_checks")
     credit_profile = relationship(
         "CreditProfile",
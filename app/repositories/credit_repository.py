@@ -1,83 +1,209 @@
-from datetime import datetime
-from sqlalchemy.orm import Session
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import event, exists, func, insert, or_, select
+from sqlalchemy.orm import Session, aliased, selectinload
 
+from core.cache import TTLCache
+from core.config import get_settings
 from models.credit_profile import CreditProfile
 from models.credit_account import CreditAccount
+from models.credit_report import CreditReportBlob
+from models.loan_eligibility import LoanEligibility
+from services.bureau_client import BureauReport
+from Utils.report_codec import REPORT_ENCODING, decode_report, encode_report
+
+
+@dataclass(frozen=True)
+class CreditAccountSnapshot:
+    loan_type : str | None
+    emi_amount: Decimal | None
+    status    : str | None
+
+
+@dataclass(frozen=True)
+class CreditProfileSnapshot:
+    """
+    Immutable, session-free copy of a CreditProfile and its accounts, safe
+    to share across requests. Exposes the same attribute names as the model.
+    """
+    id                 : int
+    user_id            : int
+    bureau_name        : str
+    credit_score       : int
+    report_reference_id: str | None
+    total_active_loans : int | None
+    total_existing_emi : Decimal | None
+    pulled_at          : datetime
+    expires_at         : datetime | None
+    accounts           : tuple[CreditAccountSnapshot, ...]
+
+    @classmethod
+    def from_model(cls, profile: CreditProfile, accounts=None) -> "CreditProfileSnapshot":
+        """``accounts`` overrides profile.accounts, e.g. for rows just written without the relationship."""
+        return cls(
+            id                  = profile.id,
+            user_id             = profile.user_id,
+            bureau_name         = profile.bureau_name,
+            credit_score        = profile.credit_score,
+            report_reference_id = profile.report_reference_id,
+            total_active_loans  = profile.total_active_loans,
+            total_existing_emi  = profile.total_existing_emi,
+            pulled_at           = profile.pulled_at,
+            expires_at          = profile.expires_at,
+            accounts            = tuple(
+                CreditAccountSnapshot(
+                    loan_type  = acc.loan_type,
+                    emi_amount = acc.emi_amount,
+                    status     = acc.status,
+                )
+                for acc in (profile.accounts if accounts is None else accounts)
+            ),
+        )
+
+
+_settings = get_settings()
+credit_profile_cache = TTLCache(
+    maxsize     = _settings.CREDIT_PROFILE_CACHE_SIZE,
+    ttl_seconds = _settings.CREDIT_PROFILE_CACHE_TTL_SECONDS,
+)
+
+
+# Users whose cached profile a session's pending writes supersede. Entries
+# are dropped only once the transaction commits: invalidating at flush time
+# would let a concurrent read re-cache the old profile before the new one
+# is visible.
+_PENDING_INVALIDATIONS = "credit_profile_cache_invalidations"
+
+
+def _invalidate_on_commit(db: Session, user_ids) -> None:
+    db.info.setdefault(_PENDING_INVALIDATIONS, set()).update(int(user_id) for user_id in user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_invalidations(session: Session) -> None:
+    for user_id in session.info.pop(_PENDING_INVALIDATIONS, ()):
+        credit_profile_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session: Session) -> None:
+    session.info.pop(_PENDING_INVALIDATIONS, None)
+
+
+def _validity() -> timedelta:
+    return timedelta(days=get_settings().CREDIT_PROFILE_VALIDITY_DAYS)
+
+
+def is_fresh(profile: CreditProfile | CreditProfileSnapshot | None, now: datetime | None = None) -> bool:
+    """True for a profile that has not reached its expires_at (None never expires)."""
+    if profile is None:
+        return False
+    return profile.expires_at is None or profile.expires_at > (now or datetime.utcnow())
 
 
 class CreditRepository:
 
     @staticmethod
-    def get_latest_credit_profile(db: Session, user_id: str) -> CreditProfile | None:
-        return (
+    def get_latest_credit_profile(db: Session, user_id: str) -> CreditProfileSnapshot | None:
+        """
+        Read-through: served from credit_profile_cache until the configured
+        TTL or the profile's own expires_at, whichever comes first. Writes
+        through this repository invalidate the user's entry when they
+        commit; a load that overlapped one is not cached.
+        """
+        key = int(user_id)
+        snapshot = credit_profile_cache.get(key)
+        if snapshot is not None:
+            return snapshot
+        generation = credit_profile_cache.generation()
+
+        profile = (
             db.query(CreditProfile)
+            .options(selectinload(CreditProfile.accounts))
             .filter(CreditProfile.user_id == user_id)
             .order_by(CreditProfile.pulled_at.desc())
             .first()
         )
+        if profile is None:
+            return None
+
+        snapshot = CreditProfileSnapshot.from_model(profile)
+        ttl = None
+        if snapshot.expires_at is not None:
+            ttl = (snapshot.expires_at - datetime.utcnow()).total_seconds()
+        credit_profile_cache.set(key, snapshot, ttl_seconds=ttl, generation=generation)
+        return snapshot
+
+    @staticmethod
+    def get_latest_credit_profiles(db: Session, user_ids: list[int]) -> dict[int, CreditProfile]:
+        """Latest profile for every user in ``user_ids``, in a single query."""
+        if not user_ids:
+            return {}
+        ranked = (
+            select(
+                CreditProfile.id,
+                func.row_number().over(
+                    partition_by=CreditProfile.user_id,
+                    order_by=CreditProfile.pulled_at.desc(),
+                ).label("rn"),
+            )
+            .where(CreditProfile.user_id.in_(user_ids))
+            .subquery()
+        )
+        rows = (
+            db.query(CreditProfile)
+            .join(ranked, CreditProfile.id == ranked.c.id)
+            .filter(ranked.c.rn == 1)
+            .all()
+        )
+        return {row.user_id: row for row in rows}
 
     @staticmethod
-    def create_dummy_credit_profile(db: Session, user_id: str) -> CreditProfile:
+    def due_for_refresh(
+        db        : Session,
+        horizon   : datetime,
+        not_before: datetime,
+        limit     : int,
+        now       : datetime,
+    ) -> list[int]:
         """
-        #
-        # @staticmethod
-        # def create_from_transunion(
-        #     db: Session,
-        #     user_id: str,
-        #     pan_number: str
-        # ) -> CreditProfile:
-        #
-        #     import requests, os
-        #
-        #     url     = "https://api.transunion.com/v1/credit-report"
-        #     headers = {
-        #         "Authorization": f"Bearer {os.getenv('TRANSUNION_API_KEY')}",
-        #         "Content-Type":  "application/json",
-        #     }
-        #     payload = {
-        #         "pan":     pan_number,
-        #         "consent": True,
-        #         "purpose": "LOAN_UNDERWRITING",
-        #     }
-        #
-        #     resp = requests.post(url, json=payload, headers=headers, timeout=10)
-        #     resp.raise_for_status()
-        #     data = resp.json()
-        #
-        #     # ── Parse accounts from bureau response ───────────────────────────
-        #     raw_accounts = data.get("accounts", [])
-        #     active_accounts = [a for a in raw_accounts if a["status"] == "ACTIVE"]
-        #     total_existing_emi = sum(float(a["emiAmount"]) for a in active_accounts)
-        #
-        #     # ── Persist CreditProfile ─────────────────────────────────────────
-        #     profile = CreditProfile(
-        #         user_id             = user_id,
-        #         bureau_name         = data.get("bureau", "TransUnion"),
-        #         credit_score        = data["creditScore"],
-        #         report_reference_id = data.get("reportId"),
-        #         total_active_loans  = len(active_accounts),
-        #         total_existing_emi  = total_existing_emi,
-        #         bureau_raw_response = data,              # store full response for audit
-        #         pulled_at           = datetime.utcnow(),
-        #     )
-        #     db.add(profile)
-        #     db.flush()   # get profile.id before inserting child accounts
-        #
-        #     for acc in raw_accounts:
-        #         db.add(CreditAccount(
-        #             credit_profile_id = profile.id,
-        #             loan_type         = acc.get("loanType"),
-        #             emi_amount        = float(acc.get("emiAmount", 0)),
-        #             status            = acc.get("status"),
-        #         ))
-        #
-        #     db.commit()
-        #     db.refresh(profile)
-        #     return profile
-        #
+        Users with an eligibility record whose latest profile expires in
+        [not_before, horizon], soonest first, leaving out those backed off
+        past ``now`` (LoanEligibility.next_rescore_at). A range scan of
+        ix_credit_profiles_expires_at; superseded profiles in the range are
+        skipped by probing ix_credit_profiles_user_id_pulled_at.
         """
-        import random
+        newer = aliased(CreditProfile)
+        return list(db.scalars(
+            select(CreditProfile.user_id)
+            .join(LoanEligibility, LoanEligibility.user_id == CreditProfile.user_id)
+            .where(CreditProfile.expires_at.between(not_before, horizon))
+            .where(or_(LoanEligibility.next_rescore_at.is_(None), LoanEligibility.next_rescore_at <= now))
+            .where(~exists().where(
+                newer.user_id == CreditProfile.user_id,
+                newer.pulled_at > CreditProfile.pulled_at,
+            ))
+            .order_by(CreditProfile.expires_at)
+            .limit(limit)
+        ))
+
+    @staticmethod
+    def get_raw_report(db: Session, credit_profile_id: int) -> dict | None:
+        """The bureau response stored with a profile, decompressed. Audit use only."""
+        blob = db.get(CreditReportBlob, credit_profile_id)
+        if blob is None:
+            return None
+        return decode_report(blob.payload, blob.encoding)
 
+    @staticmethod
+    def _raw_report_blob(data: dict) -> CreditReportBlob:
+        payload, raw_size = encode_report(data)
+        return CreditReportBlob(encoding=REPORT_ENCODING, raw_size=raw_size, payload=payload)
+
+    @staticmethod
+    def _build_dummy_credit_profile(user_id: int) -> tuple[CreditProfile, tuple[CreditAccountSnapshot, ...]]:
         dummy_score = random.choice([620, 670, 710, 760, 810])
 
         # Build realistic dummy accounts
@@ -95,6 +221,7 @@ class CreditRepository:
         active_accounts = [a for a in accounts_data if a["status"] == "ACTIVE"]
         total_existing_emi = sum(a["emi_amount"] for a in active_accounts)
 
+        now     = datetime.utcnow()
         profile = CreditProfile(
             user_id             = user_id,
             bureau_name         = "TransUnion (Dummy)",
@@ -102,19 +229,97 @@ class CreditRepository:
             report_reference_id = f"DUMMY-{str(user_id)[:8].upper()}",
             total_active_loans  = len(active_accounts),
             total_existing_emi  = total_existing_emi,
-            bureau_raw_response = {"dummy": True, "score": dummy_score},
-            pulled_at           = datetime.utcnow(),
+            raw_report          = CreditRepository._raw_report_blob({"dummy": True, "score": dummy_score}),
+            pulled_at           = now,
+            expires_at          = now + _validity(),
+        )
+        return profile, tuple(CreditAccountSnapshot(**acc) for acc in accounts_data)
+
+    @staticmethod
+    def _profile_from_report(
+        user_id: int,
+        report : BureauReport,
+    ) -> tuple[CreditProfile, tuple[CreditAccountSnapshot, ...]]:
+        now = datetime.utcnow()
+        profile = CreditProfile(
+            user_id             = user_id,
+            bureau_name         = report.bureau_name,
+            credit_score        = report.credit_score,
+            report_reference_id = report.report_reference_id,
+            total_active_loans  = len(report.active_accounts),
+            total_existing_emi  = report.total_existing_emi,
+            raw_report          = CreditRepository._raw_report_blob(report.raw),   # kept for audit
+            pulled_at           = now,
+            expires_at          = now + _validity(),
         )
-        db.add(profile)
+        accounts = tuple(
+            CreditAccountSnapshot(
+                loan_type  = acc.loan_type,
+                emi_amount = acc.emi_amount,
+                status     = acc.status,
+            )
+            for acc in report.accounts
+        )
+        return profile, accounts
+
+    @staticmethod
+    def _write_profiles(
+        db     : Session,
+        entries: list[tuple[CreditProfile, tuple[CreditAccountSnapshot, ...]]],
+    ) -> dict[int, CreditProfileSnapshot]:
+        """
+        Inserts the profiles, then every account of every profile in one
+        executemany, so the statement count does not grow with the number
+        of accounts. Returns snapshots of what was written, keyed by
+        user_id, which the caller can read without a reload. Flushes.
+        """
+        db.add_all(profile for profile, _ in entries)
         db.flush()
-        for acc in accounts_data:
-            db.add(CreditAccount(
-                credit_profile_id = profile.id,
-                loan_type         = acc["loan_type"],
-                emi_amount        = acc["emi_amount"],
-                status            = acc["status"],
-            ))
+        rows = [
+            {
+                "credit_profile_id": profile.id,
+                "loan_type":         acc.loan_type,
+                "emi_amount":        acc.emi_amount,
+                "status":            acc.status,
+            }
+            for profile, accounts in entries
+            for acc in accounts
+        ]
+        if rows:
+            db.execute(insert(CreditAccount), rows)
+        _invalidate_on_commit(db, [profile.user_id for profile, _ in entries])
+        return {
+            profile.user_id: CreditProfileSnapshot.from_model(profile, accounts)
+            for profile, accounts in entries
+        }
+
+    @staticmethod
+    def create_from_report(db: Session, user_id: int, report: BureauReport) -> CreditProfileSnapshot:
+        """Persists a bureau pull that was fetched and parsed outside the session."""
+        written = CreditRepository._write_profiles(db, [CreditRepository._profile_from_report(user_id, report)])
+        db.commit()
+        return written[user_id]
 
+    @staticmethod
+    def create_from_reports(db: Session, reports: dict[int, BureauReport]) -> dict[int, CreditProfileSnapshot]:
+        """Bulk create_from_report. Flushes but does not commit, like create_dummy_credit_profiles."""
+        return CreditRepository._write_profiles(db, [
+            CreditRepository._profile_from_report(user_id, report)
+            for user_id, report in reports.items()
+        ])
+
+    @staticmethod
+    def create_dummy_credit_profiles(db: Session, user_ids: list[int]) -> dict[int, CreditProfileSnapshot]:
+        """
+        Bulk variant of create_dummy_credit_profile. Flushes but does not
+        commit, so the caller can write its own rows in the same transaction.
+        """
+        return CreditRepository._write_profiles(db, [
+            CreditRepository._build_dummy_credit_profile(user_id) for user_id in user_ids
+        ])
+
+    @staticmethod
+    def create_dummy_credit_profile(db: Session, user_id: str) -> CreditProfileSnapshot:
+        written = CreditRepository._write_profiles(db, [CreditRepository._build_dummy_credit_profile(user_id)])
         db.commit()
-        db.refresh(profile)
-        return profile
\ No newline at end of file
+        return written[int(user_id)]
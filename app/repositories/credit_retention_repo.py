@@ -0,0 +1,96 @@
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from core.database import supports_upsert, upsert_insert
+from models.credit_account import CreditAccount
+from models.credit_profile import CreditProfile
+from models.credit_profile_archive import CreditProfileArchive
+from models.credit_report import CreditReportBlob
+from models.loan_eligibility import LoanEligibility
+
+ARCHIVED_COLUMNS = (
+    "id",
+    "user_id",
+    "bureau_name",
+    "credit_score",
+    "report_reference_id",
+    "total_active_loans",
+    "total_existing_emi",
+    "pulled_at",
+)
+
+
+def _referenced_profile_ids():
+    return select(LoanEligibility.credit_profile_id).where(LoanEligibility.credit_profile_id.isnot(None))
+
+
+class CreditRetentionRepository:
+
+    @staticmethod
+    def users_over_limit(db: Session, keep: int, after_user_id: int, limit: int) -> list[int]:
+        """
+        Next ``limit`` users after ``after_user_id`` with more than ``keep``
+        profiles, in user_id order, so a sweep can resume from a cursor.
+        """
+        return list(db.scalars(
+            select(CreditProfile.user_id)
+            .where(CreditProfile.user_id > after_user_id)
+            .group_by(CreditProfile.user_id)
+            .having(func.count() > keep)
+            .order_by(CreditProfile.user_id)
+            .limit(limit)
+        ))
+
+    @staticmethod
+    def expired_profile_ids(db: Session, user_ids: list[int], keep: int) -> list[int]:
+        """
+        Profiles of ``user_ids`` beyond each user's ``keep`` most recent,
+        excluding any that a LoanEligibility row still points at.
+        """
+        ranked = (
+            select(
+                CreditProfile.id,
+                func.row_number().over(
+                    partition_by=CreditProfile.user_id,
+                    order_by=(CreditProfile.pulled_at.desc(), CreditProfile.id.desc()),
+                ).label("rn"),
+            )
+            .where(CreditProfile.user_id.in_(user_ids))
+            .subquery()
+        )
+        return list(db.scalars(
+            select(ranked.c.id)
+            .where(ranked.c.rn > keep)
+            .where(ranked.c.id.not_in(_referenced_profile_ids()))
+            .order_by(ranked.c.id)
+        ))
+
+    @staticmethod
+    def archive_profiles(db: Session, profile_ids: list[int]) -> int:
+        """
+        Copies the summary of ``profile_ids`` into credit_profile_archive and
+        deletes them with their accounts and raw reports. Idempotent, so two
+        workers sweeping the same users do no harm. Does not commit.
+        """
+        if not profile_ids:
+            return 0
+
+        columns  = [getattr(CreditProfile, name) for name in ARCHIVED_COLUMNS]
+        selected = select(*columns).where(CreditProfile.id.in_(profile_ids))
+        if supports_upsert(db):
+            archive = upsert_insert(db, CreditProfileArchive).from_select(list(ARCHIVED_COLUMNS), selected)
+            archive = archive.on_conflict_do_nothing(index_elements=[CreditProfileArchive.id])
+        else:
+            archived = select(CreditProfileArchive.id).where(CreditProfileArchive.id.in_(profile_ids))
+            archive  = insert(CreditProfileArchive).from_select(
+                list(ARCHIVED_COLUMNS),
+                selected.where(CreditProfile.id.not_in(archived)),
+            )
+        db.execute(archive)
+
+        db.execute(delete(CreditAccount).where(CreditAccount.credit_profile_id.in_(profile_ids)))
+        db.execute(delete(CreditReportBlob).where(CreditReportBlob.credit_profile_id.in_(profile_ids)))
+        # A profile referenced by loan_eligibility in the meantime makes the
+        # FK reject this delete, and the caller's rollback undoes the batch.
+        result = db.execute(delete(CreditProfile).where(CreditProfile.id.in_(profile_ids)))
+        return result.rowcount
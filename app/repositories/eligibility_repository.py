@@ -1,11 +1,102 @@
 from datetime import datetime
+from sqlalchemy import and_, case, update
 from sqlalchemy.orm import Session
 
+from core.database import commit_keeping_loaded, supports_upsert, upsert_insert
 from models.loan_eligibility import LoanEligibility
 
+DECISION_COLUMNS = (
+    "credit_profile_id",
+    "income_used",
+    "existing_emi",
+    "proposed_emi",
+    "foir_ratio",
+    "credit_score_used",
+    "bureau_name",
+    "max_eligible_amount",
+    "max_eligible_emi",
+    "eligibility_status",
+    "failure_reason",
+    "policy_version",
+    "max_allowed_foir",
+)
+
+# Inserts render None as NULL (so a bulk batch is not split by row shape),
+# which bypasses column defaults; these are applied up front instead.
+INSERT_DEFAULTS = {
+    "existing_emi":        0.00,
+    "max_eligible_amount": 0.00,
+    "max_eligible_emi":    0.00,
+    "max_allowed_foir":    0.50,
+}
+
 
 class EligibilityRepository:
 
+    @staticmethod
+    def _insert_values(user_id, values: dict, now: datetime) -> dict:
+        return {
+            **values,
+            **{k: v for k, v in INSERT_DEFAULTS.items() if values[k] is None},
+            "user_id":                    user_id,
+            "previous_credit_score_used": None,
+            "previously_checked_at":      None,
+            "latest_checked_at":          now,
+        }
+
+    @staticmethod
+    def _rollover(stmt) -> dict:
+        """
+        ON CONFLICT assignments carrying the previous check forward. Right-hand
+        sides read the row as it was before the update.
+        """
+        return {
+            "previous_credit_score_used": case(
+                (
+                    and_(
+                        LoanEligibility.credit_score_used.is_not(None),
+                        LoanEligibility.credit_score_used.is_distinct_from(
+                            stmt.excluded.credit_score_used
+                        ),
+                    ),
+                    LoanEligibility.credit_score_used,
+                ),
+                else_=LoanEligibility.previous_credit_score_used,
+            ),
+            "previously_checked_at": LoanEligibility.latest_checked_at,
+            "latest_checked_at":     stmt.excluded.latest_checked_at,
+        }
+
+    @staticmethod
+    def _select_then_write(db: Session, user_id, values: dict, now: datetime) -> LoanEligibility:
+        """
+        Portable fallback for dialects without ON CONFLICT: the same insert
+        values and rollover as the upsert, applied through the ORM. Flushes.
+        """
+        eligibility = (
+            db.query(LoanEligibility)
+            .filter(LoanEligibility.user_id == user_id)
+            .with_for_update()
+            .first()
+        )
+        if eligibility is None:
+            eligibility = LoanEligibility(**EligibilityRepository._insert_values(user_id, values, now))
+            db.add(eligibility)
+            db.flush()
+            return eligibility
+
+        if (
+            eligibility.credit_score_used is not None
+            and eligibility.credit_score_used != values["credit_score_used"]
+        ):
+            eligibility.previous_credit_score_used = eligibility.credit_score_used
+        eligibility.previously_checked_at = eligibility.latest_checked_at
+        eligibility.latest_checked_at     = now
+        for column, value in values.items():
+            setattr(eligibility, column, value)
+        db.flush()
+        return eligibility
+
     @staticmethod
     def save_or_update_eligibility(
         db: Session,
@@ -21,46 +112,100 @@ class EligibilityRepository:
         max_eligible_amount: float = None,
         max_eligible_emi: float = None,
         failure_reason: str = None,
+        policy_version: str = None,
+        max_allowed_foir: float = None,
     ) -> LoanEligibility:
+        """
+        Single INSERT ... ON CONFLICT (user_id) DO UPDATE ... RETURNING, or
+        select-then-write where the dialect has no ON CONFLICT.
+        """
         now = datetime.utcnow()
+        values = {
+            "credit_profile_id":   credit_profile_id,
+            "income_used":         income_used,
+            "existing_emi":        existing_emi,
+            "proposed_emi":        proposed_emi,
+            "foir_ratio":          foir_ratio,
+            "credit_score_used":   credit_score_used,
+            "bureau_name":         bureau_name,
+            "max_eligible_amount": max_eligible_amount,
+            "max_eligible_emi":    max_eligible_emi,
+            "eligibility_status":  eligibility_status,
+            "failure_reason":      failure_reason,
+            "policy_version":      policy_version,
+            "max_allowed_foir":    max_allowed_foir,
+        }
 
-        eligibility = (
-            db.query(LoanEligibility)
-            .filter(LoanEligibility.user_id == user_id)
-            .first()
+        if not supports_upsert(db):
+            eligibility = EligibilityRepository._select_then_write(db, user_id, values, now)
+            db.commit()
+            db.refresh(eligibility)
+            return eligibility
+
+        stmt = upsert_insert(db, LoanEligibility).values(
+            **EligibilityRepository._insert_values(user_id, values, now)
         )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[LoanEligibility.user_id],
+            set_={**values, **EligibilityRepository._rollover(stmt)},
+        )
+        eligibility = db.scalars(
+            stmt.returning(LoanEligibility),
+            execution_options={"populate_existing": True},
+        ).one()
 
-        if not eligibility:
-            eligibility = LoanEligibility(
-                user_id                    = user_id,
-                previous_credit_score_used = None,
-                previously_checked_at      = None,
-                latest_checked_at          = now,
-            )
-            db.add(eligibility)
+        # RETURNING already loaded the row as written.
+        commit_keeping_loaded(db)
+        return eligibility
+
+    @staticmethod
+    def bulk_save_or_update_eligibility(db: Session, decisions: list[dict]) -> None:
+        """
+        Writes many decisions with the same rollover rules as
+        save_or_update_eligibility in one multi-row upsert and a single
+        commit. Each decision holds ``user_id`` plus the keyword arguments
+        of save_or_update_eligibility.
+        """
+        if not decisions:
+            return
+        now = datetime.utcnow()
 
-        else:
-            if (
-                eligibility.credit_score_used is not None
-                and eligibility.credit_score_used != credit_score_used
-            ):
-                eligibility.previous_credit_score_used = eligibility.credit_score_used
-
-            eligibility.previously_checked_at = eligibility.latest_checked_at
-            eligibility.latest_checked_at     = now
-
-        eligibility.credit_profile_id   = credit_profile_id
-        eligibility.income_used         = income_used
-        eligibility.existing_emi        = existing_emi
-        eligibility.proposed_emi        = proposed_emi
-        eligibility.foir_ratio          = foir_ratio
-        eligibility.credit_score_used   = credit_score_used
-        eligibility.bureau_name         = bureau_name
-        eligibility.max_eligible_amount = max_eligible_amount
-        eligibility.max_eligible_emi    = max_eligible_emi
-        eligibility.eligibility_status  = eligibility_status
-        eligibility.failure_reason      = failure_reason
+        if not supports_upsert(db):
+            for decision in decisions:
+                EligibilityRepository._select_then_write(
+                    db,
+                    decision["user_id"],
+                    {column: decision.get(column) for column in DECISION_COLUMNS},
+                    now,
+                )
+            db.commit()
+            return
+
+        rows = [
+            EligibilityRepository._insert_values(
+                decision["user_id"],
+                {column: decision.get(column) for column in DECISION_COLUMNS},
+                now,
+            )
+            for decision in decisions
+        ]
+        stmt = upsert_insert(db, LoanEligibility)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[LoanEligibility.user_id],
+            set_={
+                **{column: stmt.excluded[column] for column in DECISION_COLUMNS},
+                **EligibilityRepository._rollover(stmt),
+            },
+        )
+        db.execute(stmt.execution_options(render_nulls=True), rows)
+        db.commit()
 
+    @staticmethod
+    def defer_rescore(db: Session, user_ids: list[int], until: datetime) -> None:
+        """Keeps ``user_ids`` out of re-scoring until ``until``. Commits."""
+        db.execute(
+            update(LoanEligibility)
+            .where(LoanEligibility.user_id.in_(user_ids))
+            .values(next_rescore_at=until)
+        )
         db.commit()
-        db.refresh(eligibility)
-        return eligibility
\ No newline at end of file
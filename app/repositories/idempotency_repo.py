@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+from sqlalchemy import Row, delete, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from core.database import supports_upsert, upsert_insert
+from models.idempotency_key import IdempotencyKey
+
+
+class IdempotencyRepository:
+
+    @staticmethod
+    def _insert_if_absent(db: Session, values: dict) -> bool:
+        """INSERT ... ON CONFLICT DO NOTHING, or a savepointed insert where the dialect lacks it."""
+        if supports_upsert(db):
+            inserted = db.execute(
+                upsert_insert(db, IdempotencyKey)
+                .values(**values)
+                .on_conflict_do_nothing(index_elements=[IdempotencyKey.key_hash])
+            )
+            return bool(inserted.rowcount)
+        try:
+            with db.begin_nested():
+                db.execute(insert(IdempotencyKey).values(**values))
+        except IntegrityError:
+            return False
+        return True
+
+    @staticmethod
+    def claim(
+        db          : Session,
+        key_hash    : str,
+        request_hash: str,
+        claim_token : str,
+        lock_seconds: int,
+        ttl_seconds : int,
+    ) -> Row | None:
+        """
+        Claims ``key_hash`` for this worker under ``claim_token``: None when
+        the caller should run the request, otherwise the existing row's
+        request_hash, status_code, headers and body (status_code is None
+        while another worker runs it). An expired row or a lapsed claim is
+        taken over. Commits.
+        """
+        now    = datetime.utcnow()
+        values = {
+            "request_hash": request_hash,
+            "status_code":  None,
+            "headers":      None,
+            "body":         None,
+            "locked_until": now + timedelta(seconds=lock_seconds),
+            "claim_token":  claim_token,
+            "expires_at":   now + timedelta(seconds=ttl_seconds),
+        }
+        if IdempotencyRepository._insert_if_absent(db, {"key_hash": key_hash, **values}):
+            db.commit()
+            return None
+
+        taken_over = db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key_hash == key_hash)
+            .where(or_(
+                IdempotencyKey.expires_at <= now,
+                (IdempotencyKey.status_code.is_(None)) & (IdempotencyKey.locked_until <= now),
+            ))
+            .values(**values)
+        )
+        if taken_over.rowcount:
+            db.commit()
+            return None
+
+        existing = db.execute(
+            select(
+                IdempotencyKey.request_hash,
+                IdempotencyKey.status_code,
+                IdempotencyKey.headers,
+                IdempotencyKey.body,
+            )
+            .where(IdempotencyKey.key_hash == key_hash)
+        ).first()
+        db.rollback()
+        return existing
+
+    @staticmethod
+    def _claimed(key_hash: str, claim_token: str):
+        return (
+            (IdempotencyKey.key_hash == key_hash)
+            & (IdempotencyKey.claim_token == claim_token)
+            & (IdempotencyKey.status_code.is_(None))
+        )
+
+    @staticmethod
+    def renew(db: Session, key_hash: str, claim_token: str, lock_seconds: int) -> bool:
+        """Extends this worker's claim; False once it no longer holds it. Commits."""
+        renewed = db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyRepository._claimed(key_hash, claim_token))
+            .values(locked_until=datetime.utcnow() + timedelta(seconds=lock_seconds))
+        )
+        db.commit()
+        return bool(renewed.rowcount)
+
+    @staticmethod
+    def complete(
+        db         : Session,
+        key_hash   : str,
+        claim_token: str,
+        status_code: int,
+        headers    : list[list[str]],
+        body       : bytes,
+    ) -> bool:
+        """
+        Stores the response for a key this worker still holds; False when
+        its claim lapsed and was taken over. Commits.
+        """
+        completed = db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyRepository._claimed(key_hash, claim_token))
+            .values(status_code=status_code, headers=headers, body=body, claim_token=None)
+        )
+        db.commit()
+        return bool(completed.rowcount)
+
+    @staticmethod
+    def release(db: Session, key_hash: str, claim_token: str) -> None:
+        """Drops this worker's unfinished claim, so a retry runs the request again. Commits."""
+        db.execute(delete(IdempotencyKey).where(IdempotencyRepository._claimed(key_hash, claim_token)))
+        db.commit()
+
+    @staticmethod
+    def purge_expired(db: Session, limit: int) -> int:
+        """Deletes up to ``limit`` expired rows, oldest first. Commits."""
+        expired = (
+            select(IdempotencyKey.key_hash)
+            .where(IdempotencyKey.expires_at <= datetime.utcnow())
+            .order_by(IdempotencyKey.expires_at)
+            .limit(limit)
+        )
+        result = db.execute(delete(IdempotencyKey).where(IdempotencyKey.key_hash.in_(expired)))
+        db.commit()
+        return result.rowcount
@@ -1,8 +1,35 @@
+from decimal import Decimal
+
+from sqlalchemy import Row, func, select
 from sqlalchemy.orm import Session
 
+from core.database import commit_keeping_loaded, supports_upsert, upsert_insert
 from models.loan_calculation import LoanCalculation, LoanCalcStatus
 from models.loan_eligibility import LoanEligibility
 
+# Columns that identify one saved version of a calculation. updated_at alone
+# is not enough: func.now() has one-second resolution on SQLite.
+VERSION_COLUMNS = (
+    LoanCalculation.updated_at,
+    LoanCalculation.requested_amount,
+    LoanCalculation.tenure_months,
+    LoanCalculation.eligible_amount,
+    LoanCalculation.monthly_emi,
+    LoanCalculation.status,
+)
+
+UPSERT_COLUMNS = (
+    "requested_amount",
+    "tenure_months",
+    "eligible_amount",
+    "interest_rate_pa",
+    "monthly_emi",
+    "total_repayment",
+    "total_interest",
+    "amortization_schedule",
+    "status",
+)
+
 
 class LoanCalculationRepository:
     @staticmethod
@@ -13,6 +40,15 @@ class LoanCalculationRepository:
             .first()
         )
 
+    @staticmethod
+    def get_eligibility_records(db: Session, user_ids: list[int]) -> dict[int, LoanEligibility]:
+        rows = (
+            db.query(LoanEligibility)
+            .filter(LoanEligibility.user_id.in_(user_ids))
+            .all()
+        )
+        return {row.user_id: row for row in rows}
+
     @staticmethod
     def get_by_user_id(db: Session, user_id: int) -> LoanCalculation | None:
         return (
@@ -21,36 +57,82 @@ class LoanCalculationRepository:
             .first()
         )
 
+    @staticmethod
+    def get_version(db: Session, user_id: int) -> Row | None:
+        """VERSION_COLUMNS of a user's calculation, for ETag revalidation."""
+        return db.execute(
+            select(*VERSION_COLUMNS).where(LoanCalculation.user_id == user_id)
+        ).first()
+
+    @staticmethod
+    def get_page(
+        db      : Session,
+        after_id: int,
+        limit   : int,
+        user_ids: list[int] | None = None,
+    ) -> list[LoanCalculation]:
+        """
+        Keyset page of calculations ordered by id, for streaming exports.
+        ``user_ids=None`` means every user; an empty list matches nobody.
+        """
+        query = db.query(LoanCalculation).filter(LoanCalculation.id > after_id)
+        if user_ids is not None:
+            query = query.filter(LoanCalculation.user_id.in_(user_ids))
+        return query.order_by(LoanCalculation.id).limit(limit).all()
+
+    @staticmethod
+    def _select_then_write(db: Session, row: dict) -> LoanCalculation:
+        """
+        Portable fallback for dialects without ON CONFLICT, with the same
+        previously_calculated rollover as _upsert_statement. Flushes.
+        """
+        record = (
+            db.query(LoanCalculation)
+            .filter(LoanCalculation.user_id == row["user_id"])
+            .with_for_update()
+            .first()
+        )
+        if record is None:
+            record = LoanCalculation(**row)
+            db.add(record)
+        else:
+            record.previously_calculated = record.updated_at
+            for column in UPSERT_COLUMNS:
+                setattr(record, column, row[column])
+        db.flush()
+        return record
+
+    @staticmethod
+    def _upsert_statement(db: Session):
+        """
+        INSERT ... ON CONFLICT (user_id) DO UPDATE for loan_calculations.
+        On conflict the old updated_at rolls into previously_calculated;
+        onupdate hooks do not fire for ON CONFLICT, so updated_at is set here.
+        """
+        stmt = upsert_insert(db, LoanCalculation)
+        return stmt.on_conflict_do_update(
+            index_elements=[LoanCalculation.user_id],
+            set_={
+                **{column: stmt.excluded[column] for column in UPSERT_COLUMNS},
+                "previously_calculated": LoanCalculation.updated_at,
+                "updated_at":            func.now(),
+            },
+        )
+
     @staticmethod
     def upsert(
         db              : Session,
         user_id         : int,
-        requested_amount: float,
+        requested_amount: Decimal,
         tenure_months   : int,
-        eligible_amount : float,
+        eligible_amount : Decimal,
         interest_rate_pa: float,
-        monthly_emi     : float,
-        total_repayment : float,
-        total_interest  : float,
+        monthly_emi     : Decimal,
+        total_repayment : Decimal,
+        total_interest  : Decimal,
+        amortization_schedule: bytes,
     ) -> LoanCalculation:
-        existing = LoanCalculationRepository.get_by_user_id(db, user_id)
-        if existing:
-            existing.previously_calculated = existing.updated_at
-
-            existing.requested_amount = requested_amount
-            existing.tenure_months    = tenure_months
-            existing.eligible_amount  = eligible_amount
-            existing.interest_rate_pa = interest_rate_pa
-            existing.monthly_emi      = monthly_emi
-            existing.total_repayment  = total_repayment
-            existing.total_interest   = total_interest
-            existing.status           = LoanCalcStatus.CHECKED
-
-            db.commit()
-            db.refresh(existing)
-            return existing
-
-        new_record = LoanCalculation(
+        row = dict(
             user_id          = user_id,
             requested_amount = requested_amount,
             tenure_months    = tenure_months,
@@ -59,9 +141,42 @@ class LoanCalculationRepository:
             monthly_emi      = monthly_emi,
             total_repayment  = total_repayment,
             total_interest   = total_interest,
+            amortization_schedule = amortization_schedule,
             status           = LoanCalcStatus.CHECKED,
         )
-        db.add(new_record)
+        if not supports_upsert(db):
+            record = LoanCalculationRepository._select_then_write(db, row)
+            db.commit()
+            db.refresh(record)
+            return record
+
+        stmt   = LoanCalculationRepository._upsert_statement(db).values(**row)
+        record = db.scalars(
+            stmt.returning(LoanCalculation),
+            execution_options={"populate_existing": True},
+        ).one()
+
+        # RETURNING already loaded the row as written.
+        commit_keeping_loaded(db)
+        return record
+
+    @staticmethod
+    def bulk_upsert(db: Session, rows: list[dict]) -> dict[int, int]:
+        """
+        Upserts many calculations in one multi-row statement and one commit.
+        Each row carries the same keys as upsert(). Returns {user_id: id}.
+        """
+        rows = [{**row, "status": LoanCalcStatus.CHECKED} for row in rows]
+        if not supports_upsert(db):
+            records = [LoanCalculationRepository._select_then_write(db, row) for row in rows]
+            ids = {record.user_id: record.id for record in records}
+            db.commit()
+            return ids
+
+        stmt = LoanCalculationRepository._upsert_statement(db).returning(
+            LoanCalculation.user_id, LoanCalculation.id
+        )
+        result = db.execute(stmt, rows)
+        ids = {user_id: id_ for user_id, id_ in result}
         db.commit()
-        db.refresh(new_record)
-        return new_record
\ No newline at end of file
+        return ids
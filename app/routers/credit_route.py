@@ -1,31 +1,49 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
-from core.database import get_db
-from repositories.credit_repository import CreditRepository
-from models.credit_profile import CreditProfile
+from core.database import AnySession, get_session, run_db
+from core.responses import FastJSONResponse
+from repositories.credit_repository import CreditProfileSnapshot, CreditRepository, is_fresh
+from services.bureau_client import BureauReport
+from services.credit_service import CreditService
 
 router = APIRouter()
 
 
 @router.post("/generate/{user_id}")
-def generate_credit_profile(
+async def generate_credit_profile(
     user_id: int,
     force_refresh: bool = Query(
         default=False,
         description="If True, generates a new dummy profile even if one already exists"
     ),
-    db: Session = Depends(get_db),
+    db: AnySession = Depends(get_session),
 ):
     """
+    Pulls the user's report from the credit bureau when TRANSUNION_API_URL
+    is configured (422 if the user has no PAN), otherwise generates a dummy
+    profile.
+
     Note:
-        The eligibility check also auto-generates a dummy profile if one
-        doesn't exist, so calling this manually is optional.
+        The eligibility check also auto-creates a profile if one doesn't
+        exist, so calling this manually is optional.
     """
+    reports, failed = await CreditService.pull_reports(db, [user_id], force=force_refresh)
+    if failed:
+        raise HTTPException(status_code=502, detail="Credit bureau unavailable. Please retry shortly.")
+    return await run_db(db, _generate_credit_profile, user_id, force_refresh, reports)
+
 
+def _generate_credit_profile(
+    db           : Session,
+    user_id      : int,
+    force_refresh: bool,
+    reports      : dict[int, BureauReport] | None,
+) -> dict:
     existing = CreditRepository.get_latest_credit_profile(db, user_id)
+    report   = None if reports is None else reports.get(user_id)
 
-    if existing and not force_refresh:
+    if is_fresh(existing) and not force_refresh:
         return {
             "message":           "Credit profile already exists. Use ?force_refresh=true to regenerate.",
             "credit_profile_id": existing.id,
@@ -45,11 +63,18 @@ def generate_credit_profile(
             ]
         }
 
+    if reports is not None and report is None:
+        # A bureau is configured but nothing was pulled: the user has no PAN.
+        raise HTTPException(status_code=422, detail="A PAN is required to pull a credit report.")
+
     try:
-        profile: CreditProfile = CreditRepository.create_dummy_credit_profile(
-            db=db,
-            user_id=user_id
-        )
+        if report is not None:
+            profile: CreditProfileSnapshot = CreditRepository.create_from_report(db, user_id, report)
+        else:
+            profile: CreditProfileSnapshot = CreditRepository.create_dummy_credit_profile(
+                db=db,
+                user_id=user_id
+            )
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -57,7 +82,11 @@ def generate_credit_profile(
         )
 
     return {
-        "message":            "Dummy credit profile created successfully",
+        "message": (
+            "Credit profile pulled from bureau successfully"
+            if report is not None
+            else "Dummy credit profile created successfully"
+        ),
         "credit_profile_id":  profile.id,
         "credit_score":       profile.credit_score,
         "bureau_name":        profile.bureau_name,
@@ -77,11 +106,15 @@ def generate_credit_profile(
 
 
 @router.get("/{user_id}")
-def get_credit_profile(user_id: int, db: Session = Depends(get_db)):
+async def get_credit_profile(user_id: int, db: AnySession = Depends(get_session)):
     """
     Returns the latest credit profile for a user.
     Useful for verifying what data the eligibility check will use.
     """
+    return FastJSONResponse(await run_db(db, _get_credit_profile, user_id))
+
+
+def _get_credit_profile(db: Session, user_id: int) -> dict:
     profile = CreditRepository.get_latest_credit_profile(db, user_id)
 
     if not profile:
@@ -1,92 +1,189 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from functools import lru_cache
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from services import money
 from services.eligibility_service import (
     ALLOWED_TENURES,
-    PLATFORM_MAX_LOAN_AMOUNT,
-    CREDIT_SCORE_TIERS,
+    ANNUAL_RATE_BP,
     get_apr,
 )
-from core.database import get_db
+from services.eligibility_policy import EligibilityPolicy, PolicyRegistry
+from services.loan_service import MIN_LOAN_AMOUNT, cap_for_tenure
+from services.schedule_cache import tenure_schedules
+from core.database import AnySession, get_session, run_db
+from core.responses import RawJSONResponse, fragment, splice
 from models.loan_eligibility import LoanEligibility
-from schemas.eligibility_result import (
-    EligibilityResultResponseExtended,
-    CreditSummary,
-    CreditScoreTier,
-)
+from schemas.eligibility_result import EligibilityResultResponseExtended
 from Utils.eligibility_messages import map_failure_reason
+from Utils.http_cache import cache_headers, etag_matches, make_etag, not_modified
 
 router = APIRouter()
 
 
 @router.get("/{user_id}", response_model=EligibilityResultResponseExtended)
-def get_eligibility_result(user_id: int, db: Session = Depends(get_db)):
+async def get_eligibility_result(
+    user_id: int,
+    request: Request,
+    include_schedules: bool = Query(
+        default=False,
+        description=(
+            "If True, adds an amortization schedule for every allowed tenure the user can borrow over, "
+            "at the amount that tenure allows"
+        )
+    ),
+    db     : AnySession = Depends(get_session),
+):
     """
     Returns the saved eligibility result for a user.
-    NOTE: EMI calculation and amortization schedule are NOT shown here.
-            Use POST /loan/calculate with user_id + tenure_months to get
-            full EMI breakdown, APR, and amortization schedule.
+    NOTE: With include_schedules, amortizationSchedules compares the
+            allowed tenures, each at the amount /loan/calculate would lend
+            over it, without saving anything.
+            Use POST /loan/calculate with user_id + tenure_months to save
+            the chosen tenure.
+
+    Responses carry a strong ETag. A poll with a matching If-None-Match
+    gets a 304 after one indexed lookup of latest_checked_at. The body is
+    rendered straight to bytes with the policy constants spliced in.
     """
-    record: LoanEligibility = (
+    # Same refresh interval as the check path, so a newly activated policy
+    # reaches the body and the ETag; between refreshes this costs nothing.
+    policy = PolicyRegistry.active()
+    if PolicyRegistry.is_stale():
+        policy = await run_db(db, PolicyRegistry.refresh)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        checked_at = await run_db(db, _get_eligibility_version, user_id)
+        if checked_at is not None:
+            etag = _eligibility_etag(user_id, checked_at, policy, include_schedules)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+
+    record = await run_db(db, _get_eligibility_record, user_id)
+    body   = _render_eligibility_result(record, policy, include_schedules)
+    return RawJSONResponse(
+        body,
+        headers=cache_headers(_eligibility_etag(user_id, record.latest_checked_at, policy, include_schedules)),
+    )
+
+
+def _eligibility_etag(
+    user_id          : int,
+    checked_at       : datetime,
+    policy           : EligibilityPolicy,
+    include_schedules: bool = False,
+) -> str:
+    # The tiers and platform max in the body come from the active policy.
+    return make_etag("eligibility", user_id, checked_at.isoformat(), policy.version, include_schedules)
+
+
+def _get_eligibility_version(db: Session, user_id: int) -> datetime | None:
+    return db.scalar(
+        select(LoanEligibility.latest_checked_at).where(LoanEligibility.user_id == user_id)
+    )
+
+
+def _get_eligibility_record(db: Session, user_id: int) -> LoanEligibility | None:
+    return (
         db.query(LoanEligibility)
         .filter(LoanEligibility.user_id == user_id)
         .first()
     )
 
+
+@lru_cache(maxsize=8)
+def _policy_fragment(policy: EligibilityPolicy) -> bytes:
+    """Members that depend only on the policy, serialized once per version."""
+    return fragment(
+        platformMaxLoanAmount   = float(policy.platform_max_amount),
+        platformProvidedTenures = ALLOWED_TENURES,
+        annualInterestRate      = get_apr(),
+        creditScoreTiers        = [
+            {
+                "minScore":      score,
+                "maxLoanAmount": amount,
+                "label":         f"₹{amount:,}",
+            }
+            for score, amount in policy.tiers
+        ],
+    )
+
+
+def _schedules_fragment(record: LoanEligibility, max_eligible_amount: float, include_schedules: bool) -> bytes:
+    """
+    amortizationSchedules member, or [] when not asked for or not eligible.
+    Each tenure is priced at what POST /loan/calculate would lend over it:
+    the eligible amount capped at the FOIR limit for that tenure. Tenures
+    where that falls below the minimum loan are left out.
+    """
+    schedules = []
+    if include_schedules and max_eligible_amount > 0:
+        by_principal: dict[int, list[int]] = {}
+        for tenure in ALLOWED_TENURES:
+            principal = cap_for_tenure(money.to_paise(max_eligible_amount), record, tenure)
+            if principal >= MIN_LOAN_AMOUNT * money.PAISE_PER_RUPEE:
+                by_principal.setdefault(principal, []).append(tenure)
+        by_tenure = {}
+        for principal, tenures in by_principal.items():
+            by_tenure.update(zip(tenures, tenure_schedules(principal, tenures, ANNUAL_RATE_BP)))
+        schedules = [by_tenure[tenure] for tenure in ALLOWED_TENURES if tenure in by_tenure]
+    return b'"amortizationSchedules":[' + b",".join(schedules) + b"]"
+
+
+def _render_eligibility_result(
+    record           : LoanEligibility | None,
+    policy           : EligibilityPolicy,
+    include_schedules: bool = False,
+) -> bytes:
+    """
+    JSON body in the EligibilityResultResponseExtended shape. Built straight
+    from the ORM row, so it skips response-model validation.
+    """
     if not record:
         raise HTTPException(
             status_code=404,
             detail="No eligibility record found. Please run an eligibility check first."
         )
 
-    status  = record.eligibility_status
-    message = map_failure_reason(record.failure_reason, status)
+    status   = record.eligibility_status
+    rejected = status == "REJECTED"
 
-    credit_summary = CreditSummary(
-        currentScore  = record.credit_score_used,
-        previousScore = record.previous_credit_score_used,
-        bureau        = record.bureau_name,
-    )
+    financial_summary = None
+    if record.income_used is not None:
+        financial_summary = {
+            "incomeConsidered": float(record.income_used or 0),
+            "existingEmi":      float(record.existing_emi or 0),
+            "proposedEmi":      float(record.proposed_emi or 0),
+            "foir":             float(record.foir_ratio or 0),
+            "allowedFoir":      float(record.max_allowed_foir or policy.max_foir),
+            "maxEligibleEmi":   float(record.max_eligible_emi or 0),
+        }
 
-    credit_score_tiers = [
-        CreditScoreTier(
-            minScore      = score,
-            maxLoanAmount = amount,
-            label         = f"₹{amount:,}"
-        )
-        for score, amount in CREDIT_SCORE_TIERS
-    ]
-    if status == "REJECTED":
-        return EligibilityResultResponseExtended(
-            status                  = status,
-            message                 = message,
-            maxEligibleAmount       = 0.0,
-            maxAffordableEmi        = float(record.max_eligible_emi or 0),
-            platformMaxLoanAmount   = float(PLATFORM_MAX_LOAN_AMOUNT),
-            platformProvidedTenures = ALLOWED_TENURES,
-            annualInterestRate      = get_apr(),
-            failureReason           = record.failure_reason,
-            creditScoreTiers        = credit_score_tiers,
-            creditSummary           = credit_summary,
-            evaluatedAt             = record.latest_checked_at,
-            previouslyCheckedAt     = record.previously_checked_at,
-        )
-    max_eligible_amount = min(
+    max_eligible_amount = 0.0 if rejected else min(
         float(record.max_eligible_amount or 0),
-        float(PLATFORM_MAX_LOAN_AMOUNT),
+        float(policy.platform_max_amount),
     )
 
-    return EligibilityResultResponseExtended(
-        status                  = status,
-        message                 = message,
-        maxEligibleAmount       = max_eligible_amount,
-        maxAffordableEmi        = float(record.max_eligible_emi or 0),
-        platformMaxLoanAmount   = float(PLATFORM_MAX_LOAN_AMOUNT),
-        platformProvidedTenures = ALLOWED_TENURES,
-        annualInterestRate      = get_apr(),
-        failureReason           = None,
-        creditScoreTiers        = credit_score_tiers,
-        creditSummary           = credit_summary,
-        evaluatedAt             = record.latest_checked_at,
-        previouslyCheckedAt     = record.previously_checked_at,
+    return splice(
+        {
+            "status":              status,
+            "message":             map_failure_reason(record.failure_reason, status),
+            "maxEligibleAmount":   max_eligible_amount,
+            "maxAffordableEmi":    float(record.max_eligible_emi or 0),
+            "failureReason":       record.failure_reason if rejected else None,
+            "financialSummary":    financial_summary,
+            "creditSummary": {
+                "currentScore":  record.credit_score_used,
+                "previousScore": record.previous_credit_score_used,
+                "bureau":        record.bureau_name,
+            },
+            "evaluatedAt":         record.latest_checked_at,
+            "previouslyCheckedAt": record.previously_checked_at,
+            "policyVersion":       record.policy_version,
+        },
+        _policy_fragment(policy),
+        _schedules_fragment(record, max_eligible_amount, include_schedules),
     )
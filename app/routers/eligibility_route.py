@@ -1,26 +1,45 @@
 from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
-from core.database import get_db
+from core.database import AnySession, get_session, run_db
 from models.user_profile import UserProfile
 from services.eligibility_service import (
     EligibilityService,
     ALLOWED_TENURES,
-    PLATFORM_MAX_LOAN_AMOUNT,
-    CREDIT_SCORE_TIERS,
+    MAX_ELIGIBILITY_BATCH,
     get_apr,
 )
+from services.eligibility_policy import PolicyRegistry
+from services.bureau_client import BureauReport
+from services.credit_service import CreditService
 
 router = APIRouter()
 
+BUREAU_UNAVAILABLE = "Credit bureau unavailable. Please retry shortly."
+
+
+class EligibilityBatchRequest(BaseModel):
+    """
+    Input payload for a cohort eligibility re-score.
+    Duplicate user_ids are evaluated once; unknown ones are reported back.
+    """
+    user_ids: list[int] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_ELIGIBILITY_BATCH,
+        description=f"Up to {MAX_ELIGIBILITY_BATCH:,} user ids.",
+    )
+
 
 @router.post("/check/{user_id}")
-def check_loan_eligibility(
+async def check_loan_eligibility(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AnySession = Depends(get_session),
 ):
     """
-    Credit Score → Approved Amount:
+    Credit Score → Approved Amount (default policy; the live tiers come from
+    the active eligibility policy version):
         >= 800  →  ELIGIBLE  →  ₹20,000
         >= 750  →  ELIGIBLE  →  ₹15,000
         >= 700  →  ELIGIBLE  →  ₹10,000
@@ -31,6 +50,13 @@ def check_loan_eligibility(
           Use POST /loan/calculate with user_id + tenure_months to get
           full EMI breakdown, APR, and amortization schedule.
     """
+    reports, failed = await CreditService.pull_reports(db, [user_id])
+    if failed:
+        raise HTTPException(status_code=502, detail=BUREAU_UNAVAILABLE)
+    return await run_db(db, _check_loan_eligibility, user_id, reports)
+
+
+def _check_loan_eligibility(db: Session, user_id: int, reports: dict[int, BureauReport] | None) -> dict:
     user: UserProfile = (
         db.query(UserProfile)
         .filter(UserProfile.user_id == user_id)
@@ -40,7 +66,7 @@ def check_loan_eligibility(
         raise HTTPException(status_code=404, detail="User not found")
 
     try:
-        eligibility = EligibilityService.check_eligibility(db=db, user=user)
+        eligibility = EligibilityService.check_eligibility(db=db, user=user, reports=reports)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -54,6 +80,7 @@ def check_loan_eligibility(
                 "current_score": eligibility.credit_score_used,
                 "bureau":        eligibility.bureau_name,
             },
+            "policy_version": eligibility.policy_version,
             "Message": "Unfortunately, you are not eligible for a loan based on your current credit score. Please review the credit score tiers and consider improving your credit profile to become eligible in the future.",
         }
     approved_amount = float(eligibility.max_eligible_amount or 0)
@@ -65,11 +92,56 @@ def check_loan_eligibility(
             "approved_amount":      approved_amount,
             "annual_interest_rate": get_apr(),
             "available_tenures":    ALLOWED_TENURES,
-            "platform_max_amount":  PLATFORM_MAX_LOAN_AMOUNT,
+            "platform_max_amount":  PolicyRegistry.active().platform_max_amount,
         },
         "credit_summary": {
             "current_score":  eligibility.credit_score_used,
             "bureau":         eligibility.bureau_name,
         },
+        "policy_version": eligibility.policy_version,
         "Message": "Congratulations! You are eligible for a loan. Please proceed to calculate your EMI based on your approved amount and preferred tenure.",
-    }
\ No newline at end of file
+    }
+
+
+@router.post("/check-batch")
+async def check_loan_eligibility_batch(
+    payload: EligibilityBatchRequest,
+    db: AnySession = Depends(get_session),
+):
+    """
+    Bulk form of POST /check/{user_id} using the same credit score tiers.
+    Users, latest credit profiles and decisions are read and written in
+    set-based statements per chunk instead of per user. When a bureau is
+    configured, users without a profile are pulled concurrently first;
+    those whose pull fails are skipped and listed as bureau_unavailable.
+    """
+    reports, failed = await CreditService.pull_reports(db, payload.user_ids)
+    unavailable     = set(failed)
+    user_ids        = [user_id for user_id in payload.user_ids if user_id not in unavailable]
+    result          = await run_db(db, EligibilityService.check_eligibility_batch, user_ids, reports)
+    decisions       = result["results"]
+    eligible        = sum(1 for d in decisions if d["eligibility_status"] == "ELIGIBLE")
+
+    return {
+        "status": "success",
+        "summary": {
+            "requested": len(payload.user_ids),
+            "evaluated": len(decisions),
+            "eligible":  eligible,
+            "rejected":  len(decisions) - eligible,
+            "not_found": result["not_found"],
+            "bureau_unavailable": failed,
+        },
+        "results": [
+            {
+                "user_id":            d["user_id"],
+                "eligibility_status": d["eligibility_status"],
+                "failure_reason":     d.get("failure_reason"),
+                "approved_amount":    float(d.get("max_eligible_amount") or 0),
+                "credit_score":       d.get("credit_score_used"),
+                "bureau":             d.get("bureau_name"),
+                "policy_version":     d.get("policy_version"),
+            }
+            for d in decisions
+        ],
+    }
@@ -0,0 +1,48 @@
+import hmac
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from core import database
+from core.config import get_settings
+from core.pool import pool_status
+from repositories.credit_repository import credit_profile_cache
+from services.schedule_cache import schedule_cache
+
+
+async def require_internal_token(x_internal_token: str | None = Header(default=None)) -> None:
+    """
+    Serves /internal only to callers presenting INTERNAL_API_TOKEN. With no
+    token configured the routes answer 404, as if they did not exist.
+    """
+    expected = get_settings().INTERNAL_API_TOKEN
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_internal_token is None or not hmac.compare_digest(x_internal_token.encode(), expected.encode()):
+        raise HTTPException(status_code=403, detail="Invalid internal token.")
+
+
+router = APIRouter(dependencies=[Depends(require_internal_token)])
+
+
+@router.get("/pool")
+async def get_pool_stats():
+    """
+    Connection pool occupancy (checked out, idle, overflow) and checkout
+    wait times for this worker. "async" is present only when ASYNC_DB is on.
+    """
+    stats = {"sync": pool_status(database.engine)}
+    if database.async_engine is not None:
+        stats["async"] = pool_status(database.async_engine.sync_engine)
+    return stats
+
+
+@router.get("/schedule-cache")
+async def get_schedule_cache_stats():
+    """Hit/miss/eviction counters of this worker's tenure comparison schedule cache."""
+    return schedule_cache.stats()
+
+
+@router.get("/credit-cache")
+async def get_credit_cache_stats():
+    """Hit/miss/eviction counters of this worker's latest-credit-profile cache."""
+    return credit_profile_cache.stats()
@@ -1,22 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import AsyncIterator, Literal
 
-from core.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
+
+from core.database import AnySession, get_session, open_session, run_db
+from core.responses import FastJSONResponse
+from models.loan_calculation import LoanCalculation
+from repositories.loan_calculator_repo import VERSION_COLUMNS
 from services.loan_service import LoanCalculationService
+from Utils.http_cache import cache_headers, etag_matches, make_etag, not_modified
+from Utils.schedule_export import EXPORT_MEDIA_TYPES, csv_header, encode_rows
 
 router = APIRouter()
+
+
+class ScheduleExportRequest(BaseModel):
+    user_ids: list[int] | None = Field(
+        default=None,
+        min_length=1,
+        description="Users to export. Omit to export every saved calculation.",
+    )
+    format: Literal["ndjson", "csv"] = "ndjson"
+
 @router.get("/result/{user_id}")
-def get_loan_calculation(
+async def get_loan_calculation(
     user_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    db     : AnySession = Depends(get_session),
 ):
     """
     Fetches the saved EMI calculation for a user.
 
-    Returns the most recent calculation stored in loan_calculations.
-    
+    Returns the most recent calculation stored in loan_calculations with
+    the amortization schedule saved alongside it, so the result matches
+    what /loan/calculate showed even if the rate card has changed since.
+    A matching If-None-Match is answered with a 304 from a lookup of the
+    version columns only.
     """
-    record = LoanCalculationService.get_calculation(db, user_id)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        version = await run_db(db, LoanCalculationService.get_calculation_version, user_id)
+        if version is not None:
+            etag = _calculation_etag(user_id, version)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+
+    record = await run_db(db, LoanCalculationService.get_calculation, user_id)
 
     if not record:
         raise HTTPException(
@@ -27,7 +58,7 @@ def get_loan_calculation(
             ),
         )
 
-    return {
+    return FastJSONResponse({
         "status": "success",
         "data": {
             "id":      record.id,
@@ -40,5 +71,51 @@ def get_loan_calculation(
             "total_repayment":  record.total_repayment,
             "total_interest":   record.total_interest,
             "status":                record.status,
+            "amortization_schedule": LoanCalculationService.saved_schedule(record),
         },
-    }
\ No newline at end of file
+    }, headers=cache_headers(_calculation_etag(user_id, _version_of(record))))
+
+
+def _version_of(record: LoanCalculation) -> tuple:
+    return tuple(getattr(record, column.key) for column in VERSION_COLUMNS)
+
+
+def _calculation_etag(user_id: int, version: tuple) -> str:
+    return make_etag("loan-calculation", user_id, *version)
+
+
+@router.post("/schedule/export")
+async def export_schedules(payload: ScheduleExportRequest):
+    """
+    Streams the amortization schedules of saved EMI calculations as NDJSON
+    or CSV, one row per loan-month. Calculations are read in keyset pages
+    and encoded as they are produced, so memory stays flat regardless of
+    how many loans are exported.
+    """
+    return StreamingResponse(
+        _stream_schedules(payload.user_ids, payload.format),
+        media_type=EXPORT_MEDIA_TYPES[payload.format],
+        headers={
+            "Content-Disposition": f'attachment; filename="amortization_schedules.{payload.format}"',
+        },
+    )
+
+
+async def _stream_schedules(user_ids: list[int] | None, fmt: str) -> AsyncIterator[str]:
+    if fmt == "csv":
+        yield csv_header()
+
+    async with open_session() as db:
+        after_id = 0
+        while True:
+            page = await run_db(db, LoanCalculationService.get_export_page, after_id, user_ids)
+            if not page:
+                return
+            after_id = page[-1].id
+            # Decoding and encoding a page is CPU-bound: keep it off the event loop.
+            yield await run_in_threadpool(_encode_page, page, fmt)
+            db.expunge_all()
+
+
+def _encode_page(page: list[LoanCalculation], fmt: str) -> str:
+    return encode_rows(LoanCalculationService.schedule_rows(page), fmt)
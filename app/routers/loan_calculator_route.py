@@ -1,9 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
 
-from core.database import get_db
-from services.loan_service import LoanCalculationService, ALLOWED_TENURES
+from core.database import AnySession, get_session, run_db
+from services.loan_service import LoanCalculationService, ALLOWED_TENURES, MAX_BATCH_SIZE
 
 router = APIRouter()
 
@@ -14,7 +13,8 @@ class LoanCalculateRequest(BaseModel):
     Note:
         The loan amount is NOT provided by the user. It is automatically
         fetched from the loan_eligibility table (max_eligible_amount).
-        EMI is always calculated on the user's full eligible amount.
+        EMI is calculated on the full eligible amount, capped at what the
+        user's FOIR allows over the chosen tenure.
     """
     user_id       : int
     tenure_months : int = Field(
@@ -23,14 +23,28 @@ class LoanCalculateRequest(BaseModel):
     )
 
 
+class LoanCalculateBatchRequest(BaseModel):
+    """
+    Input payload for bulk EMI calculation (portfolio repricing).
+    Each item follows the same rules as LoanCalculateRequest.
+    """
+    items: list[LoanCalculateRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_SIZE,
+        description=f"Up to {MAX_BATCH_SIZE:,} user_id + tenure_months pairs.",
+    )
+
+
 @router.post("/calculate")
-def calculate_emi(
+async def calculate_emi(
     payload: LoanCalculateRequest,
-    db: Session = Depends(get_db),
+    db: AnySession = Depends(get_session),
 ):
     try:
-        result = LoanCalculationService.calculate_and_save(
-            db            = db,
+        result = await run_db(
+            db,
+            LoanCalculationService.calculate_and_save,
             user_id       = payload.user_id,
             tenure_months = payload.tenure_months,
         )
@@ -56,3 +70,25 @@ def calculate_emi(
             "amortization_schedule": result["amortization_schedule"],
         },
     }
+
+
+@router.post("/calculate-batch")
+async def calculate_emi_batch(
+    payload: LoanCalculateBatchRequest,
+    db: AnySession = Depends(get_session),
+):
+    try:
+        result = await run_db(
+            db,
+            LoanCalculationService.calculate_batch_and_save,
+            items = [(item.user_id, item.tenure_months) for item in payload.items],
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "status":  "success",
+        "message": f"EMI calculated and saved for {len(result['results'])} of {len(payload.items)} users.",
+        "data":    result["results"],
+        "errors": result["errors"],
+    }
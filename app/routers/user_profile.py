@@ -1,6 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from core.database import get_db
+from core.database import AnySession, get_session, run_db
 from schemas.user_profile_sch import UserProfileCreateSchema
 from services.user_profile_service import create_user_profile
 
@@ -8,14 +7,14 @@ router = APIRouter()
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
-def create_profile(payload: UserProfileCreateSchema, db: Session = Depends(get_db)):
+async def create_profile(payload: UserProfileCreateSchema, db: AnySession = Depends(get_session)):
     """Create a new user profile only if PAN exists.
 
     If PAN is present, the user's `pan_status` will be set to VERIFIED and
     a KYC PAN record will be added to `kyc_pan_verifications` table.
     """
     try:
-        user = create_user_profile(db, payload)
+        user = await run_db(db, create_user_profile, payload)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
@@ -47,6 +47,7 @@ class EligibilityResultResponseExtended(BaseModel):
     creditSummary:    Optional[CreditSummary]    = None
     evaluatedAt:         Optional[datetime] = None
     previouslyCheckedAt: Optional[datetime] = None
+    policyVersion:       Optional[str]      = None
 
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -0,0 +1,231 @@
+"""
+Vectorised EMI / amortization engine.
+
+Prices N loans in one array pass instead of one Python loop per loan.
+Amounts are int64 paise and rates are basis points, and every rounding
+step matches services.money to the paisa, so batch and online schedules
+are identical.
+"""
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+
+from services.money import (
+    MONEY_ROUNDING,
+    MONTHLY_RATE_DENOMINATOR,
+    PAISE_PER_RUPEE,
+    ROUND_HALF_EVEN,
+    annuity_factor,
+    emi_factor,
+    emi_paise,
+    max_principal_paise,
+    percent_bp,
+    to_paise,
+)
+
+# EMIs whose float estimate lies this close (in paise) to a half-paisa are
+# recomputed exactly; everywhere else the float estimate rounds correctly.
+_TIE_TOLERANCE = 1e-6
+
+# Floored principals are recomputed exactly when their float estimate lies
+# within this fraction of itself (or _TIE_TOLERANCE) of a whole paisa.
+_FLOOR_RELATIVE_TOLERANCE = 1e-12
+
+# (tenure, annual rate bp) pairs are folded into one int64 key, tenure in
+# the high bits, so finding the distinct pairs is a 1-D np.unique rather
+# than a row-wise sort. Rates stay far below 2**20 bp (10,485%).
+_RATE_BITS = 20
+_RATE_MASK = (1 << _RATE_BITS) - 1
+
+
+def _pair_keys(n: np.ndarray, bp: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(distinct (tenure, bp) keys, index of each element's key), keys ascending."""
+    return np.unique((n << _RATE_BITS) | bp, return_inverse=True)
+
+
+def div_round_array(numerator: np.ndarray, denominator, rounding: str = MONEY_ROUNDING) -> np.ndarray:
+    """Element-wise money.div_round for int64 arrays and a positive denominator."""
+    quotient, remainder = np.divmod(numerator, denominator)
+    twice = 2 * remainder
+    tie   = twice == denominator
+
+    if rounding == ROUND_HALF_EVEN:
+        bump = (twice > denominator) | (tie & (quotient % 2 == 1))
+    else:
+        bump = (twice > denominator) | (tie & (quotient >= 0))
+    return quotient + bump
+
+
+def to_paise_array(amounts) -> np.ndarray:
+    """Rupee amounts (ints, floats or Decimals) to int64 paise, as money.to_paise."""
+    values = np.asarray(amounts if isinstance(amounts, np.ndarray) else list(amounts))
+    if values.dtype.kind in "iub":
+        return values.astype(np.int64) * PAISE_PER_RUPEE
+    if values.dtype.kind != "f":
+        return np.fromiter((to_paise(amount) for amount in values.ravel()), dtype=np.int64).reshape(values.shape)
+
+    scaled   = values * PAISE_PER_RUPEE
+    paise    = np.rint(scaled).astype(np.int64)
+    frac     = scaled - np.floor(scaled)
+    near_tie = np.flatnonzero(np.abs(frac - 0.5) < _TIE_TOLERANCE)
+    flat     = paise.reshape(-1)
+    for i in near_tie:
+        flat[i] = to_paise(float(values.flat[i]))
+    return paise
+
+
+def _emi_paise(p: np.ndarray, n: np.ndarray, bp: np.ndarray) -> np.ndarray:
+    if not p.size:
+        return np.zeros(p.shape, dtype=np.int64)
+
+    # One exact factor per distinct (tenure, rate), not per loan.
+    keys, inverse = _pair_keys(n, bp)
+    factors  = np.array([float(emi_factor(key >> _RATE_BITS, key & _RATE_MASK)) for key in keys.tolist()])
+    estimate = p * factors[inverse.ravel()].reshape(p.shape)
+    emi      = np.rint(estimate).astype(np.int64)
+
+    frac     = estimate - np.floor(estimate)
+    near_tie = np.flatnonzero(np.abs(frac - 0.5) < _TIE_TOLERANCE)
+    for i in near_tie:
+        emi[i] = emi_paise(int(p[i]), int(n[i]), int(bp[i]))
+    return emi
+
+
+def _broadcast(principals, tenures, annual_bp) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    p  = np.asarray(principals, dtype=np.int64)
+    n  = np.asarray(tenures, dtype=np.int64)
+    bp = np.asarray(annual_bp, dtype=np.int64)
+    return tuple(np.ascontiguousarray(a) for a in np.broadcast_arrays(p, n, bp))
+
+
+def max_principal_paise_batch(emis, tenures, annual_bp) -> np.ndarray:
+    """
+    Element-wise money.max_principal_paise over broadcast int64 arrays: the
+    largest principal (paise, floored) each EMI in paise services.
+    """
+    e, n, bp = _broadcast(emis, tenures, annual_bp)
+    if not e.size:
+        return np.zeros(e.shape, dtype=np.int64)
+
+    # One exact factor per distinct (tenure, rate), not per element.
+    keys, inverse = _pair_keys(n, bp)
+    factors   = np.array([float(annuity_factor(key >> _RATE_BITS, key & _RATE_MASK)) for key in keys.tolist()])
+    estimate  = e * factors[inverse.ravel()].reshape(e.shape)
+    principal = np.floor(estimate).astype(np.int64)
+
+    tolerance  = np.maximum(_TIE_TOLERANCE, estimate * _FLOOR_RELATIVE_TOLERANCE)
+    near_whole = np.flatnonzero(np.abs(estimate - np.rint(estimate)) < tolerance)
+    flat       = principal.reshape(-1)
+    for i in near_whole:
+        flat[i] = max_principal_paise(int(e.flat[i]), int(n.flat[i]), int(bp.flat[i]))
+    return principal
+
+
+def calculate_emi_batch(principals, tenures, annual_rate) -> np.ndarray:
+    """EMI in rupees for every (principal, tenure, annual rate %) triple."""
+    p, n, bp = _broadcast(
+        to_paise_array(np.atleast_1d(principals)),
+        tenures,
+        [percent_bp(rate) for rate in np.atleast_1d(annual_rate).tolist()],
+    )
+    return _emi_paise(p, n, bp) / PAISE_PER_RUPEE
+
+
+@dataclass(frozen=True)
+class AmortizationBatch:
+    """
+    Schedules for N loans, all amounts in int64 paise. Month columns past a
+    loan's own tenure are zero.
+    Shapes: principals/tenures/emi -> (N,), principal/interest/balance -> (N, max_tenure)
+    """
+    principals: np.ndarray
+    tenures   : np.ndarray
+    emi       : np.ndarray
+    principal : np.ndarray
+    interest  : np.ndarray
+    balance   : np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.principals)
+
+    @property
+    def total_repayment(self) -> np.ndarray:
+        return self.emi * self.tenures
+
+    @property
+    def total_interest(self) -> np.ndarray:
+        return self.total_repayment - self.principals
+
+    @cached_property
+    def _rupees(self) -> tuple[list, list, list, list]:
+        # Converted for the whole batch at once; per-row numpy slicing would
+        # cost more than building the dicts.
+        return (
+            (self.emi / PAISE_PER_RUPEE).tolist(),
+            (self.principal / PAISE_PER_RUPEE).tolist(),
+            (self.interest / PAISE_PER_RUPEE).tolist(),
+            (self.balance / PAISE_PER_RUPEE).tolist(),
+        )
+
+    def schedule(self, index: int) -> list[dict]:
+        """Row ``index`` in the list-of-dicts shape of money.schedule_rows (rupees)."""
+        emis, principals, interests, balances = self._rupees
+        tenure    = int(self.tenures[index])
+        emi       = emis[index]
+        principal = principals[index]
+        interest  = interests[index]
+        balance   = balances[index]
+
+        return [
+            {
+                "month":     month,
+                "emi":       emi,
+                "principal": principal[month - 1],
+                "interest":  interest[month - 1],
+                "balance":   balance[month - 1],
+            }
+            for month in range(1, tenure + 1)
+        ]
+
+
+def build_schedules(principals, tenures, annual_bp) -> AmortizationBatch:
+    """
+    Amortization schedules for N loans from principals in paise and annual
+    rates in basis points. Loops over months (at most the longest tenure),
+    never over loans.
+    """
+    p, n, bp = _broadcast(principals, tenures, annual_bp)
+
+    emi       = _emi_paise(p, n, bp)
+    max_n     = int(n.max()) if n.size else 0
+    principal = np.zeros((p.size, max_n), dtype=np.int64)
+    interest  = np.zeros((p.size, max_n), dtype=np.int64)
+    balance   = np.zeros((p.size, max_n), dtype=np.int64)
+    running   = p.copy()
+
+    for month in range(1, max_n + 1):
+        live = n >= month
+        last = n == month
+
+        interest_part  = div_round_array(running * bp, MONTHLY_RATE_DENOMINATOR)
+        principal_part = emi - interest_part
+        remaining      = running - principal_part
+
+        principal_part = np.where(last, principal_part + remaining, principal_part)
+        remaining      = np.where(last, 0, remaining)
+
+        col = month - 1
+        interest[:, col]  = np.where(live, interest_part, 0)
+        principal[:, col] = np.where(live, principal_part, 0)
+        balance[:, col]   = np.where(live, np.maximum(remaining, 0), 0)
+        running           = np.where(live, remaining, running)
+
+    return AmortizationBatch(
+        principals = p,
+        tenures    = n,
+        emi        = emi,
+        principal  = principal,
+        interest   = interest,
+        balance    = balance,
+    )
@@ -0,0 +1,206 @@
+"""
+TransUnion credit bureau client.
+
+One pooled, keep-alive httpx.AsyncClient per worker. Concurrent pulls for
+the same PAN are coalesced: the first caller starts the request and later
+callers await the same task, so a burst of checks for one applicant costs
+one bureau call. Responses are parsed into an immutable BureauReport here,
+before any DB session is involved; CreditRepository.create_from_report
+persists them.
+
+get_bureau_client() returns None while TRANSUNION_API_URL is unset, and
+callers fall back to dummy profiles.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Iterable
+
+import httpx
+
+from core.config import Settings, get_settings
+from core.metrics import BUREAU_COALESCED, BUREAU_REQUEST_SECONDS
+from services import money
+
+CONNECT_TIMEOUT_SECONDS = 3.0
+KEEPALIVE_EXPIRY_SECONDS = 30.0
+
+
+class BureauError(Exception):
+    """The bureau could not be reached or returned an unusable report."""
+
+
+@dataclass(frozen=True)
+class BureauAccount:
+    loan_type : str | None
+    emi_amount: Decimal
+    status    : str | None
+
+
+@dataclass(frozen=True)
+class BureauReport:
+    bureau_name        : str
+    credit_score       : int
+    report_reference_id: str | None
+    accounts           : tuple[BureauAccount, ...]
+    raw                : dict
+
+    @property
+    def active_accounts(self) -> list[BureauAccount]:
+        return [acc for acc in self.accounts if acc.status == "ACTIVE"]
+
+    @property
+    def total_existing_emi(self) -> Decimal:
+        return sum((acc.emi_amount for acc in self.active_accounts), Decimal("0.00"))
+
+
+def parse_report(data: dict) -> BureauReport:
+    """Bureau JSON to a BureauReport; EMIs become exact two-place Decimals."""
+    try:
+        return BureauReport(
+            bureau_name         = data.get("bureau", "TransUnion"),
+            credit_score        = int(data["creditScore"]),
+            report_reference_id = data.get("reportId"),
+            accounts            = tuple(
+                BureauAccount(
+                    loan_type  = acc.get("loanType"),
+                    emi_amount = money.to_decimal(money.to_paise(acc.get("emiAmount", 0))),
+                    status     = acc.get("status"),
+                )
+                for acc in data.get("accounts", [])
+            ),
+            raw                 = data,
+        )
+    except (AttributeError, KeyError, TypeError, ValueError, ArithmeticError) as e:
+        raise BureauError(f"Malformed bureau response: {e!r}") from e
+
+
+class BureauClient:
+
+    def __init__(
+        self,
+        url            : str,
+        api_key        : str | None = None,
+        timeout        : float = 10.0,
+        max_connections: int = 20,
+        max_keepalive  : int = 10,
+    ):
+        self.url             = url
+        self.max_connections = max_connections
+        limits = httpx.Limits(
+            max_connections           = max_connections,
+            max_keepalive_connections = max_keepalive,
+            keepalive_expiry          = KEEPALIVE_EXPIRY_SECONDS,
+        )
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self._client = httpx.AsyncClient(
+            headers   = headers,
+            timeout   = httpx.Timeout(timeout, connect=min(timeout, CONNECT_TIMEOUT_SECONDS)),
+            # Limits must go on the transport when one is given. retries
+            # covers connection failures only, never a sent request.
+            transport = httpx.AsyncHTTPTransport(limits=limits, retries=1),
+        )
+        self._in_flight: dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "BureauClient":
+        return cls(
+            url             = settings.TRANSUNION_API_URL,
+            api_key         = settings.TRANSUNION_API_KEY,
+            timeout         = settings.BUREAU_TIMEOUT_SECONDS,
+            max_connections = settings.BUREAU_MAX_CONNECTIONS,
+            max_keepalive   = settings.BUREAU_MAX_KEEPALIVE,
+        )
+
+    async def fetch(self, pan: str) -> BureauReport:
+        """
+        Latest report for ``pan``. Joins the in-flight pull for the same PAN
+        if there is one. The pull runs as its own task, so a caller that is
+        cancelled (e.g. a dropped client) does not cancel it for the others.
+        """
+        task = self._in_flight.get(pan)
+        if task is None:
+            task = asyncio.ensure_future(self._pull(pan))
+            self._in_flight[pan] = task
+            task.add_done_callback(lambda done: self._forget(pan, done))
+        else:
+            BUREAU_COALESCED.inc()
+        return await asyncio.shield(task)
+
+    async def fetch_many(
+        self,
+        pans           : Iterable[str],
+        max_concurrency: int | None = None,
+    ) -> dict[str, BureauReport | BureauError]:
+        """
+        Concurrent fetch(), at most ``max_concurrency`` (default
+        max_connections) at a time. The rest wait here rather than in the
+        connection pool, where a large batch would use up its pool timeout
+        and fail; a lower bound leaves connections free for interactive pulls.
+        """
+        pans  = list(dict.fromkeys(pans))
+        limit = asyncio.Semaphore(max_concurrency or self.max_connections)
+
+        async def fetch(pan: str) -> BureauReport:
+            async with limit:
+                return await self.fetch(pan)
+
+        results = await asyncio.gather(*(fetch(pan) for pan in pans), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, BureauError):
+                raise result
+        return dict(zip(pans, results))
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def _forget(self, pan: str, task: asyncio.Task) -> None:
+        if self._in_flight.get(pan) is task:
+            del self._in_flight[pan]
+        if not task.cancelled():
+            # Retrieved here so an exception nobody awaited is not logged.
+            task.exception()
+
+    async def _pull(self, pan: str) -> BureauReport:
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self._client.post(
+                self.url,
+                json={"pan": pan, "consent": True, "purpose": "LOAN_UNDERWRITING"},
+            )
+            response.raise_for_status()
+            report  = parse_report(response.json())
+            outcome = "ok"
+            return report
+        except httpx.TimeoutException as e:
+            outcome = "timeout"
+            raise BureauError(f"Bureau timed out: {e!r}") from e
+        except httpx.HTTPError as e:
+            raise BureauError(f"Bureau request failed: {e!r}") from e
+        except ValueError as e:
+            raise BureauError(f"Bureau returned invalid JSON: {e!r}") from e
+        finally:
+            BUREAU_REQUEST_SECONDS.labels(outcome=outcome).observe(time.perf_counter() - started)
+
+
+_client: BureauClient | None = None
+
+
+def get_bureau_client() -> BureauClient | None:
+    """This worker's client, created on first use; None when no bureau is configured."""
+    global _client
+    settings = get_settings()
+    if not settings.TRANSUNION_API_URL:
+        return None
+    if _client is None:
+        _client = BureauClient.from_settings(settings)
+    return _client
+
+
+async def close_bureau_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
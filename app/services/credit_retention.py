@@ -0,0 +1,93 @@
+"""
+Credit profile retention.
+
+Every bureau pull (and every force_refresh) adds a profile; without this
+the per-user history, and with it credit_profiles and its indexes, grows
+forever. A sweep keeps each user's CREDIT_RETENTION_KEEP most recent
+profiles plus any profile a LoanEligibility row points at, and moves the
+rest to credit_profile_archive (summary columns only; accounts and raw
+reports are dropped). Work is done in bounded batches of users, one short
+transaction each, resuming from a user_id cursor.
+
+Run it from manage.py (prune-credit-profiles) or in each worker every
+CREDIT_RETENTION_INTERVAL_SECONDS.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from core.config import get_settings
+from core.database import SessionLocal
+from repositories.credit_retention_repo import CreditRetentionRepository
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RetentionStats:
+    batches : int = 0
+    users   : int = 0
+    archived: int = 0
+
+
+class CreditRetentionService:
+
+    @staticmethod
+    def prune_batch(db: Session, keep: int, after_user_id: int, batch_size: int) -> tuple[int, int, int | None]:
+        """
+        One batch: (users swept, profiles archived, cursor for the next
+        batch or None when the sweep is done). Commits on success.
+        """
+        user_ids = CreditRetentionRepository.users_over_limit(db, keep, after_user_id, batch_size)
+        if not user_ids:
+            db.rollback()
+            return 0, 0, None
+
+        expired  = CreditRetentionRepository.expired_profile_ids(db, user_ids, keep)
+        archived = CreditRetentionRepository.archive_profiles(db, expired)
+        db.commit()
+        return len(user_ids), archived, user_ids[-1]
+
+    @staticmethod
+    def prune(
+        keep       : int | None = None,
+        batch_size : int | None = None,
+        max_batches: int | None = None,
+    ) -> RetentionStats:
+        """A full sweep (or ``max_batches`` of one) with a fresh session per batch."""
+        settings   = get_settings()
+        keep       = keep if keep is not None else settings.CREDIT_RETENTION_KEEP
+        batch_size = batch_size if batch_size is not None else settings.CREDIT_RETENTION_BATCH_SIZE
+        if keep < 1:
+            raise ValueError("At least the latest credit profile must be kept.")
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1.")
+
+        stats  = RetentionStats()
+        cursor = 0
+        while max_batches is None or stats.batches < max_batches:
+            with SessionLocal() as db:
+                users, archived, cursor = CreditRetentionService.prune_batch(db, keep, cursor, batch_size)
+            if cursor is None:
+                break
+            stats.batches  += 1
+            stats.users    += users
+            stats.archived += archived
+        return stats
+
+
+async def run_retention_loop(interval_seconds: float) -> None:
+    """Background sweep for the app lifespan; sync DB work runs in the threadpool."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            stats = await run_in_threadpool(CreditRetentionService.prune)
+        except Exception:
+            # The next sweep retries; a failed batch was rolled back whole.
+            logger.exception("Credit profile retention sweep failed")
+            continue
+        if stats.archived:
+            logger.info("Credit profile retention archived %d profiles of %d users", stats.archived, stats.users)
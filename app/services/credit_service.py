@@ -0,0 +1,81 @@
+from datetime import datetime
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from core.database import AnySession, run_db
+from models.credit_profile import CreditProfile
+from models.user_profile import UserProfile
+from repositories.credit_repository import credit_profile_cache, is_fresh
+from services.bureau_client import BureauReport, get_bureau_client
+
+PULL_LOOKUP_CHUNK_SIZE = 1_000
+
+
+class CreditService:
+    """
+    Bureau pulls for users who need a credit profile. The pull happens
+    between two DB calls, never inside one: no connection or transaction is
+    held while the bureau responds, and the report is parsed before the
+    write session that stores it.
+    """
+
+    @staticmethod
+    def users_to_pull(db: Session, user_ids: list[int], force: bool = False) -> dict[int, str]:
+        """
+        PAN of every existing user in ``user_ids`` without an unexpired
+        credit profile, or of every existing user when ``force``. Ends the
+        read transaction so the connection goes back to the pool before the
+        bureau call.
+        """
+        now  = datetime.utcnow()
+        pans = {}
+        for start in range(0, len(user_ids), PULL_LOOKUP_CHUNK_SIZE):
+            chunk = user_ids[start:start + PULL_LOOKUP_CHUNK_SIZE]
+            query = select(UserProfile.user_id, UserProfile.pan_number).where(UserProfile.user_id.in_(chunk))
+            if not force:
+                has_fresh = (
+                    select(CreditProfile.user_id)
+                    .where(CreditProfile.user_id.in_(chunk))
+                    .where(or_(CreditProfile.expires_at.is_(None), CreditProfile.expires_at > now))
+                )
+                query = query.where(UserProfile.user_id.not_in(has_fresh))
+            pans.update((user_id, pan) for user_id, pan in db.execute(query) if pan)
+        db.rollback()
+        return pans
+
+    @staticmethod
+    async def pull_reports(
+        db             : AnySession,
+        user_ids       : list[int],
+        force          : bool = False,
+        max_concurrency: int | None = None,
+    ) -> tuple[dict[int, BureauReport] | None, list[int]]:
+        """
+        (reports by user_id, user_ids whose pull failed). Reports are None
+        when no bureau is configured; callers then generate dummy profiles.
+        Users whose cached profile is still fresh are skipped without a
+        query, so a request served from credit_profile_cache never reaches
+        the database here.
+        """
+        client = get_bureau_client()
+        if client is None:
+            return None, []
+
+        if not force:
+            now      = datetime.utcnow()
+            user_ids = [user_id for user_id in user_ids if not is_fresh(credit_profile_cache.get(int(user_id)), now)]
+        if not user_ids:
+            return {}, []
+
+        pans    = await run_db(db, CreditService.users_to_pull, user_ids, force)
+        fetched = await client.fetch_many(pans.values(), max_concurrency)
+
+        reports, failed = {}, []
+        for user_id, pan in pans.items():
+            result = fetched[pan]
+            if isinstance(result, BureauReport):
+                reports[user_id] = result
+            else:
+                failed.append(user_id)
+        return reports, failed
@@ -0,0 +1,155 @@
+"""
+Compiled, versioned eligibility policy.
+
+The score -> amount tiers and FOIR limits are data, not code: a rule set is
+loaded from the eligibility_policies table (or ELIGIBILITY_POLICY_PATH, or
+the built-in defaults), compiled once into sorted threshold arrays and
+swapped in atomically. Workers pick up a newly activated version within
+ELIGIBILITY_POLICY_REFRESH_SECONDS without a restart.
+"""
+import json
+import threading
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, field
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from core.config import get_settings
+from models.eligibility_policy import EligibilityPolicyRecord
+from services.money import basis_points
+
+DEFAULT_POLICY_VERSION = "default-v1"
+DEFAULT_RULES = {
+    "tiers": [
+        [800, 20_000],
+        [750, 15_000],
+        [700, 10_000],
+        [650,  5_000],
+    ],
+    "max_foir":            0.50,
+    "platform_max_amount": 20_000,
+}
+
+
+@dataclass(frozen=True)
+class EligibilityPolicy:
+    version            : str
+    tiers              : tuple[tuple[int, int], ...]
+    max_foir           : float
+    platform_max_amount: int
+    max_foir_bp        : int             = field(repr=False)
+    _thresholds        : tuple[int, ...] = field(repr=False)
+    _amounts           : tuple[int, ...] = field(repr=False)
+    _np_thresholds     : np.ndarray      = field(repr=False, compare=False)
+    _np_amounts        : np.ndarray      = field(repr=False, compare=False)
+
+    @classmethod
+    def compile(cls, version: str, rules: dict) -> "EligibilityPolicy":
+        tiers = sorted(
+            ((int(score), int(amount)) for score, amount in rules["tiers"]),
+            reverse=True,
+        )
+        if not tiers:
+            raise ValueError(f"Policy {version} has no tiers.")
+        if len({score for score, _ in tiers}) != len(tiers):
+            raise ValueError(f"Policy {version} has duplicate tier scores.")
+        if any(amount < 0 for _, amount in tiers):
+            raise ValueError(f"Policy {version} has a negative tier amount.")
+
+        max_foir   = float(rules.get("max_foir", DEFAULT_RULES["max_foir"]))
+        ascending  = tiers[::-1]
+        thresholds = tuple(score for score, _ in ascending)
+        amounts    = (0,) + tuple(amount for _, amount in ascending)
+        return cls(
+            version             = version,
+            tiers               = tuple(tiers),
+            max_foir            = max_foir,
+            platform_max_amount = int(rules.get("platform_max_amount", DEFAULT_RULES["platform_max_amount"])),
+            max_foir_bp         = basis_points(max_foir),
+            _thresholds         = thresholds,
+            _amounts            = amounts,
+            _np_thresholds      = np.asarray(thresholds, dtype=np.int64),
+            _np_amounts         = np.asarray(amounts, dtype=np.int64),
+        )
+
+    @property
+    def min_score(self) -> int:
+        return self._thresholds[0]
+
+    def max_amount(self, credit_score: int) -> int:
+        """Tier amount for one score; 0 below the lowest tier."""
+        return self._amounts[bisect_right(self._thresholds, credit_score)]
+
+    def max_amounts(self, credit_scores) -> np.ndarray:
+        """Tier amounts for an array of scores in one vectorised lookup."""
+        scores = np.asarray(credit_scores, dtype=np.int64)
+        return self._np_amounts[np.searchsorted(self._np_thresholds, scores, side="right")]
+
+
+def _load_file_policy(path: str) -> EligibilityPolicy:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return EligibilityPolicy.compile(data["version"], data)
+
+
+class PolicyRegistry:
+    """
+    Process-wide holder of the compiled policy. Readers take a plain
+    reference (atomic under the GIL); refresh() recompiles only when the
+    active version changes and swaps the reference in one assignment.
+    """
+    _fallback   : EligibilityPolicy | None = None
+    _policy     : EligibilityPolicy | None = None
+    _checked_at : float = 0.0
+    _lock = threading.Lock()
+
+    @classmethod
+    def fallback(cls) -> EligibilityPolicy:
+        """Policy used when no DB version is active: file if configured, else defaults."""
+        if cls._fallback is None:
+            path = get_settings().ELIGIBILITY_POLICY_PATH
+            cls._fallback = (
+                _load_file_policy(path) if path
+                else EligibilityPolicy.compile(DEFAULT_POLICY_VERSION, DEFAULT_RULES)
+            )
+        return cls._fallback
+
+    @classmethod
+    def active(cls) -> EligibilityPolicy:
+        """Currently loaded policy, without touching the database."""
+        return cls._policy or cls.fallback()
+
+    @classmethod
+    def is_stale(cls) -> bool:
+        """True once the refresh interval has passed, i.e. refresh() would query the DB."""
+        return time.monotonic() - cls._checked_at >= get_settings().ELIGIBILITY_POLICY_REFRESH_SECONDS
+
+    @classmethod
+    def refresh(cls, db: Session, force: bool = False) -> EligibilityPolicy:
+        """
+        Returns the live policy, re-reading the active version from the DB
+        at most once per refresh interval. Concurrent callers never block:
+        whoever loses the lock keeps using the current policy.
+        """
+        if not force and not cls.is_stale():
+            return cls.active()
+        if not cls._lock.acquire(blocking=force):
+            return cls.active()
+        try:
+            cls._checked_at = time.monotonic()
+            record = (
+                db.query(EligibilityPolicyRecord)
+                .filter(EligibilityPolicyRecord.is_active.is_(True))
+                .order_by(EligibilityPolicyRecord.created_at.desc())
+                .first()
+            )
+            current = cls.active()
+            if record is None:
+                cls._policy = cls.fallback()
+            elif record.version != current.version:
+                cls._policy = EligibilityPolicy.compile(record.version, record.rules)
+        finally:
+            cls._lock.release()
+        return cls.active()
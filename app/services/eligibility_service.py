@@ -1,173 +1,253 @@
+from datetime import datetime
+
+import numpy as np
 from sqlalchemy.orm import Session
 from models.user_profile import UserProfile
 from models.loan_eligibility import LoanEligibility
-from repositories.credit_repository import CreditRepository
+from models.credit_profile import CreditProfile
+from repositories.credit_repository import CreditRepository, CreditProfileSnapshot, is_fresh
 from repositories.eligibility_repository import EligibilityRepository
+from services import money
+from services.amortization_engine import max_principal_paise_batch
+from services.bureau_client import BureauReport
+from services.eligibility_policy import EligibilityPolicy, PolicyRegistry
 
 ANNUAL_INTEREST_RATE     = 12.0
+ANNUAL_RATE_BP           = money.percent_bp(ANNUAL_INTEREST_RATE)
 ALLOWED_TENURES          = [3, 6, 9, 12]
-PLATFORM_MAX_LOAN_AMOUNT = 20_000
-
-CREDIT_SCORE_TIERS = [
-    (800, 20_000),
-    (750, 15_000),
-    (700, 10_000),
-    (650,  5_000),
-]
-
-
-def _get_tier_max_amount(credit_score: int) -> int:
-    
-    if credit_score >= 800:
-        return 20_000
-    elif credit_score >= 750:
-        return 15_000
-    elif credit_score >= 700:
-        return 10_000
-    elif credit_score >= 650:
-        return 5_000
-    else:
-        return 0
 
-
-def _monthly_rate() -> float:
-    return (ANNUAL_INTEREST_RATE / 12) / 100
+ELIGIBILITY_BATCH_CHUNK_SIZE = 1_000
+MAX_ELIGIBILITY_BATCH        = 50_000
 
 
 def calculate_emi(principal: float, tenure: int) -> float:
-    r = _monthly_rate()
-    if r == 0:
-        return round(principal / tenure, 2)
-    emi = (principal * r * (1 + r) ** tenure) / ((1 + r) ** tenure - 1)
-    return round(emi, 2)
+    return money.to_rupees(money.emi_paise(money.to_paise(principal), tenure, ANNUAL_RATE_BP))
 
 
 def generate_amortization_schedule(principal: float, tenure: int) -> list[dict]:
-    r        = _monthly_rate()
-    emi      = calculate_emi(principal, tenure)
-    balance  = principal
-    schedule = []
-
-    for month in range(1, tenure + 1):
-        interest_part  = round(balance * r, 2)
-        principal_part = round(emi - interest_part, 2)
-        balance        = round(balance - principal_part, 2)
-
-        if month == tenure:
-            principal_part = round(principal_part + balance, 2)
-            balance        = 0.0
-
-        schedule.append({
-            "month":     month,
-            "emi":       emi,
-            "principal": principal_part,
-            "interest":  interest_part,
-            "balance":   max(balance, 0.0),
-        })
+    return money.schedule_rows(money.to_paise(principal), tenure, ANNUAL_RATE_BP)
+
 
-    return schedule
+def calculate_principal_from_emi(emi: float, tenure: int) -> float:
+    return money.to_rupees(money.max_principal_paise(money.to_paise(emi), tenure, ANNUAL_RATE_BP))
 
 
 def get_apr() -> float:
     return ANNUAL_INTEREST_RATE
 
 
+def foir_caps(emi_capacity: int) -> list[int]:
+    """Largest principal (paise) an EMI capacity in paise services, per allowed tenure."""
+    return [money.max_principal_paise(emi_capacity, tenure, ANNUAL_RATE_BP) for tenure in ALLOWED_TENURES]
+
+
+def foir_caps_batch(emi_capacities: list[int]) -> np.ndarray:
+    """foir_caps for many EMI capacities at once, shape (N, len(ALLOWED_TENURES))."""
+    capacities = np.asarray(emi_capacities, dtype=np.int64).reshape(-1, 1)
+    return max_principal_paise_batch(capacities, np.asarray(ALLOWED_TENURES, dtype=np.int64), ANNUAL_RATE_BP)
+
+
+def emi_capacity(monthly_income: int, existing_emi: int, policy: EligibilityPolicy) -> int:
+    """New EMI (paise) the policy's FOIR leaves room for, given income and existing EMIs in paise."""
+    return money.div_round(monthly_income * policy.max_foir_bp, money.BP_PER_UNIT) - existing_emi
+
+
+def tenure_cap(emi_capacity: int, tenure: int) -> int:
+    """
+    Largest whole-rupee principal, in paise, an EMI capacity in paise
+    services over one tenure; the per-tenure bound behind max_eligible_amount.
+    """
+    cap = money.max_principal_paise(emi_capacity, tenure, ANNUAL_RATE_BP)
+    return cap - cap % money.PAISE_PER_RUPEE
+
+
 class EligibilityService:
 
+    @staticmethod
+    def _decide(
+        user          : UserProfile,
+        credit_profile: CreditProfile | CreditProfileSnapshot | None,
+        policy        : EligibilityPolicy,
+        tier_amount   : int | None = None,
+        caps          : list[int] | None = None,
+    ) -> dict:
+        """
+        Applies the eligibility policy to one user/profile pair in memory.
+        Returns the keyword arguments for EligibilityRepository writes.
+        ``tier_amount`` and ``caps`` (foir_caps of the user's EMI capacity)
+        may be precomputed by the vectorised batch path.
+        Money is integer paise throughout (services.money) and leaves as
+        exact Decimals for the NUMERIC columns.
+        """
+        if not credit_profile:
+            # With a bureau configured, a user without a PAN cannot be pulled.
+            return {
+                "eligibility_status": "REJECTED",
+                "policy_version":     policy.version,
+                "failure_reason":     "CREDIT_PROFILE_NOT_FOUND" if user.pan_number else "PAN_MISSING",
+            }
+        credit_score   = credit_profile.credit_score
+        existing_emi   = money.to_paise(credit_profile.total_existing_emi)
+        monthly_income = money.to_paise(user.monthly_income)
+        if tier_amount is None:
+            tier_amount = policy.max_amount(credit_score)
+        approved_amount = min(tier_amount, policy.platform_max_amount)
+
+        decision = {
+            "policy_version":    policy.version,
+            "credit_profile_id": credit_profile.id,
+            "credit_score_used": credit_score,
+            "bureau_name":       credit_profile.bureau_name,
+            "income_used":       money.to_decimal(monthly_income),
+            "existing_emi":      money.to_decimal(existing_emi),
+            "max_allowed_foir":  money.bp_to_decimal(policy.max_foir_bp),
+        }
+        if approved_amount <= 0:
+            return {**decision, "eligibility_status": "REJECTED", "failure_reason": "LOW_CREDIT_SCORE"}
+
+        # ── FOIR check ────────────────────────────────────────────────────────
+        if monthly_income <= 0:
+            return {**decision, "eligibility_status": "REJECTED", "failure_reason": "INVALID_INCOME"}
+
+        max_new_emi_capacity = emi_capacity(monthly_income, existing_emi, policy)
+        if max_new_emi_capacity <= 0:
+            return {
+                **decision,
+                "eligibility_status": "REJECTED",
+                "max_eligible_emi":   money.to_decimal(0),
+                "failure_reason":     "NO_EMI_CAPACITY",
+            }
+
+        # Whole rupees, never above the tier; ties go to the shortest tenure.
+        amounts = [
+            min(approved_amount, cap // money.PAISE_PER_RUPEE)
+            for cap in (foir_caps(max_new_emi_capacity) if caps is None else caps)
+        ]
+        max_eligible_amount = max(amounts)
+        if max_eligible_amount <= 0:
+            return {
+                **decision,
+                "eligibility_status": "REJECTED",
+                "max_eligible_emi":   money.to_decimal(max_new_emi_capacity),
+                "failure_reason":     "NO_EMI_CAPACITY",
+            }
+
+        tenure       = ALLOWED_TENURES[amounts.index(max_eligible_amount)]
+        proposed_emi = money.emi_paise(max_eligible_amount * money.PAISE_PER_RUPEE, tenure, ANNUAL_RATE_BP)
+        foir_bp      = money.div_round((existing_emi + proposed_emi) * money.BP_PER_UNIT, monthly_income)
+        decision.update({
+            "max_eligible_amount": max_eligible_amount,
+            "max_eligible_emi":    money.to_decimal(max_new_emi_capacity),
+            "proposed_emi":        money.to_decimal(proposed_emi),
+            "foir_ratio":          money.bp_to_decimal(foir_bp),
+        })
+
+        if foir_bp > policy.max_foir_bp:
+            return {**decision, "eligibility_status": "REJECTED", "failure_reason": "FOIR_EXCEEDED"}
+        return {**decision, "eligibility_status": "ELIGIBLE"}
+
     @staticmethod
     def check_eligibility(
-        db  : Session,
-        user: UserProfile,
+        db     : Session,
+        user   : UserProfile,
+        reports: dict[int, BureauReport] | None = None,
     ) -> LoanEligibility:
+        """
+        ``reports`` are bureau pulls made by the caller outside this session
+        (CreditService.pull_reports); the user's is stored if they still have
+        no unexpired profile. As in check_eligibility_batch, a user missing
+        from ``reports`` (no PAN) is rejected, and dummy profiles are only
+        generated when ``reports`` is None (no bureau configured).
+        """
         credit_profile = CreditRepository.get_latest_credit_profile(db, user.user_id)
-        if not credit_profile:
+        if not is_fresh(credit_profile):
+            credit_profile = None
+        if not credit_profile and reports is not None:
+            report = reports.get(user.user_id)
+            if report is not None:
+                credit_profile = CreditRepository.create_from_report(db, user.user_id, report)
+        elif not credit_profile:
             credit_profile = CreditRepository.create_dummy_credit_profile(db, user.user_id)
 
-        if not credit_profile:
-            return EligibilityRepository.save_or_update_eligibility(
-                db, user.user_id,
-                eligibility_status = "REJECTED",
-                failure_reason     = "CREDIT_PROFILE_NOT_FOUND",
-            )
-        credit_score   = credit_profile.credit_score
-        bureau_name    = credit_profile.bureau_name
-        existing_emi   = float(credit_profile.total_existing_emi or 0)
-        monthly_income = float(user.monthly_income or 0)
-        if credit_score >= 800:
-            approved_amount = 20_000
-
-        elif credit_score >= 750:
-            approved_amount = 15_000
-
-        elif credit_score >= 700:
-            approved_amount = 10_000
-
-        elif credit_score >= 650:
-            approved_amount = 5_000
-
-        else:
-            return EligibilityRepository.save_or_update_eligibility(
-                db, user.user_id,
-                eligibility_status = "REJECTED",
-                credit_profile_id  = credit_profile.id,
-                credit_score_used  = credit_score,
-                bureau_name        = bureau_name,
-                income_used        = monthly_income,
-                existing_emi       = existing_emi,
-                failure_reason     = "LOW_CREDIT_SCORE",
-            )
-        return EligibilityRepository.save_or_update_eligibility(
-            db, user.user_id,
-            eligibility_status  = "ELIGIBLE",
-            credit_profile_id   = credit_profile.id,
-            credit_score_used   = credit_score,
-            bureau_name         = bureau_name,
-            income_used         = monthly_income,
-            existing_emi        = existing_emi,
-            max_eligible_amount = approved_amount,
-        )
-
-        # ── FOIR check (reserved for future activation) ───────────────────────
-        # MAX_FOIR = 0.50
-        #
-        # if monthly_income <= 0:
-        #     return EligibilityRepository.save_or_update_eligibility(
-        #         db, user.user_id,
-        #         eligibility_status = "REJECTED",
-        #         failure_reason     = "INVALID_INCOME",
-        #     )
-        #
-        # max_total_emi        = monthly_income * MAX_FOIR
-        # max_new_emi_capacity = max_total_emi - existing_emi
-        #
-        # if max_new_emi_capacity <= 0:
-        #     return EligibilityRepository.save_or_update_eligibility(
-        #         db, user.user_id,
-        #         eligibility_status = "REJECTED",
-        #         credit_profile_id  = credit_profile.id,
-        #         income_used        = monthly_income,
-        #         existing_emi       = existing_emi,
-        #         credit_score_used  = credit_score,
-        #         bureau_name        = bureau_name,
-        #         failure_reason     = "NO_EMI_CAPACITY",
-        #     )
-        #
-        # foir_based_max      = calculate_principal_from_emi(max_new_emi_capacity, tenure)
-        # max_eligible_amount = min(approved_amount, foir_based_max)
-        # proposed_emi        = calculate_emi(max_eligible_amount, tenure)
-        # foir                = round((existing_emi + proposed_emi) / monthly_income, 4)
-        #
-        # if foir > MAX_FOIR:
-        #     return EligibilityRepository.save_or_update_eligibility(
-        #         db, user.user_id,
-        #         eligibility_status  = "REJECTED",
-        #         credit_profile_id   = credit_profile.id,
-        #         income_used         = monthly_income,
-        #         existing_emi        = existing_emi,
-        #         proposed_emi        = proposed_emi,
-        #         foir_ratio          = foir,
-        #         credit_score_used   = credit_score,
-        #         bureau_name         = bureau_name,
-        #         max_eligible_amount = max_eligible_amount,
-        #         failure_reason      = "FOIR_EXCEEDED",
-        #     )
\ No newline at end of file
+        policy   = PolicyRegistry.refresh(db)
+        decision = EligibilityService._decide(user, credit_profile, policy)
+        return EligibilityRepository.save_or_update_eligibility(db, user.user_id, **decision)
+
+    @staticmethod
+    def check_eligibility_batch(
+        db      : Session,
+        user_ids: list[int],
+        reports : dict[int, BureauReport] | None = None,
+        refresh : bool = False,
+    ) -> dict:
+        """
+        Set-based variant of check_eligibility for large cohorts.
+        Per chunk: one user query, one latest-profile query, one flush for
+        any missing profiles and one bulk write of every decision.
+        Missing or expired profiles come from ``reports`` (bureau pulls made
+        outside the session) when given, otherwise dummy profiles are
+        generated. ``refresh`` replaces still-valid profiles as well, for
+        the re-scoring job.
+        """
+        now       = datetime.utcnow()
+        user_ids  = list(dict.fromkeys(user_ids))
+        policy    = PolicyRegistry.refresh(db)
+        results   = []
+        not_found = []
+
+        for start in range(0, len(user_ids), ELIGIBILITY_BATCH_CHUNK_SIZE):
+            chunk = user_ids[start:start + ELIGIBILITY_BATCH_CHUNK_SIZE]
+            users = {
+                user.user_id: user
+                for user in db.query(UserProfile).filter(UserProfile.user_id.in_(chunk)).all()
+            }
+            not_found.extend(user_id for user_id in chunk if user_id not in users)
+
+            # Expired profiles are never scored: like check_eligibility, a
+            # user whose profile is not replaced below (e.g. no PAN) is
+            # decided without one.
+            profiles = {
+                user_id: profile
+                for user_id, profile in CreditRepository.get_latest_credit_profiles(db, list(users)).items()
+                if is_fresh(profile, now)
+            }
+            missing  = [user_id for user_id in users if refresh or user_id not in profiles]
+            if missing and reports is not None:
+                pulled = {user_id: reports[user_id] for user_id in missing if user_id in reports}
+                profiles.update(CreditRepository.create_from_reports(db, pulled))
+            elif missing:
+                profiles.update(CreditRepository.create_dummy_credit_profiles(db, missing))
+
+            scored = [user_id for user_id in users if user_id in profiles]
+            tier_amounts = dict(zip(
+                scored,
+                policy.max_amounts([profiles[user_id].credit_score for user_id in scored]).tolist(),
+            ))
+            # FOIR caps for every user with EMI capacity, in one array pass.
+            capacities = {
+                user_id: emi_capacity(
+                    money.to_paise(users[user_id].monthly_income),
+                    money.to_paise(profiles[user_id].total_existing_emi),
+                    policy,
+                )
+                for user_id in scored
+            }
+            affordable = [user_id for user_id, capacity in capacities.items() if capacity > 0]
+            caps = dict(zip(affordable, foir_caps_batch([capacities[user_id] for user_id in affordable]).tolist()))
+            decisions = [
+                {
+                    "user_id": user_id,
+                    **EligibilityService._decide(
+                        user,
+                        profiles.get(user_id),
+                        policy,
+                        tier_amount = tier_amounts.get(user_id),
+                        caps        = caps.get(user_id),
+                    ),
+                }
+                for user_id, user in users.items()
+            ]
+            EligibilityRepository.bulk_save_or_update_eligibility(db, decisions)
+            results.extend(decisions)
+
+        return {"results": results, "not_found": not_found}
@@ -1,26 +1,58 @@
-from math import pow
+from typing import Iterator
+
+import numpy as np
 from sqlalchemy.orm import Session
 
-from models.loan_calculation import LoanCalculation
+from models.loan_calculation import LoanCalculation, LoanCalcStatus
 from repositories.loan_calculator_repo import LoanCalculationRepository
+from services import money
+from services.amortization_engine import build_schedules, to_paise_array
+from services.eligibility_service import tenure_cap
+from Utils.schedule_codec import decode_schedule, encode_schedule
 
 MIN_LOAN_AMOUNT      = 5_000
 MAX_LOAN_AMOUNT      = 20_000
 ALLOWED_TENURES      = [3, 6, 9, 12]
 ANNUAL_INTEREST_RATE = 12.0
+ANNUAL_RATE_BP       = money.percent_bp(ANNUAL_INTEREST_RATE)
+MAX_BATCH_SIZE       = 5_000
+EXPORT_PAGE_SIZE     = 500
+
+
+def cap_for_tenure(eligible_amount: int, record, tenure_months: int) -> int:
+    """
+    ``eligible_amount`` in paise capped at what the eligibility record's EMI
+    capacity (max_eligible_emi) services over ``tenure_months``. Records
+    from before FOIR was enforced have no income_used and are not capped.
+    """
+    if record.income_used is None:
+        return eligible_amount
+    return min(eligible_amount, tenure_cap(money.to_paise(record.max_eligible_emi), tenure_months))
 
 
 class LoanCalculationService:
     """
     Handles all EMI calculation logic.
     Inputs  : user_id + tenure_months
-    Amount  : auto-fetched from loan_eligibility (max_eligible_amount)
+    Amount  : auto-fetched from loan_eligibility (max_eligible_amount),
+              capped at what the user's EMI capacity services over the tenure
     Outputs : EMI, total interest, total repayment, APR, amortization schedule
+    Money   : integer paise internally (services.money); rupees at the edges
     """
     @staticmethod
-    def _get_verified_eligible_amount(db: Session, user_id: int) -> float:
+    def _get_verified_eligible_amount(db: Session, user_id: int, tenure_months: int) -> int:
         record = LoanCalculationRepository.get_eligibility_record(db, user_id)
+        return LoanCalculationService._verify_eligibility_record(record, tenure_months)
 
+    @staticmethod
+    def _verify_eligibility_record(record, tenure_months: int) -> int:
+        """
+        Eligible amount in paise for ``tenure_months``, or ValueError with the
+        customer-facing reason. max_eligible_amount is the best amount over
+        all tenures, so it is capped again at what the recorded EMI capacity
+        (max_eligible_emi) services over this one; shorter tenures afford
+        less (cap_for_tenure).
+        """
         if not record:
             raise ValueError(
                 "No eligibility record found. "
@@ -33,14 +65,20 @@ class LoanCalculationService:
                 f"Reason: {record.failure_reason or 'eligibility check not passed'}."
             )
 
-        eligible_amount = float(record.max_eligible_amount or 0)
+        eligible_amount = money.to_paise(record.max_eligible_amount)
 
-        if eligible_amount < MIN_LOAN_AMOUNT:
+        if eligible_amount < MIN_LOAN_AMOUNT * money.PAISE_PER_RUPEE:
             raise ValueError(
-                f"Your eligible amount ₹{eligible_amount:,.0f} is below the "
+                f"Your eligible amount ₹{money.to_rupees(eligible_amount):,.0f} is below the "
                 f"minimum loan amount of ₹{MIN_LOAN_AMOUNT:,}."
             )
 
+        eligible_amount = cap_for_tenure(eligible_amount, record, tenure_months)
+        if eligible_amount < MIN_LOAN_AMOUNT * money.PAISE_PER_RUPEE:
+            raise ValueError(
+                f"You are not eligible for a loan over {tenure_months} months. "
+                f"Reason: FOIR_EXCEEDED. Please choose a longer tenure."
+            )
         return eligible_amount
 
     @staticmethod
@@ -49,42 +87,32 @@ class LoanCalculationService:
         if tenure_months not in ALLOWED_TENURES:
             raise ValueError(f"Tenure must be one of {ALLOWED_TENURES} months.")
 
-    @staticmethod
-    def _monthly_rate() -> float:
-        return (ANNUAL_INTEREST_RATE / 12) / 100    # 0.01
-
     @staticmethod
     def _calculate_emi(principal: float, tenure_months: int) -> float:
-        r   = LoanCalculationService._monthly_rate()
-        n   = tenure_months
-        emi = (principal * r * pow(1 + r, n)) / (pow(1 + r, n) - 1)
-        return round(emi, 2)
+        return money.to_rupees(
+            money.emi_paise(money.to_paise(principal), tenure_months, ANNUAL_RATE_BP)
+        )
 
     @staticmethod
     def _build_amortization_schedule(principal: float, tenure_months: int) -> list[dict]:
-        
-        r        = LoanCalculationService._monthly_rate()
-        emi      = LoanCalculationService._calculate_emi(principal, tenure_months)
-        balance  = principal
-        schedule = []
-
-        for month in range(1, tenure_months + 1):
-            interest_part  = round(balance * r, 2)
-            principal_part = round(emi - interest_part, 2)
-            balance        = round(balance - principal_part, 2)
-            if month == tenure_months:
-                principal_part = round(principal_part + balance, 2)
-                balance        = 0.0
-
-            schedule.append({
-                "month":     month,
-                "emi":       emi,
-                "principal": principal_part,
-                "interest":  interest_part,
-                "balance":   max(balance, 0.0),
-            })
+        return money.schedule_rows(money.to_paise(principal), tenure_months, ANNUAL_RATE_BP)
 
-        return schedule
+    @staticmethod
+    def _schedule_rows(months: np.ndarray, emi: int) -> list[dict]:
+        """Packed (principal, interest, balance) paise rows in the money.schedule_rows shape."""
+        emi_rupees = money.to_rupees(emi)
+        return [
+            {
+                "month":     month,
+                "emi":       emi_rupees,
+                "principal": principal,
+                "interest":  interest,
+                "balance":   balance,
+            }
+            for month, (principal, interest, balance) in enumerate(
+                (months / money.PAISE_PER_RUPEE).tolist(), start=1
+            )
+        ]
 
     @staticmethod
     def calculate_and_save(
@@ -92,36 +120,180 @@ class LoanCalculationService:
         user_id       : int,
         tenure_months : int,
     ) -> dict:
-        eligible_amount = LoanCalculationService._get_verified_eligible_amount(db, user_id)
         LoanCalculationService._validate_tenure(tenure_months)
+        eligible_amount = LoanCalculationService._get_verified_eligible_amount(db, user_id, tenure_months)
         loan_amount     = eligible_amount
-        monthly_emi     = LoanCalculationService._calculate_emi(loan_amount, tenure_months)
-        total_repayment = round(monthly_emi * tenure_months, 2)
-        total_interest  = round(total_repayment - loan_amount, 2)
-        amortization_schedule = LoanCalculationService._build_amortization_schedule(
-            loan_amount, tenure_months
+        monthly_emi     = money.emi_paise(loan_amount, tenure_months, ANNUAL_RATE_BP)
+        total_repayment = monthly_emi * tenure_months
+        total_interest  = total_repayment - loan_amount
+        months          = np.array(
+            [row[2:] for row in money.amortize(loan_amount, tenure_months, ANNUAL_RATE_BP)],
+            dtype=np.int64,
         )
         record = LoanCalculationRepository.upsert(
             db               = db,
             user_id          = user_id,
-            requested_amount = loan_amount,
+            requested_amount = money.to_decimal(loan_amount),
             tenure_months    = tenure_months,
-            eligible_amount  = eligible_amount,
+            eligible_amount  = money.to_decimal(eligible_amount),
             interest_rate_pa = ANNUAL_INTEREST_RATE,
-            monthly_emi      = monthly_emi,
-            total_repayment  = total_repayment,
-            total_interest   = total_interest,
+            monthly_emi      = money.to_decimal(monthly_emi),
+            total_repayment  = money.to_decimal(total_repayment),
+            total_interest   = money.to_decimal(total_interest),
+            amortization_schedule = encode_schedule(months),
         )
+        amortization_schedule = LoanCalculationService._schedule_rows(months, monthly_emi)
         return {
-            "requested_amount"     : loan_amount,
+            "requested_amount"     : money.to_rupees(loan_amount),
             "tenure_months"        : tenure_months,
-            "monthly_emi"          : monthly_emi,
-            "total_repayment"      : total_repayment,
-            "total_interest"       : total_interest,
+            "monthly_emi"          : money.to_rupees(monthly_emi),
+            "total_repayment"      : money.to_rupees(total_repayment),
+            "total_interest"       : money.to_rupees(total_interest),
             "amortization_schedule": amortization_schedule,
             "record"               : record,
         }
 
+    @staticmethod
+    def calculate_batch_and_save(
+        db    : Session,
+        items : list[tuple[int, int]],
+    ) -> dict:
+        """
+        Batch variant of calculate_and_save for (user_id, tenure_months) pairs.
+        Eligibility is read in one query, every schedule is built in one
+        vectorised pass and all rows are written in one commit. Items that
+        fail validation are reported in "errors" instead of failing the batch.
+        """
+        if len(items) > MAX_BATCH_SIZE:
+            raise ValueError(f"A batch may contain at most {MAX_BATCH_SIZE:,} items.")
+
+        records = LoanCalculationRepository.get_eligibility_records(
+            db, list({user_id for user_id, _ in items})
+        )
+        valid  = []
+        errors = []
+        seen   = set()
+        for user_id, tenure_months in items:
+            try:
+                if user_id in seen:
+                    raise ValueError("Duplicate user_id in batch.")
+                seen.add(user_id)
+                LoanCalculationService._validate_tenure(tenure_months)
+                eligible_amount = LoanCalculationService._verify_eligibility_record(
+                    records.get(user_id), tenure_months
+                )
+            except ValueError as e:
+                errors.append({
+                    "user_id":       user_id,
+                    "tenure_months": tenure_months,
+                    "detail":        str(e),
+                })
+                continue
+            valid.append((user_id, tenure_months, eligible_amount))
+
+        if not valid:
+            return {"results": [], "errors": errors}
+
+        batch = build_schedules(
+            principals = [amount for _, _, amount in valid],
+            tenures    = [tenure for _, tenure, _ in valid],
+            annual_bp  = ANNUAL_RATE_BP,
+        )
+        monthly_emi     = batch.emi.tolist()
+        total_repayment = batch.total_repayment.tolist()
+        total_interest  = batch.total_interest.tolist()
+        months          = np.stack([batch.principal, batch.interest, batch.balance], axis=-1)
+
+        rows = [
+            {
+                "user_id"         : user_id,
+                "requested_amount": money.to_decimal(amount),
+                "tenure_months"   : tenure_months,
+                "eligible_amount" : money.to_decimal(amount),
+                "interest_rate_pa": ANNUAL_INTEREST_RATE,
+                "monthly_emi"     : money.to_decimal(monthly_emi[i]),
+                "total_repayment" : money.to_decimal(total_repayment[i]),
+                "total_interest"  : money.to_decimal(total_interest[i]),
+                "amortization_schedule": encode_schedule(months[i, :tenure_months]),
+            }
+            for i, (user_id, tenure_months, amount) in enumerate(valid)
+        ]
+        ids = LoanCalculationRepository.bulk_upsert(db, rows)
+
+        results = [
+            {
+                "id"                   : ids[user_id],
+                "user_id"              : user_id,
+                "requested_amount"     : money.to_rupees(amount),
+                "tenure_months"        : tenure_months,
+                "eligible_amount"      : money.to_rupees(amount),
+                "interest_rate_pa"     : ANNUAL_INTEREST_RATE,
+                "monthly_emi"          : money.to_rupees(monthly_emi[i]),
+                "total_repayment"      : money.to_rupees(total_repayment[i]),
+                "total_interest"       : money.to_rupees(total_interest[i]),
+                "status"               : LoanCalcStatus.CHECKED,
+                "amortization_schedule": batch.schedule(i),
+            }
+            for i, (user_id, tenure_months, amount) in enumerate(valid)
+        ]
+        return {"results": results, "errors": errors}
+
     @staticmethod
     def get_calculation(db: Session, user_id: int) -> LoanCalculation | None:
-        return LoanCalculationRepository.get_by_user_id(db, user_id)
\ No newline at end of file
+        return LoanCalculationRepository.get_by_user_id(db, user_id)
+
+    @staticmethod
+    def get_calculation_version(db: Session, user_id: int) -> tuple | None:
+        version = LoanCalculationRepository.get_version(db, user_id)
+        return tuple(version) if version else None
+
+    @staticmethod
+    def get_export_page(
+        db      : Session,
+        after_id: int,
+        user_ids: list[int] | None = None,
+    ) -> list[LoanCalculation]:
+        return LoanCalculationRepository.get_page(db, after_id, EXPORT_PAGE_SIZE, user_ids)
+
+    @staticmethod
+    def saved_schedule(record: LoanCalculation) -> list[dict]:
+        """
+        The schedule stored with a calculation, decoded without a copy.
+        Rows saved before schedules were stored are rebuilt at their own rate.
+        """
+        if record.amortization_schedule is None:
+            return money.schedule_rows(
+                money.to_paise(record.requested_amount),
+                record.tenure_months,
+                money.percent_bp(record.interest_rate_pa),
+            )
+        return LoanCalculationService._schedule_rows(
+            decode_schedule(record.amortization_schedule),
+            money.to_paise(record.monthly_emi),
+        )
+
+    @staticmethod
+    def schedule_rows(records: list[LoanCalculation]) -> Iterator[dict]:
+        """
+        Amortization rows for saved calculations, one dict per loan-month,
+        each tagged with its user_id. Stored schedules are decoded; any
+        older rows on the page are rebuilt in one vectorised pass at each
+        record's own rate.
+        """
+        legacy  = [record for record in records if record.amortization_schedule is None]
+        rebuilt = {}
+        if legacy:
+            batch = build_schedules(
+                principals = to_paise_array(record.requested_amount for record in legacy),
+                tenures    = [record.tenure_months for record in legacy],
+                annual_bp  = [money.percent_bp(record.interest_rate_pa) for record in legacy],
+            )
+            rebuilt = {record.id: batch.schedule(i) for i, record in enumerate(legacy)}
+
+        for record in records:
+            if record.id in rebuilt:
+                rows = rebuilt[record.id]
+            else:
+                rows = LoanCalculationService.saved_schedule(record)
+            for row in rows:
+                yield {"user_id": record.user_id, **row}
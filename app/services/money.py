@@ -0,0 +1,161 @@
+"""
+Integer-paise money kernel.
+
+Amounts are ints in paise and rates/ratios are ints in basis points, so EMI
+and schedule arithmetic is exact. Every division rounds exactly once, with
+an explicit mode: half-up (the usual convention for paise) by default,
+banker's rounding on request. Floats only appear at the API edge
+(to_rupees) and Decimals only at the column edge (to_decimal); both are
+exact for two-decimal amounts.
+"""
+from decimal import Decimal, ROUND_HALF_EVEN, ROUND_HALF_UP
+from fractions import Fraction
+from functools import lru_cache
+
+PAISE_PER_RUPEE = 100
+BP_PER_UNIT     = 10_000
+MONTHS_PER_YEAR = 12
+MONEY_ROUNDING  = ROUND_HALF_UP
+
+# Monthly interest on a balance is balance * annual_bp / MONTHLY_RATE_DENOMINATOR.
+MONTHLY_RATE_DENOMINATOR = MONTHS_PER_YEAR * BP_PER_UNIT
+
+_ONE = Decimal(1)
+
+
+def div_round(numerator: int, denominator: int, rounding: str = MONEY_ROUNDING) -> int:
+    """numerator / denominator rounded to an int; ties by ``rounding``."""
+    if denominator < 0:
+        numerator, denominator = -numerator, -denominator
+    quotient, remainder = divmod(numerator, denominator)
+    twice = 2 * remainder
+
+    if twice < denominator:
+        return quotient
+    if twice > denominator:
+        return quotient + 1
+    if rounding == ROUND_HALF_EVEN:
+        return quotient + (quotient & 1)
+    if rounding == ROUND_HALF_UP:
+        return quotient + 1 if quotient >= 0 else quotient
+    raise ValueError(f"Unsupported rounding mode: {rounding}")
+
+
+def _to_decimal(value) -> Decimal:
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, float):
+        # repr is the shortest string that round-trips, e.g. 0.1 -> "0.1".
+        return Decimal(repr(value))
+    return Decimal(value)
+
+
+def to_paise(amount, rounding: str = MONEY_ROUNDING) -> int:
+    """Rupees (int, float, Decimal or str; None as 0) to integer paise."""
+    if amount is None:
+        return 0
+    if isinstance(amount, int):
+        return amount * PAISE_PER_RUPEE
+    if isinstance(amount, float) and amount.is_integer():
+        return int(amount) * PAISE_PER_RUPEE
+    return int(_to_decimal(amount).scaleb(2).quantize(_ONE, rounding=rounding))
+
+
+def to_rupees(paise: int) -> float:
+    """Paise to a float for JSON; the nearest float to the exact rupee value."""
+    return paise / PAISE_PER_RUPEE
+
+
+def to_decimal(paise: int) -> Decimal:
+    """Paise to an exact two-place Decimal for NUMERIC(…, 2) columns."""
+    return Decimal(paise).scaleb(-2)
+
+
+def basis_points(ratio, rounding: str = MONEY_ROUNDING) -> int:
+    """A ratio such as a FOIR limit (0.5) to basis points (5000)."""
+    return int(_to_decimal(ratio).scaleb(4).quantize(_ONE, rounding=rounding))
+
+
+def percent_bp(percent, rounding: str = MONEY_ROUNDING) -> int:
+    """An annual rate in percent (12.0) to basis points (1200)."""
+    return int(_to_decimal(percent).scaleb(2).quantize(_ONE, rounding=rounding))
+
+
+def bp_to_decimal(bp: int) -> Decimal:
+    """Basis points to an exact four-place Decimal ratio, e.g. 3125 -> 0.3125."""
+    return Decimal(bp).scaleb(-4)
+
+
+@lru_cache(maxsize=256)
+def emi_factor(tenure: int, annual_bp: int) -> Fraction:
+    """Exact EMI per unit of principal: r(1+r)^n / ((1+r)^n - 1)."""
+    r = Fraction(annual_bp, MONTHLY_RATE_DENOMINATOR)
+    if r == 0:
+        return Fraction(1, tenure)
+    growth = (1 + r) ** tenure
+    return r * growth / (growth - 1)
+
+
+@lru_cache(maxsize=256)
+def annuity_factor(tenure: int, annual_bp: int) -> Fraction:
+    """Exact principal serviced by an EMI of one unit over ``tenure`` months."""
+    return 1 / emi_factor(tenure, annual_bp)
+
+
+def emi_paise(principal: int, tenure: int, annual_bp: int, rounding: str = MONEY_ROUNDING) -> int:
+    factor = emi_factor(tenure, annual_bp)
+    return div_round(principal * factor.numerator, factor.denominator, rounding)
+
+
+def max_principal_paise(emi: int, tenure: int, annual_bp: int) -> int:
+    """Largest principal (paise, floored) that an EMI of ``emi`` paise services."""
+    factor = annuity_factor(tenure, annual_bp)
+    return (emi * factor.numerator) // factor.denominator
+
+
+def interest_paise(balance: int, annual_bp: int, rounding: str = MONEY_ROUNDING) -> int:
+    """One month's interest on ``balance``."""
+    return div_round(balance * annual_bp, MONTHLY_RATE_DENOMINATOR, rounding)
+
+
+def amortize(
+    principal: int,
+    tenure   : int,
+    annual_bp: int,
+    rounding : str = MONEY_ROUNDING,
+) -> list[tuple[int, int, int, int, int]]:
+    """
+    (month, emi, principal, interest, balance) rows in paise. Interest is
+    charged on the running balance, the rest of the EMI repays principal,
+    and the final month absorbs whatever balance remains.
+    """
+    emi     = emi_paise(principal, tenure, annual_bp, rounding)
+    balance = principal
+    rows    = []
+
+    for month in range(1, tenure + 1):
+        interest_part  = interest_paise(balance, annual_bp, rounding)
+        principal_part = emi - interest_part
+        balance       -= principal_part
+
+        if month == tenure:
+            principal_part += balance
+            balance         = 0
+
+        rows.append((month, emi, principal_part, interest_part, max(balance, 0)))
+
+    return rows
+
+
+def schedule_rows(principal: int, tenure: int, annual_bp: int, rounding: str = MONEY_ROUNDING) -> list[dict]:
+    """amortize() in the API's list-of-dicts shape, amounts in rupees."""
+    return [
+        {
+            "month":     month,
+            "emi":       to_rupees(emi),
+            "principal": to_rupees(principal_part),
+            "interest":  to_rupees(interest_part),
+            "balance":   to_rupees(balance),
+        }
+        for month, emi, principal_part, interest_part, balance in amortize(principal, tenure, annual_bp, rounding)
+    ]
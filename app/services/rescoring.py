@@ -0,0 +1,126 @@
+"""
+Re-scoring ahead of credit profile expiry.
+
+A profile is valid for CREDIT_PROFILE_VALIDITY_DAYS; after that the next
+eligibility check has to pull the bureau on the request path. This job
+finds users with an eligibility record whose latest profile expires within
+RESCORE_LEAD_SECONDS (a range scan of ix_credit_profiles_expires_at), pulls
+fresh reports at most RESCORE_MAX_CONCURRENCY at a time and reruns
+EligibilityService for them, so interactive checks find a fresh profile.
+
+Profiles that expired more than RESCORE_LEAD_SECONDS ago are left to the
+next interactive check; users who stopped applying are not pulled forever.
+Users whose pull fails are retried after RESCORE_RETRY_SECONDS, and users
+without a PAN once their profile has left the re-scoring window, so neither
+stays at the head of the due list and starves everyone behind them.
+
+Run it from manage.py (rescore-due) or every RESCORE_INTERVAL_SECONDS in
+one process: ticks in two processes would pull the same users twice.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from core.config import get_settings
+from core.database import open_session, run_db
+from repositories.credit_repository import CreditRepository
+from repositories.eligibility_repository import EligibilityRepository
+from services.bureau_client import BureauReport
+from services.credit_service import CreditService
+from services.eligibility_service import EligibilityService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RescoreStats:
+    due     : int = 0
+    rescored: int = 0
+    failed  : int = 0
+
+
+class RescoringService:
+
+    @staticmethod
+    def due_users(db: Session, lead_seconds: int, limit: int) -> list[int]:
+        """Up to ``limit`` users due for a refresh, soonest expiry first. Ends the read transaction."""
+        now  = datetime.utcnow()
+        lead = timedelta(seconds=lead_seconds)
+        user_ids = CreditRepository.due_for_refresh(
+            db, horizon=now + lead, not_before=now - lead, limit=limit, now=now,
+        )
+        db.rollback()
+        return user_ids
+
+    @staticmethod
+    def defer(db: Session, retry: list[int], no_pan: list[int], lead_seconds: int, retry_seconds: int) -> None:
+        """
+        Backs off users the tick could not pull: ``retry`` (failed pulls) for
+        ``retry_seconds``, ``no_pan`` past the whole re-scoring window.
+        """
+        now = datetime.utcnow()
+        if retry:
+            EligibilityRepository.defer_rescore(db, retry, now + timedelta(seconds=retry_seconds))
+        if no_pan:
+            EligibilityRepository.defer_rescore(db, no_pan, now + timedelta(seconds=2 * lead_seconds))
+
+    @staticmethod
+    def rescore(db: Session, user_ids: list[int], reports: dict[int, BureauReport] | None) -> dict:
+        """New profiles from ``reports`` (dummies without a bureau) and fresh decisions, in one commit."""
+        return EligibilityService.check_eligibility_batch(db, user_ids, reports, refresh=True)
+
+
+async def rescore_due(limit: int | None = None) -> RescoreStats:
+    """One tick: the next ``limit`` (default RESCORE_BATCH_SIZE) due users."""
+    settings = get_settings()
+    limit    = limit or settings.RESCORE_BATCH_SIZE
+    stats    = RescoreStats()
+
+    async with open_session() as db:
+        user_ids  = await run_db(db, RescoringService.due_users, settings.RESCORE_LEAD_SECONDS, limit)
+        stats.due = len(user_ids)
+        if not user_ids:
+            return stats
+
+        reports, failed = await CreditService.pull_reports(
+            db,
+            user_ids,
+            force           = True,
+            max_concurrency = settings.RESCORE_MAX_CONCURRENCY,
+        )
+        if reports is not None:
+            # Failed pulls and users without a PAN keep their current profile
+            # and are backed off, so the next tick moves on to other users.
+            attempted = set(reports) | set(failed)
+            no_pan    = [user_id for user_id in user_ids if user_id not in attempted]
+            user_ids  = [user_id for user_id in user_ids if user_id in reports]
+            if failed or no_pan:
+                await run_db(
+                    db, RescoringService.defer, failed, no_pan,
+                    settings.RESCORE_LEAD_SECONDS, settings.RESCORE_RETRY_SECONDS,
+                )
+        stats.failed = len(failed)
+        if user_ids:
+            result = await run_db(db, RescoringService.rescore, user_ids, reports)
+            stats.rescored = len(result["results"])
+    return stats
+
+
+async def run_rescoring_loop(interval_seconds: float) -> None:
+    """Background re-scoring for the app lifespan; drains the due list a batch per tick."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            stats = await rescore_due()
+        except Exception:
+            # Nothing was committed for the failed tick; the users stay due.
+            logger.exception("Credit profile re-scoring failed")
+            continue
+        if stats.due:
+            logger.info(
+                "Re-scored %d of %d users due for a credit refresh (%d bureau failures)",
+                stats.rescored, stats.due, stats.failed,
+            )
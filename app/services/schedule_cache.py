@@ -0,0 +1,45 @@
+"""
+Tenure comparison schedules for the eligibility result.
+
+A schedule depends only on (principal, tenure, rate), and eligible amounts
+repeat across users (tier caps, the platform max), so each combination is
+built once per worker and kept as serialized TenureSchedule JSON. Misses
+for one request are built together in a single amortization_engine pass.
+"""
+import math
+from typing import Sequence
+
+from core.cache import TTLCache
+from core.config import get_settings
+from core.responses import dumps
+from services import money
+from services.amortization_engine import build_schedules
+
+# Schedules never go stale; entries only leave by LRU eviction.
+schedule_cache = TTLCache(
+    maxsize     = get_settings().SCHEDULE_CACHE_SIZE,
+    ttl_seconds = math.inf,
+)
+
+
+def tenure_schedules(principal: int, tenures: Sequence[int], annual_bp: int) -> list[bytes]:
+    """
+    Serialized TenureSchedule objects for a principal in paise, one per
+    tenure, in the order given.
+    """
+    keys      = [(principal, tenure, annual_bp) for tenure in tenures]
+    schedules = [schedule_cache.get(key) for key in keys]
+    missing   = [i for i, schedule in enumerate(schedules) if schedule is None]
+    if not missing:
+        return schedules
+
+    batch = build_schedules(principal, [tenures[i] for i in missing], annual_bp)
+    emis  = batch.emi.tolist()
+    for row, i in enumerate(missing):
+        schedules[i] = dumps({
+            "tenureMonths": tenures[i],
+            "emi":          money.to_rupees(emis[row]),
+            "schedule":     batch.schedule(row),
+        })
+        schedule_cache.set(keys[i], schedules[i])
+    return schedules
@@ -0,0 +1,94 @@
+"""
+Stand-in credit bureau for offline load tests of services.bureau_client.
+
+Answers POST with a TransUnion-shaped report after a configurable delay.
+Reports are deterministic per PAN, so repeated runs score the same users
+the same way. GET /stats returns the number of pulls served and the peak
+number in flight, which shows how many pulls coalescing saved.
+
+    python benchmarks/bureau_server.py --port 8099 --latency-ms 300 --jitter-ms 100
+    TRANSUNION_API_URL=http://127.0.0.1:8099/v1/credit-report uvicorn main:app
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+import sys
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+SCORES = (620, 670, 710, 760, 810)
+
+# Same shapes as CreditRepository's dummy profiles.
+ACCOUNTS = {
+    620: [{"loanType": "PL", "emiAmount": 4000, "status": "ACTIVE"},
+          {"loanType": "CC", "emiAmount": 2000, "status": "ACTIVE"}],
+    670: [{"loanType": "PL", "emiAmount": 2000, "status": "ACTIVE"}],
+    710: [{"loanType": "AUTO", "emiAmount": 3500, "status": "ACTIVE"}],
+    760: [{"loanType": "HL", "emiAmount": 5000, "status": "ACTIVE"},
+          {"loanType": "PL", "emiAmount": 1000, "status": "CLOSED"}],
+    810: [],
+}
+
+
+def report_for(pan: str) -> dict:
+    digest = hashlib.sha256(pan.encode()).digest()
+    score  = SCORES[digest[0] % len(SCORES)]
+    return {
+        "bureau":      "TransUnion (Stand-in)",
+        "creditScore": score,
+        "reportId":    f"STUB-{digest.hex()[:12].upper()}",
+        "accounts":    ACCOUNTS[score],
+    }
+
+
+def create_app(latency_ms: float, jitter_ms: float, error_rate: float, seed: int | None = None) -> Starlette:
+    rng   = random.Random(seed)
+    stats = {"served": 0, "errors": 0, "in_flight": 0, "peak_in_flight": 0}
+
+    async def credit_report(request: Request) -> JSONResponse:
+        payload = await request.json()
+        stats["in_flight"] += 1
+        stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+        try:
+            delay_ms = max(0.0, latency_ms + rng.uniform(-jitter_ms, jitter_ms))
+            await asyncio.sleep(delay_ms / 1000)
+            if rng.random() < error_rate:
+                stats["errors"] += 1
+                return JSONResponse({"error": "Bureau unavailable"}, status_code=503)
+            stats["served"] += 1
+            return JSONResponse(report_for(str(payload.get("pan", ""))))
+        finally:
+            stats["in_flight"] -= 1
+
+    async def get_stats(request: Request) -> JSONResponse:
+        return JSONResponse(stats)
+
+    return Starlette(routes=[
+        Route("/stats", get_stats, methods=["GET"]),
+        Route("/{path:path}", credit_report, methods=["POST"]),
+    ])
+
+
+def main(argv: list[str] | None = None) -> int:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Stand-in credit bureau")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Mean response delay")
+    parser.add_argument("--jitter-ms", type=float, default=50.0, help="Uniform +/- spread around the mean")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of pulls answered with 503")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    app = create_app(args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", access_log=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,362 @@
+"""
+Micro-benchmarks for the EMI and amortization math, with a correctness oracle.
+
+Every variant prices the same loans (each amount band x each allowed tenure).
+The expected schedules come from _expected_schedule, a frozen pure-integer
+copy of the paise algorithm (half-up rounding), and every paise variant must
+reproduce them exactly. The timing baseline, variants[0], is a frozen copy
+of the float implementation LoanCalculationService used before the move to
+integer paise. It is replayed through the same integer recurrence and must
+match it exactly, except that a month whose interest is exactly half a paisa
+may round down instead of up; those months are counted and reported. Any
+failure is printed and the run exits 1 before timings are reported.
+
+    python benchmarks/emi_math.py
+    python benchmarks/emi_math.py --loans 5000 --repeat 7 --save /tmp/emi.json
+
+To benchmark a new implementation, add a Variant to VARIANTS.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from math import pow
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+from services import eligibility_service                                     # noqa: E402
+from services.amortization_engine import build_schedules, calculate_emi_batch  # noqa: E402
+from services.loan_service import (                                            # noqa: E402
+    ALLOWED_TENURES,
+    ANNUAL_INTEREST_RATE,
+    ANNUAL_RATE_BP,
+    LoanCalculationService,
+)
+
+# Eligible amounts are whole rupees within the policy's tiers.
+AMOUNT_BANDS = {
+    "5k-10k":  (5_000, 10_000),
+    "10k-15k": (10_000, 15_000),
+    "15k-20k": (15_000, 20_000),
+}
+
+# Monthly interest is balance * ANNUAL_RATE_BP / MONTHLY_DENOMINATOR.
+MONTHLY_DENOMINATOR = 12 * 10_000
+
+
+@dataclass(frozen=True)
+class Variant:
+    """EMI and schedule kernels over parallel arrays of principals and tenures."""
+    name     : str
+    emis     : Callable[[np.ndarray, np.ndarray], list[float]]
+    schedules: Callable[[np.ndarray, np.ndarray], list[list[dict]]]
+    reset    : Callable[[], None] = lambda: None
+
+
+def _scalar(emi_fn, schedule_fn) -> tuple[Callable, Callable]:
+    def emis(principals, tenures):
+        return [emi_fn(p, n) for p, n in zip(principals.tolist(), tenures.tolist())]
+
+    def schedules(principals, tenures):
+        return [schedule_fn(p, n) for p, n in zip(principals.tolist(), tenures.tolist())]
+
+    return emis, schedules
+
+
+def _legacy_emi(principal: float, tenure_months: int) -> float:
+    # Frozen copy of LoanCalculationService._calculate_emi before paise.
+    r   = (ANNUAL_INTEREST_RATE / 12) / 100
+    n   = tenure_months
+    emi = (principal * r * pow(1 + r, n)) / (pow(1 + r, n) - 1)
+    return round(emi, 2)
+
+
+def _legacy_schedule(principal: float, tenure_months: int) -> list[dict]:
+    # Frozen copy of LoanCalculationService._build_amortization_schedule before paise.
+    r        = (ANNUAL_INTEREST_RATE / 12) / 100
+    emi      = _legacy_emi(principal, tenure_months)
+    balance  = principal
+    schedule = []
+
+    for month in range(1, tenure_months + 1):
+        interest_part  = round(balance * r, 2)
+        principal_part = round(emi - interest_part, 2)
+        balance        = round(balance - principal_part, 2)
+        if month == tenure_months:
+            principal_part = round(principal_part + balance, 2)
+            balance        = 0.0
+
+        schedule.append({
+            "month":     month,
+            "emi":       emi,
+            "principal": principal_part,
+            "interest":  interest_part,
+            "balance":   max(balance, 0.0),
+        })
+
+    return schedule
+
+
+def _vectorised_emis(principals, tenures):
+    return calculate_emi_batch(principals, tenures, ANNUAL_INTEREST_RATE).tolist()
+
+
+def _vectorised_schedules(principals, tenures):
+    batch = build_schedules(np.rint(principals * 100).astype(np.int64), tenures, ANNUAL_RATE_BP)
+    return [batch.schedule(i) for i in range(len(batch))]
+
+
+_cached_emi      = lru_cache(maxsize=None)(LoanCalculationService._calculate_emi)
+_cached_schedule = lru_cache(maxsize=None)(LoanCalculationService._build_amortization_schedule)
+
+
+def _reset_cached() -> None:
+    _cached_emi.cache_clear()
+    _cached_schedule.cache_clear()
+
+
+VARIANTS = [
+    Variant("legacy float (frozen)", *_scalar(_legacy_emi, _legacy_schedule)),
+    Variant("loan_service (paise)", *_scalar(
+        LoanCalculationService._calculate_emi,
+        LoanCalculationService._build_amortization_schedule,
+    )),
+    Variant("eligibility_service", *_scalar(
+        eligibility_service.calculate_emi,
+        eligibility_service.generate_amortization_schedule,
+    )),
+    Variant("vectorised (int64 paise)", _vectorised_emis, _vectorised_schedules),
+    Variant("cached (lru per amount)", *_scalar(_cached_emi, _cached_schedule), reset=_reset_cached),
+]
+
+
+def workloads(loans: int, seed: int) -> dict[tuple[str, int], tuple[np.ndarray, np.ndarray]]:
+    rng = np.random.default_rng(seed)
+    return {
+        (band, tenure): (
+            rng.integers(low, high, size=loans, endpoint=True).astype(np.float64),
+            np.full(loans, tenure, dtype=np.int64),
+        )
+        for band, (low, high) in AMOUNT_BANDS.items()
+        for tenure in ALLOWED_TENURES
+    }
+
+
+def _paise(value: float) -> int:
+    return round(value * 100)
+
+
+def _half_up(numerator: int, denominator: int) -> int:
+    quotient, remainder = divmod(numerator, denominator)
+    return quotient + (2 * remainder >= denominator)
+
+
+def _expected_emi(principal: int, tenure: int) -> int:
+    # Frozen: EMI = P r (1+r)^n / ((1+r)^n - 1), r = bp / MONTHLY_DENOMINATOR, in integers.
+    growth = (MONTHLY_DENOMINATOR + ANNUAL_RATE_BP) ** tenure
+    base   = MONTHLY_DENOMINATOR ** tenure
+    return _half_up(principal * ANNUAL_RATE_BP * growth, MONTHLY_DENOMINATOR * (growth - base))
+
+
+def _expected_schedule(principal: int, tenure: int) -> list[dict]:
+    """Frozen paise-exact schedule: the answer every paise variant must give."""
+    emi      = _expected_emi(principal, tenure)
+    balance  = principal
+    schedule = []
+    for month in range(1, tenure + 1):
+        interest_part  = _half_up(balance * ANNUAL_RATE_BP, MONTHLY_DENOMINATOR)
+        principal_part = emi - interest_part
+        balance       -= principal_part
+        if month == tenure:
+            principal_part += balance
+            balance         = 0
+        schedule.append({
+            "month":     month,
+            "emi":       emi / 100,
+            "principal": principal_part / 100,
+            "interest":  interest_part / 100,
+            "balance":   max(balance, 0) / 100,
+        })
+    return schedule
+
+
+def _float_ties(schedule: list[dict], principal: int, tenure: int) -> tuple[int, int | None]:
+    """
+    Replay a float schedule through the integer recurrence from its own
+    balances: (half-paisa interest ties it rounded down, first row that
+    differs in any other way or None).
+    """
+    emi     = _expected_emi(principal, tenure)
+    balance = principal
+    ties    = 0
+    if len(schedule) != tenure:
+        return ties, min(len(schedule), tenure)
+    for row, got in enumerate(schedule):
+        interest_part = _paise(got["interest"])
+        quotient, remainder = divmod(balance * ANNUAL_RATE_BP, MONTHLY_DENOMINATOR)
+        if interest_part == quotient and 2 * remainder == MONTHLY_DENOMINATOR:
+            ties += 1
+        elif interest_part != _half_up(balance * ANNUAL_RATE_BP, MONTHLY_DENOMINATOR):
+            return ties, row
+        principal_part = emi - interest_part
+        balance       -= principal_part
+        if row + 1 == tenure:
+            principal_part += balance
+            balance         = 0
+        if (got["month"], _paise(got["emi"]), _paise(got["principal"]), _paise(got["balance"])) != (
+            row + 1, emi, principal_part, max(balance, 0)
+        ):
+            return ties, row
+    return ties, None
+
+
+def _first_mismatch(variant: Variant, band: str, tenure: int, principals, emis, schedules,
+                    expected_emis, expected_schedules) -> str | None:
+    for i, (got, want) in enumerate(zip(emis, expected_emis)):
+        if got != want:
+            return f"{variant.name} [{band}, {tenure}m] principal {principals[i]:.2f}: EMI {got!r} != {want!r}"
+    for i, (got, want) in enumerate(zip(schedules, expected_schedules)):
+        if got != want:
+            row = next((m for m, (g, w) in enumerate(zip(got, want)) if g != w), min(len(got), len(want)))
+            return (
+                f"{variant.name} [{band}, {tenure}m] principal {principals[i]:.2f}: "
+                f"month {row + 1} {got[row:row + 1]!r} != {want[row:row + 1]!r}"
+            )
+    if len(emis) != len(expected_emis) or len(schedules) != len(expected_schedules):
+        return f"{variant.name} [{band}, {tenure}m]: wrong number of results"
+    return None
+
+
+def check_oracle(cases: dict, variants: list[Variant]) -> tuple[list[str], Counter]:
+    """
+    Every paise variant (variants[1:]) against the frozen paise-exact
+    schedules: exactly equal. The float baseline (variants[0]) against the
+    same recurrence: exactly equal except half-paisa interest ties rounded
+    down. Returns the failures and, per case, how many months took such a tie.
+    """
+    reference, others = variants[0], variants[1:]
+    failures = []
+    ties     = Counter()
+    for (band, tenure), (principals, tenures) in cases.items():
+        paise              = [_paise(p) for p in principals.tolist()]
+        expected_emis      = [_expected_emi(p, tenure) / 100 for p in paise]
+        expected_schedules = [_expected_schedule(p, tenure) for p in paise]
+
+        for i, (emi, schedule) in enumerate(zip(reference.emis(principals, tenures),
+                                                reference.schedules(principals, tenures))):
+            if emi != expected_emis[i]:
+                failures.append(
+                    f"{reference.name} [{band}, {tenure}m] principal {principals[i]:.2f}: "
+                    f"EMI {emi!r} != {expected_emis[i]!r}"
+                )
+                break
+            tied, row = _float_ties(schedule, paise[i], tenure)
+            ties[f"{band} / {tenure}m"] += tied
+            if row is not None:
+                failures.append(
+                    f"{reference.name} [{band}, {tenure}m] principal {principals[i]:.2f}: "
+                    f"month {row + 1} {schedule[row:row + 1]!r} is not a half-paisa tie of "
+                    f"{expected_schedules[i][row:row + 1]!r}"
+                )
+                break
+
+        for variant in others:
+            variant.reset()
+            mismatch = _first_mismatch(
+                variant, band, tenure, principals,
+                variant.emis(principals, tenures), variant.schedules(principals, tenures),
+                expected_emis, expected_schedules,
+            )
+            if mismatch:
+                failures.append(mismatch)
+
+    return failures, ties
+
+
+def _time_per_loan_us(fn, principals, tenures, reset, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        reset()
+        started = time.perf_counter()
+        fn(principals, tenures)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) / len(principals) * 1e6
+
+
+def run(cases: dict, variants: list[Variant], repeat: int) -> dict:
+    results = {}
+    for (band, tenure), (principals, tenures) in cases.items():
+        case = results.setdefault(f"{band} / {tenure}m", {})
+        for variant in variants:
+            case[variant.name] = {
+                "emi_us":      round(_time_per_loan_us(variant.emis, principals, tenures, variant.reset, repeat), 4),
+                "schedule_us": round(_time_per_loan_us(variant.schedules, principals, tenures, variant.reset, repeat), 4),
+            }
+    return results
+
+
+def _print_report(results: dict, variants: list[Variant]) -> None:
+    reference = variants[0].name
+    for kernel, label in (("emi_us", "EMI"), ("schedule_us", "schedule")):
+        print(f"\n{label}: median µs per loan (speed-up vs {reference})")
+        print(f"{'case':<16}" + "".join(f"{v.name:>28}" for v in variants))
+        for case, timings in results.items():
+            base  = timings[reference][kernel]
+            cells = "".join(
+                f"{timings[v.name][kernel]:>18.3f} ({base / timings[v.name][kernel]:>5.1f}x)"
+                for v in variants
+            )
+            print(f"{case:<16}{cells}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="EMI / amortization micro-benchmarks")
+    parser.add_argument("--loans", type=int, default=2_000, help="Loans per (amount band, tenure) case")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case; the median is reported")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--save", type=Path, help="Write timings to this JSON file")
+    args = parser.parse_args(argv)
+
+    cases    = workloads(args.loans, args.seed)
+    failures, ties = check_oracle(cases, VARIANTS)
+    if failures:
+        print("Correctness oracle FAILED: variants disagree with the reference schedules")
+        for line in failures:
+            print("  -", line)
+        return 1
+    print(f"Correctness oracle passed: {len(VARIANTS)} variants x {len(cases)} cases x {args.loans} loans")
+    months = sum(tenure * args.loans for _, tenure in cases)
+    print(
+        f"Float baseline vs paise: {sum(ties.values())} of {months} schedule months round a "
+        f"half-paisa interest tie down; every other month and every EMI identical"
+    )
+    for case, count in ties.items():
+        if count:
+            print(f"  {case:<16}{count:>8} months")
+
+    results = run(cases, VARIANTS, args.repeat)
+    _print_report(results, VARIANTS)
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps({
+            "meta":    {"loans": args.loans, "repeat": args.repeat, "python": platform.python_version(),
+                        "numpy": np.__version__, "machine": platform.node()},
+            "results": results,
+        }, indent=2) + "\n")
+        print(f"\nSaved timings to {args.save}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
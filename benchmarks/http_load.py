@@ -0,0 +1,363 @@
+"""
+HTTP load test for the LSP API.
+
+Boots the app under uvicorn against a scratch database, migrates it, seeds
+N users with credit profiles, then drives the full flow for every user at a
+fixed concurrency:
+
+    credit generate -> eligibility check -> eligibility result
+    -> loan calculate -> loan result
+
+and reports p50/p95/p99 latency, requests/sec and SQL statements per request
+(from /metrics) for each endpoint.
+
+With --bureau-latency-ms the users are seeded without credit profiles and
+the app pulls them from benchmarks/bureau_server.py (a stand-in bureau
+with that response delay) through services.bureau_client.
+
+    python benchmarks/http_load.py --users 500 --concurrency 16 --save benchmarks/baselines/local.json
+    python benchmarks/http_load.py --users 500 --concurrency 16 --compare benchmarks/baselines/local.json
+
+A comparison run exits non-zero when any endpoint's p95 or throughput is
+worse than the baseline by more than --tolerance, or when it issues more SQL
+statements per request. Baselines are only comparable on the same machine,
+database and --users/--concurrency.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+ROOT    = Path(__file__).resolve().parent.parent
+APP_DIR = ROOT / "app"
+
+TENURES = (3, 6, 9, 12)
+
+# Route templates as labelled by core.metrics, in flow order.
+FLOW = (
+    ("POST", "/api/v1/credit/generate/{user_id}"),
+    ("POST", "/api/v1/eligibility/check/{user_id}"),
+    ("GET",  "/api/v1/eligibility-result/{user_id}"),
+    ("POST", "/api/v1/loan/calculate"),
+    ("GET",  "/api/v1/loan/result/{user_id}"),
+)
+
+
+# --------------------------------------------------------------------------- #
+# Server side (runs in the uvicorn subprocess)
+# --------------------------------------------------------------------------- #
+
+def _use_sqlite_rowid_keys() -> None:
+    # SQLite only auto-assigns INTEGER PRIMARY KEY (the rowid alias); the
+    # models' BIGINT keys would otherwise insert NULL ids. PostgreSQL is
+    # unaffected.
+    from sqlalchemy import BigInteger
+    from sqlalchemy.ext.compiler import compiles
+
+    @compiles(BigInteger, "sqlite")
+    def _bigint_as_integer(type_, compiler, **kw):
+        return "INTEGER"
+
+
+def _seed(users: int, seed: int, credit_profiles: bool = True) -> None:
+    from core.database import SessionLocal
+    from models.user_profile import UserProfile
+    from repositories.credit_repository import CreditRepository
+
+    rng = random.Random(seed)
+    with SessionLocal() as db:
+        profiles = [
+            UserProfile(
+                full_name      = f"Bench User {i}",
+                pan_number     = f"BNCH{i:06d}",
+                pan_status     = "VERIFIED",
+                monthly_income = rng.choice([15_000, 25_000, 40_000, 60_000, 90_000]),
+            )
+            for i in range(users)
+        ]
+        db.add_all(profiles)
+        db.flush()
+        if credit_profiles:
+            CreditRepository.create_dummy_credit_profiles(db, [p.user_id for p in profiles])
+        db.commit()
+
+
+def serve(port: int, users: int, seed: int) -> None:
+    import uvicorn
+
+    sys.path.insert(0, str(APP_DIR))
+    os.chdir(APP_DIR)
+    random.seed(seed)
+
+    from core.config import get_settings
+    settings = get_settings()
+    if settings.DATABASE_URL.startswith("sqlite"):
+        _use_sqlite_rowid_keys()
+
+    import manage
+    manage.main(["migrate"])
+    # With a bureau configured, the flow's first call pulls the profiles.
+    _seed(users, seed, credit_profiles=not settings.TRANSUNION_API_URL)
+
+    from main import app
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+# --------------------------------------------------------------------------- #
+# Client side
+# --------------------------------------------------------------------------- #
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_bureau(args, port: int) -> subprocess.Popen:
+    return subprocess.Popen([
+        sys.executable, str(ROOT / "benchmarks" / "bureau_server.py"),
+        "--port", str(port),
+        "--latency-ms", str(args.bureau_latency_ms),
+        "--jitter-ms", str(args.bureau_jitter_ms),
+        "--seed", str(args.seed),
+    ])
+
+
+def _start_server(args, port: int, bureau_url: str | None = None) -> subprocess.Popen:
+    env = dict(os.environ, DATABASE_URL=args.database_url)
+    if args.async_db:
+        env["ASYNC_DB"] = "true"
+    if bureau_url:
+        env["TRANSUNION_API_URL"] = bureau_url
+    else:
+        env.pop("TRANSUNION_API_URL", None)
+    return subprocess.Popen(
+        [sys.executable, __file__, "--serve", str(port), "--users", str(args.users), "--seed", str(args.seed)],
+        env=env,
+    )
+
+
+async def _wait_ready(client: httpx.AsyncClient, server: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode} before becoming ready.")
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server not ready after {timeout:.0f}s.")
+
+
+async def _sql_statements(client: httpx.AsyncClient) -> dict[tuple[str, str], tuple[float, float]]:
+    """(method, route) -> (sum of statements, request count) from /metrics."""
+    from prometheus_client.parser import text_string_to_metric_families
+
+    totals: dict[tuple[str, str], list[float]] = {}
+    text = (await client.get("/metrics")).text
+    for family in text_string_to_metric_families(text):
+        if family.name != "lsp_http_request_sql_statements":
+            continue
+        for sample in family.samples:
+            key = (sample.labels.get("method"), sample.labels.get("route"))
+            if sample.name.endswith("_sum"):
+                totals.setdefault(key, [0.0, 0.0])[0] = sample.value
+            elif sample.name.endswith("_count"):
+                totals.setdefault(key, [0.0, 0.0])[1] = sample.value
+    return {key: (s, c) for key, (s, c) in totals.items()}
+
+
+async def _run_flow(client: httpx.AsyncClient, user_id: int, tenure: int, samples: dict) -> None:
+    calls = (
+        ("POST", f"/api/v1/credit/generate/{user_id}", None),
+        ("POST", f"/api/v1/eligibility/check/{user_id}", None),
+        ("GET",  f"/api/v1/eligibility-result/{user_id}", None),
+        ("POST", "/api/v1/loan/calculate", {"user_id": user_id, "tenure_months": tenure}),
+        ("GET",  f"/api/v1/loan/result/{user_id}", None),
+    )
+    for (method, route), (_, url, body) in zip(FLOW, calls):
+        started  = time.perf_counter()
+        response = await client.request(method, url, json=body)
+        elapsed  = time.perf_counter() - started
+
+        bucket = samples[(method, route)]
+        bucket["latencies"].append(elapsed)
+        bucket["statuses"][str(response.status_code)] = bucket["statuses"].get(str(response.status_code), 0) + 1
+
+
+async def _drive(args, base_url: str, server: subprocess.Popen, bureau_url: str | None = None) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.request_timeout) as client:
+        await _wait_ready(client, server, args.startup_timeout)
+
+        # Seeded users are 1..N on a fresh database.
+        rng     = random.Random(args.seed)
+        queue   = asyncio.Queue()
+        for user_id in range(1, args.users + 1):
+            queue.put_nowait((user_id, rng.choice(TENURES)))
+
+        samples = {key: {"latencies": [], "statuses": {}} for key in FLOW}
+        before  = await _sql_statements(client)
+
+        async def worker():
+            while not queue.empty():
+                user_id, tenure = queue.get_nowait()
+                await _run_flow(client, user_id, tenure, samples)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        wall = time.perf_counter() - started
+
+        after = await _sql_statements(client)
+        bureau_stats = (await client.get(f"{bureau_url}/stats")).json() if bureau_url else None
+
+    endpoints = {}
+    for (method, route), bucket in samples.items():
+        latencies_ms = np.asarray(bucket["latencies"]) * 1000
+        p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99]) if latencies_ms.size else (0.0, 0.0, 0.0)
+
+        sql_sum, sql_count = after.get((method, route), (0.0, 0.0))
+        prev_sum, prev_count = before.get((method, route), (0.0, 0.0))
+        requests_seen = sql_count - prev_count
+
+        endpoints[f"{method} {route}"] = {
+            "requests":        int(latencies_ms.size),
+            "statuses":        bucket["statuses"],
+            "p50_ms":          round(float(p50), 3),
+            "p95_ms":          round(float(p95), 3),
+            "p99_ms":          round(float(p99), 3),
+            "rps":             round(latencies_ms.size / wall, 2) if wall else 0.0,
+            "sql_per_request": round((sql_sum - prev_sum) / requests_seen, 3) if requests_seen else None,
+        }
+
+    total = sum(e["requests"] for e in endpoints.values())
+    return {
+        "meta": {
+            "created_at":  datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "users":       args.users,
+            "concurrency": args.concurrency,
+            "database":    args.database_url.split("://", 1)[0],
+            "async_db":    args.async_db,
+            "bureau_latency_ms": args.bureau_latency_ms,
+            "python":      platform.python_version(),
+            "machine":     platform.node(),
+        },
+        "overall": {
+            "requests":  total,
+            "wall_s":    round(wall, 3),
+            "rps":       round(total / wall, 2) if wall else 0.0,
+        },
+        "endpoints": endpoints,
+        "bureau":    bureau_stats,
+    }
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Human-readable regressions of ``result`` against ``baseline``."""
+    regressions = []
+    for name, base in baseline["endpoints"].items():
+        current = result["endpoints"].get(name)
+        if current is None:
+            regressions.append(f"{name}: missing from this run")
+            continue
+
+        if current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {current['p95_ms']:.1f}ms vs baseline {base['p95_ms']:.1f}ms")
+        if current["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: {current['rps']:.1f} req/s vs baseline {base['rps']:.1f} req/s")
+
+        sql, base_sql = current.get("sql_per_request"), base.get("sql_per_request")
+        if sql is not None and base_sql is not None and sql > base_sql + 0.01:
+            regressions.append(f"{name}: {sql:.2f} SQL statements/request vs baseline {base_sql:.2f}")
+
+    return regressions
+
+
+def _print_report(result: dict) -> None:
+    print(f"{'endpoint':<48} {'reqs':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} {'sql/req':>8}")
+    for name, e in result["endpoints"].items():
+        sql = "-" if e["sql_per_request"] is None else f"{e['sql_per_request']:.2f}"
+        print(f"{name:<48} {e['requests']:>6} {e['p50_ms']:>8.2f} {e['p95_ms']:>8.2f} {e['p99_ms']:>8.2f} {e['rps']:>8.1f} {sql:>8}")
+        print(f"{'':<48} statuses {e['statuses']}")
+    overall = result["overall"]
+    print(f"\n{overall['requests']} requests in {overall['wall_s']:.2f}s ({overall['rps']:.1f} req/s)")
+    if result.get("bureau"):
+        bureau = result["bureau"]
+        print(f"bureau: {bureau['served']} pulls served, {bureau['errors']} errors, peak {bureau['peak_in_flight']} in flight")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="LSP HTTP load test")
+    parser.add_argument("--users", type=int, default=200, help="Users to seed and drive through the flow")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent in-flight user flows")
+    parser.add_argument("--database-url", help="Defaults to a fresh SQLite file in a temp dir")
+    parser.add_argument("--async-db", action="store_true", help="Run the server with ASYNC_DB=true")
+    parser.add_argument("--bureau-latency-ms", type=float, help="Pull credit profiles from a stand-in bureau with this delay")
+    parser.add_argument("--bureau-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", type=Path, help="Write the results to this JSON baseline")
+    parser.add_argument("--compare", type=Path, help="Fail if worse than this JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.20, help="Allowed p95/throughput slack (0.20 = 20%%)")
+    parser.add_argument("--request-timeout", type=float, default=30.0)
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--serve", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(args.serve, args.users, args.seed)
+        return 0
+
+    with tempfile.TemporaryDirectory(prefix="lsp-bench-") as scratch:
+        # The database must be empty: seeded user ids are assumed to be 1..N.
+        args.database_url = args.database_url or f"sqlite:///{scratch}/bench.db"
+        bureau, bureau_url = None, None
+        if args.bureau_latency_ms is not None:
+            bureau_port = _free_port()
+            bureau      = _start_bureau(args, bureau_port)
+            bureau_url  = f"http://127.0.0.1:{bureau_port}"
+
+        port   = _free_port()
+        server = _start_server(args, port, bureau_url and f"{bureau_url}/v1/credit-report")
+        try:
+            result = asyncio.run(_drive(args, f"http://127.0.0.1:{port}", server, bureau_url))
+        finally:
+            for process in (server, bureau):
+                if process is not None:
+                    process.terminate()
+                    process.wait(timeout=10)
+
+    _print_report(result)
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(result, indent=2) + "\n")
+        print(f"Saved baseline to {args.save}")
+
+    if args.compare:
+        regressions = compare(result, json.loads(args.compare.read_text()), args.tolerance)
+        if regressions:
+            print("\nRegressions against", args.compare)
+            for line in regressions:
+                print("  -", line)
+            return 1
+        print(f"\nNo regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
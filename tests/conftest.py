@@ -0,0 +1,109 @@
+import importlib
+import importlib.util
+import os
+import sys
+import tempfile
+import types
+from pathlib import Path
+
+import pytest
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(APP_DIR))
+
+# Settings are read at import time, so they are chosen here. Requests in
+# tests are not rate limited.
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+os.environ.setdefault("ADMISSION_ENABLED", "false")
+
+
+def _stand_in(name: str, **attrs) -> None:
+    """Registers ``attrs`` as module ``name``."""
+    package, _, leaf = name.rpartition(".")
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    setattr(importlib.import_module(package), leaf, module)
+
+
+def _install_user_stand_ins() -> None:
+    """
+    The user / PAN modules are not part of this tree. Minimal stand-ins,
+    matching the tables 0001_baseline creates, let the app import and the
+    credit and eligibility paths run against real user rows. A tree that
+    ships them uses its own.
+    """
+    if importlib.util.find_spec("models.user_profile") is not None:
+        return
+
+    from pydantic import BaseModel
+    from sqlalchemy import DECIMAL, BigInteger, Column, DateTime, ForeignKey, String
+    from sqlalchemy.orm import relationship
+
+    from core.database import Base
+
+    class UserProfile(Base):
+        __tablename__ = "user_profiles"
+
+        user_id        = Column(BigInteger, primary_key=True, autoincrement=True)
+        full_name      = Column(String(100))
+        pan_number     = Column(String(10))
+        pan_status     = Column(String(20))
+        monthly_income = Column(DECIMAL(12, 2))
+
+        credit_profiles    = relationship("CreditProfile", back_populates="user")
+        eligibility_checks = relationship("LoanEligibility", back_populates="user")
+
+    class DummyPan(Base):
+        __tablename__ = "dummy_pans"
+
+        pan_number = Column(String(10), primary_key=True)
+        full_name  = Column(String(100))
+
+    class KycPan(Base):
+        __tablename__ = "kyc_pan_verifications"
+
+        id          = Column(BigInteger, primary_key=True, autoincrement=True)
+        user_id     = Column(BigInteger, ForeignKey("user_profiles.user_id"), nullable=False)
+        pan_number  = Column(String(10), nullable=False)
+        status      = Column(String(20))
+        verified_at = Column(DateTime)
+
+    class UserProfileCreateSchema(BaseModel):
+        full_name : str
+        pan_number: str | None = None
+
+    def create_user_profile(db, payload):
+        raise ValueError("User profile creation is not available in this tree.")
+
+    _stand_in("models.user_profile", UserProfile=UserProfile)
+    _stand_in("models.dummy_pan", DummyPan=DummyPan)
+    _stand_in("models.kyc_pan", KycPan=KycPan)
+    _stand_in("schemas.user_profile_sch", UserProfileCreateSchema=UserProfileCreateSchema)
+    _stand_in("services.user_profile_service", create_user_profile=create_user_profile)
+
+
+_install_user_stand_ins()
+
+
+@pytest.fixture
+def client():
+    """TestClient over a freshly created schema, with the credit profile cache emptied."""
+    from fastapi.testclient import TestClient
+    from sqlalchemy import BigInteger
+    from sqlalchemy.ext.compiler import compiles
+
+    # SQLite only autoincrements an INTEGER PRIMARY KEY.
+    @compiles(BigInteger, "sqlite")
+    def _bigint_as_integer(type_, compiler, **kw):
+        return "INTEGER"
+
+    import main
+    from core.database import Base, engine
+    from repositories.credit_repository import credit_profile_cache
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    credit_profile_cache.clear()
+    with TestClient(main.app) as test_client:
+        yield test_client
@@ -0,0 +1,30 @@
+"""The vectorised engine prices and inverts mixed (tenure, rate) batches exactly like services.money."""
+import numpy as np
+
+from services import money
+from services.amortization_engine import _emi_paise, max_principal_paise_batch
+
+
+def test_mixed_tenures_and_rates_match_the_scalar_kernel():
+    rng = np.random.default_rng(3)
+    p   = rng.integers(500_000, 2_000_001, size=2_000).astype(np.int64)
+    n   = rng.choice([3, 6, 9, 12, 24, 360], size=p.size).astype(np.int64)
+    bp  = rng.choice([0, 1, 999, 1200, 3650], size=p.size).astype(np.int64)
+
+    emis = _emi_paise(p, n, bp).tolist()
+
+    assert emis == [money.emi_paise(*loan) for loan in zip(p.tolist(), n.tolist(), bp.tolist())]
+
+
+def test_principal_solver_matches_the_scalar_kernel():
+    rng = np.random.default_rng(5)
+    emi = np.concatenate([
+        rng.integers(1, 10_000_000_001, size=2_000),
+        np.array([money.emi_paise(p, 12, 1200) for p in range(1_000_000, 1_000_500)]),
+    ]).astype(np.int64)
+    n   = rng.choice([3, 6, 9, 12, 24, 360], size=emi.size).astype(np.int64)
+    bp  = rng.choice([0, 1, 999, 1200, 3650], size=emi.size).astype(np.int64)
+
+    caps = max_principal_paise_batch(emi, n, bp).tolist()
+
+    assert caps == [money.max_principal_paise(*args) for args in zip(emi.tolist(), n.tolist(), bp.tolist())]
@@ -0,0 +1,86 @@
+"""
+Credit endpoints run a fixed number of statements however many accounts a
+profile has: accounts are eager-loaded on read and written in one batch.
+"""
+import asyncio
+import random
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from core.database import SessionLocal, engine
+from repositories.credit_repository import credit_profile_cache
+from services import credit_service
+from services.credit_service import CreditService
+
+# Dummy scores and how many accounts the dummy profile gets for each.
+ACCOUNTS_BY_SCORE = {810: 0, 670: 1, 760: 2}
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def dummy_score(monkeypatch):
+    def use(score: int) -> None:
+        monkeypatch.setattr(random, "choice", lambda choices: score)
+    return use
+
+
+@pytest.mark.parametrize("score", ACCOUNTS_BY_SCORE)
+def test_generate_runs_constant_statements(client, dummy_score, score):
+    dummy_score(score)
+    with count_statements() as statements:
+        response = client.post("/api/v1/credit/generate/1")
+
+    assert response.status_code == 200
+    assert len(response.json()["accounts"]) == ACCOUNTS_BY_SCORE[score]
+    # Latest-profile lookup, profile, raw report, and one batch of accounts if any.
+    assert len(statements) == (4 if ACCOUNTS_BY_SCORE[score] else 3), statements
+
+
+@pytest.mark.parametrize("score", ACCOUNTS_BY_SCORE)
+def test_get_runs_constant_statements(client, dummy_score, score):
+    dummy_score(score)
+    client.post("/api/v1/credit/generate/1")
+    credit_profile_cache.clear()
+
+    with count_statements() as statements:
+        response = client.get("/api/v1/credit/1")
+    assert response.status_code == 200
+    assert len(response.json()["accounts"]) == ACCOUNTS_BY_SCORE[score]
+    # Profile plus its accounts (selectinload), then nothing while cached.
+    assert len(statements) == 2, statements
+
+    with count_statements() as statements:
+        client.get("/api/v1/credit/1")
+    assert statements == []
+
+
+class NoPullBureau:
+    async def fetch_many(self, pans, max_concurrency=None):
+        assert list(pans) == []
+        return {}
+
+
+def test_pull_skips_the_database_for_a_cached_fresh_profile(client, dummy_score, monkeypatch):
+    dummy_score(810)
+    client.post("/api/v1/credit/generate/1")
+    client.get("/api/v1/credit/1")
+    monkeypatch.setattr(credit_service, "get_bureau_client", lambda: NoPullBureau())
+
+    with SessionLocal() as db, count_statements() as statements:
+        assert asyncio.run(CreditService.pull_reports(db, [1])) == ({}, [])
+    assert statements == []
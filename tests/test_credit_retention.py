@@ -0,0 +1,15 @@
+"""Retention arguments: an explicit 0 is rejected, never replaced by the default."""
+import pytest
+
+from services.credit_retention import CreditRetentionService
+
+
+@pytest.mark.parametrize("arguments", [{"keep": 0}, {"batch_size": 0}])
+def test_prune_rejects_zero_instead_of_using_the_default(client, arguments):
+    with pytest.raises(ValueError):
+        CreditRetentionService.prune(**arguments)
+
+
+def test_prune_without_arguments_uses_the_settings(client):
+    stats = CreditRetentionService.prune()
+    assert (stats.users, stats.archived) == (0, 0)
@@ -0,0 +1,46 @@
+"""A worker whose claim was taken over can no longer store, release or renew it."""
+from core.database import SessionLocal
+from models.idempotency_key import IdempotencyKey
+from repositories.idempotency_repo import IdempotencyRepository as Repo
+
+KEY = "k" * 32
+
+
+def _claim(token: str, lock_seconds: int):
+    with SessionLocal() as db:
+        return Repo.claim(db, KEY, "r" * 32, token, lock_seconds, 3600)
+
+
+def _row():
+    with SessionLocal() as db:
+        return db.get(IdempotencyKey, KEY)
+
+
+def test_a_lapsed_claim_is_taken_over_and_the_old_owner_is_locked_out(client):
+    assert _claim("first", lock_seconds=0) is None
+    assert _claim("second", lock_seconds=60) is None
+
+    with SessionLocal() as db:
+        assert not Repo.renew(db, KEY, "first", 60)
+        assert not Repo.complete(db, KEY, "first", 200, [], b"stale")
+        Repo.release(db, KEY, "first")
+    assert _row().claim_token == "second"
+
+    with SessionLocal() as db:
+        assert Repo.complete(db, KEY, "second", 201, [], b"fresh")
+    row = _row()
+    assert (row.status_code, row.body, row.claim_token) == (201, b"fresh", None)
+
+
+def test_the_owner_renews_and_releases_its_claim(client):
+    assert _claim("mine", lock_seconds=60) is None
+    before = _row().locked_until
+
+    with SessionLocal() as db:
+        assert Repo.renew(db, KEY, "mine", 120)
+    assert _row().locked_until > before
+    assert _claim("other", lock_seconds=60).status_code is None
+
+    with SessionLocal() as db:
+        Repo.release(db, KEY, "mine")
+    assert _row() is None
@@ -0,0 +1,40 @@
+"""Idempotency-Key replays are answered before admission control."""
+import pytest
+
+from core.admission import AdmissionMiddleware
+from core.config import get_settings
+
+
+@pytest.fixture
+def limited(client, monkeypatch):
+    """One credit generate per user, then 429."""
+    monkeypatch.setattr(get_settings(), "ADMISSION_ENABLED", True)
+    monkeypatch.setattr(get_settings(), "ADMISSION_LIMITS", {"credit": {"user_per_minute": 1, "user_burst": 1}})
+    middleware = client.app.middleware_stack
+    while not isinstance(middleware, AdmissionMiddleware):
+        middleware = middleware.app
+    middleware.buckets._buckets.clear()
+    return client
+
+
+def test_replay_is_not_rate_limited(limited):
+    first = limited.post("/api/v1/credit/generate/1", headers={"Idempotency-Key": "a"})
+    assert first.status_code == 200
+
+    assert limited.post("/api/v1/credit/generate/1").status_code == 429
+
+    replay = limited.post("/api/v1/credit/generate/1", headers={"Idempotency-Key": "a"})
+    assert replay.status_code == 200
+    assert replay.headers["idempotent-replayed"] == "true"
+    assert replay.json() == first.json()
+
+
+def test_rate_limited_response_is_not_kept(limited):
+    assert limited.post("/api/v1/credit/generate/1").status_code == 200
+
+    rejected = limited.post("/api/v1/credit/generate/1", headers={"Idempotency-Key": "b"})
+    assert rejected.status_code == 429
+
+    retried = limited.post("/api/v1/credit/generate/1", headers={"Idempotency-Key": "b"})
+    assert retried.status_code == 429
+    assert "idempotent-replayed" not in retried.headers
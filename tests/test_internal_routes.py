@@ -0,0 +1,33 @@
+"""The /internal operational views are only served with INTERNAL_API_TOKEN."""
+import pytest
+
+from core.config import get_settings
+
+
+@pytest.fixture
+def internal_token(monkeypatch):
+    monkeypatch.setattr(get_settings(), "INTERNAL_API_TOKEN", "s3cret")
+    return "s3cret"
+
+
+def test_internal_routes_are_hidden_without_a_configured_token(client):
+    assert client.get("/internal/pool").status_code == 404
+    assert client.get("/internal/pool", headers={"X-Internal-Token": ""}).status_code == 404
+
+
+def test_internal_routes_reject_a_missing_or_wrong_token(client, internal_token):
+    assert client.get("/internal/pool").status_code == 403
+    assert client.get("/internal/schedule-cache", headers={"X-Internal-Token": "nope"}).status_code == 403
+
+
+def test_credit_cache_stats_need_the_internal_token(client, internal_token):
+    assert client.get("/api/v1/credit/cache/stats").status_code != 200
+    assert client.get("/internal/credit-cache").status_code == 403
+    response = client.get("/internal/credit-cache", headers={"X-Internal-Token": internal_token})
+    assert response.status_code == 200
+    assert "hit_ratio" in response.json()
+
+
+def test_internal_routes_serve_the_configured_token(client, internal_token):
+    response = client.get("/internal/schedule-cache", headers={"X-Internal-Token": internal_token})
+    assert response.status_code == 200
@@ -0,0 +1,85 @@
+"""
+FOIR must hold at every tenure /loan/calculate accepts, not only at the
+tenure that produced max_eligible_amount.
+"""
+import json
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from services import money
+from services.eligibility_policy import DEFAULT_POLICY_VERSION, DEFAULT_RULES, EligibilityPolicy
+from services.eligibility_service import ALLOWED_TENURES, EligibilityService
+from services.loan_service import ANNUAL_RATE_BP, LoanCalculationService
+
+POLICY = EligibilityPolicy.compile(DEFAULT_POLICY_VERSION, DEFAULT_RULES)
+
+
+def _eligibility_record(monthly_income: int, existing_emi: int, credit_score: int = 810):
+    user    = SimpleNamespace(user_id=1, monthly_income=Decimal(monthly_income))
+    profile = SimpleNamespace(
+        id                 = 1,
+        credit_score       = credit_score,
+        bureau_name        = "TransUnion",
+        total_existing_emi = Decimal(existing_emi),
+    )
+    decision = EligibilityService._decide(user, profile, POLICY)
+    assert decision["eligibility_status"] == "ELIGIBLE", decision
+    return SimpleNamespace(failure_reason=None, **decision)
+
+
+@pytest.mark.parametrize(
+    "monthly_income, existing_emi",
+    [(50_000, 0), (10_000, 2_000), (8_000, 1_500), (6_000, 1_000), (5_000, 1_000)],
+)
+@pytest.mark.parametrize("tenure_months", ALLOWED_TENURES)
+def test_calculated_emi_stays_within_foir(monthly_income, existing_emi, tenure_months):
+    record    = _eligibility_record(monthly_income, existing_emi)
+    max_total = money.div_round(money.to_paise(monthly_income) * POLICY.max_foir_bp, money.BP_PER_UNIT)
+
+    try:
+        amount = LoanCalculationService._verify_eligibility_record(record, tenure_months)
+    except ValueError as e:
+        assert "FOIR_EXCEEDED" in str(e)
+        return
+
+    emi = money.emi_paise(amount, tenure_months, ANNUAL_RATE_BP)
+    assert money.to_paise(existing_emi) + emi <= max_total
+    assert amount <= money.to_paise(record.max_eligible_amount)
+
+
+def test_short_tenure_is_capped_below_max_eligible_amount():
+    record = _eligibility_record(10_000, 2_000)
+    assert record.max_eligible_amount == 20_000
+
+    three_months  = LoanCalculationService._verify_eligibility_record(record, 3)
+    twelve_months = LoanCalculationService._verify_eligibility_record(record, 12)
+    assert three_months < twelve_months == money.to_paise(20_000)
+
+
+def test_unaffordable_tenure_is_rejected():
+    record = _eligibility_record(5_000, 1_000)
+    with pytest.raises(ValueError, match="FOIR_EXCEEDED"):
+        LoanCalculationService._verify_eligibility_record(record, 3)
+    assert LoanCalculationService._verify_eligibility_record(record, 12) > 0
+
+
+@pytest.mark.parametrize("monthly_income, existing_emi", [(50_000, 0), (10_000, 2_000), (5_000, 1_000)])
+def test_result_schedules_match_what_calculate_lends(monthly_income, existing_emi):
+    from routers.eligibility_result import _schedules_fragment
+
+    record    = _eligibility_record(monthly_income, existing_emi)
+    fragment  = _schedules_fragment(record, float(record.max_eligible_amount), include_schedules=True)
+    schedules = {s["tenureMonths"]: s for s in json.loads(b"{" + fragment + b"}")["amortizationSchedules"]}
+
+    for tenure_months in ALLOWED_TENURES:
+        try:
+            amount = LoanCalculationService._verify_eligibility_record(record, tenure_months)
+        except ValueError:
+            assert tenure_months not in schedules
+            continue
+        schedule = schedules[tenure_months]
+        assert schedule["emi"] == money.to_rupees(money.emi_paise(amount, tenure_months, ANNUAL_RATE_BP))
+        first = schedule["schedule"][0]
+        assert money.to_paise(first["principal"] + first["balance"]) == amount
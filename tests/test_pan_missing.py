@@ -0,0 +1,72 @@
+"""With a bureau configured, users without a PAN are rejected, never given a dummy profile."""
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from core.database import SessionLocal
+from models.credit_profile import CreditProfile
+from models.user_profile import UserProfile
+from services import credit_service
+
+
+class NoPullBureau:
+    """Stands in for the bureau; a user without a PAN must never reach it."""
+
+    async def fetch_many(self, pans, max_concurrency=None):
+        assert list(pans) == []
+        return {}
+
+
+@pytest.fixture
+def pan_less_user(client, monkeypatch):
+    monkeypatch.setattr(credit_service, "get_bureau_client", lambda: NoPullBureau())
+    with SessionLocal() as db:
+        db.add(UserProfile(user_id=1, pan_number=None, monthly_income=Decimal("50000.00")))
+        db.commit()
+    return 1
+
+
+def _profiles(user_id: int) -> int:
+    with SessionLocal() as db:
+        return db.query(CreditProfile).filter(CreditProfile.user_id == user_id).count()
+
+
+def test_single_check_rejects_a_user_without_pan(client, pan_less_user):
+    response = client.post(f"/api/v1/eligibility/check/{pan_less_user}")
+
+    assert response.status_code == 200
+    assert response.json()["failure_reason"] == "PAN_MISSING"
+    assert _profiles(pan_less_user) == 0
+
+
+def test_batch_check_rejects_a_user_without_pan(client, pan_less_user):
+    response = client.post("/api/v1/eligibility/check-batch", json={"user_ids": [pan_less_user]})
+
+    assert response.status_code == 200
+    assert [r["failure_reason"] for r in response.json()["results"]] == ["PAN_MISSING"]
+    assert _profiles(pan_less_user) == 0
+
+
+def test_generate_refuses_a_user_without_pan(client, pan_less_user):
+    assert client.post(f"/api/v1/credit/generate/{pan_less_user}").status_code == 422
+    assert _profiles(pan_less_user) == 0
+
+
+def test_batch_check_does_not_score_an_expired_profile(client, pan_less_user):
+    with SessionLocal() as db:
+        db.add(CreditProfile(
+            user_id            = pan_less_user,
+            bureau_name        = "TransUnion",
+            credit_score       = 810,
+            total_existing_emi = Decimal("0.00"),
+            pulled_at          = datetime.utcnow() - timedelta(days=60),
+            expires_at         = datetime.utcnow() - timedelta(days=30),
+        ))
+        db.commit()
+
+    response = client.post("/api/v1/eligibility/check-batch", json={"user_ids": [pan_less_user]})
+
+    assert response.status_code == 200
+    [result] = response.json()["results"]
+    assert (result["eligibility_status"], result["failure_reason"]) == ("REJECTED", "PAN_MISSING")
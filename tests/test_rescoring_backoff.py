@@ -0,0 +1,68 @@
+"""Users the re-scoring job cannot pull are backed off instead of blocking the due list."""
+import asyncio
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from core.database import SessionLocal
+from models.credit_profile import CreditProfile
+from models.loan_eligibility import LoanEligibility
+from models.user_profile import UserProfile
+from services import credit_service
+from services.bureau_client import BureauError
+from services.rescoring import rescore_due
+
+# user_id -> PAN; user 1 expires first, then 2, then 3.
+PANS = {1: None, 2: "FAILS1234F", 3: "GOODS1234F"}
+
+
+class FlakyBureau:
+    def __init__(self):
+        self.pulled = []
+
+    async def fetch_many(self, pans, max_concurrency=None):
+        pans = list(pans)
+        self.pulled.extend(pans)
+        return {pan: BureauError("down") for pan in pans}
+
+
+@pytest.fixture
+def bureau(client, monkeypatch):
+    bureau = FlakyBureau()
+    monkeypatch.setattr(credit_service, "get_bureau_client", lambda: bureau)
+
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        for user_id, pan in PANS.items():
+            db.add(UserProfile(user_id=user_id, pan_number=pan, monthly_income=Decimal("50000.00")))
+            db.add(CreditProfile(
+                user_id            = user_id,
+                bureau_name        = "TransUnion",
+                credit_score       = 760,
+                total_existing_emi = Decimal("0.00"),
+                pulled_at          = now - timedelta(days=29),
+                expires_at         = now + timedelta(hours=user_id),
+            ))
+            db.add(LoanEligibility(user_id=user_id, eligibility_status="ELIGIBLE", latest_checked_at=now))
+        db.commit()
+    return bureau
+
+
+def _next_rescore_at() -> dict[int, datetime | None]:
+    with SessionLocal() as db:
+        return dict(db.query(LoanEligibility.user_id, LoanEligibility.next_rescore_at))
+
+
+def test_unpullable_users_do_not_stay_at_the_head_of_the_due_list(bureau):
+    first = asyncio.run(rescore_due(limit=2))
+    assert (first.due, first.failed, first.rescored) == (2, 1, 0)
+    assert bureau.pulled == ["FAILS1234F"]
+
+    deferred = _next_rescore_at()
+    assert deferred[1] > deferred[2] > datetime.utcnow()
+    assert deferred[3] is None
+
+    second = asyncio.run(rescore_due(limit=2))
+    assert second.due == 1
+    assert bureau.pulled == ["FAILS1234F", "GOODS1234F"]